@@ -5,8 +5,12 @@ Supports downloading audio from YouTube and other sites using yt-dlp.
 Requires yt-dlp to be installed (`pip install yt-dlp`).
 
 Usage:
-    from audio_input.downloader import download_audio
+    from audio_input.downloader import download_audio, download_audio_many
     download_audio("https://www.youtube.com/watch?v=...", out_dir="audio_input")
+    download_audio_many([url1, url2], out_dir="audio_input", concurrency=4)
+    download_audio_cached("https://www.youtube.com/watch?v=...")  # ~/.cache/acoustical/<id>.mp3
+    stream_audio_pcm("https://www.youtube.com/watch?v=...")  # mono float32 PCM bytes
+    download_audio_ranged("https://example.com/long-podcast", workers=8)
 
 Command-line usage:
     python audio_input/downloader.py <url> [--out_dir audio_input]
@@ -17,43 +21,88 @@ import os
 import sys
 import logging
 import shutil # For shutil.which
+import subprocess
+import tempfile
+import atexit
+import collections
+import json
+import mmap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import requests
+except ImportError:
+    requests = None  # Ranged downloads fall back to yt-dlp's own downloader
 
 log = logging.getLogger(__name__)
 
-def download_audio(url, out_dir="audio_input", quiet_yt_dlp=True):
-    """
-    Download audio from a URL (YouTube, SoundCloud, etc.) to the specified directory,
-    converting to MP3 format.
-    Returns the path to the downloaded MP3 file.
-    Raises ImportError if yt-dlp is not installed.
-    Raises FileNotFoundError if ffmpeg is not found (for MP3 conversion).
-    Raises Exception for download/network errors.
-    """
+# Prefer streams whose codec can be stored as-is (AAC in m4a, Opus) over a
+# lossy MP3 re-encode when the caller only needs something decodable.
+PASSTHROUGH_FORMAT = "bestaudio[ext=m4a]/bestaudio[acodec=opus]/bestaudio/best"
+# Extensions FFmpegExtractAudio(preferredcodec="best") may produce, MP3 first.
+AUDIO_OUTPUT_EXTENSIONS = (".mp3", ".m4a", ".opus", ".ogg", ".aac")
+
+def _import_yt_dlp():
+    """Import yt-dlp, raising a helpful ImportError if it is missing."""
     try:
         import yt_dlp
     except ImportError:
         log.error("yt-dlp is not installed. Please install with 'pip install yt-dlp'.")
         raise ImportError("yt-dlp is required. Install with 'pip install yt-dlp'.")
+    return yt_dlp
 
+
+def _find_ffmpeg():
+    """Return the ffmpeg path, raising FileNotFoundError if it is not on PATH."""
     ffmpeg_path = shutil.which("ffmpeg")
     if not ffmpeg_path:
         log.error("ffmpeg not found in PATH. It is required for MP3 conversion.")
         raise FileNotFoundError("ffmpeg not found in PATH. It is required for MP3 conversion.")
+    return ffmpeg_path
+
 
+def _ensure_out_dir(out_dir):
     if not os.path.exists(out_dir):
-        log.info(f"Creating output directory: {out_dir}")
+        log.info("Creating output directory: %s", out_dir)
         os.makedirs(out_dir)
-    
+
+
+def _ffmpeg_postprocessor_args():
+    """
+    Build yt-dlp postprocessor_args for the FFmpegExtractAudio step.
+    Lets ffmpeg pick its own thread count. No -hwaccel: the step only decodes
+    and encodes audio, so there is no video stream for a GPU to decode.
+    """
+    return {"extractaudio+ffmpeg_o": ["-threads", "0"]}
+
+
+def _build_ydl_opts(out_dir, quiet_yt_dlp, ffmpeg_path, filename_template="%(title)s.%(ext)s",
+                    prefer_passthrough=False):
+    """
+    Build the yt-dlp options for downloading best audio and converting to MP3.
+    With prefer_passthrough, the native audio stream is only remuxed
+    (`-c:a copy`) instead of being decoded and re-encoded with lame.
+    """
+    if prefer_passthrough:
+        return {
+            "format": PASSTHROUGH_FORMAT,
+            "outtmpl": os.path.join(out_dir, filename_template),
+            "noplaylist": True,
+            "quiet": quiet_yt_dlp,
+            # "best" keeps the source codec and just strips any video container.
+            "postprocessors": [{
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "best",
+            }],
+            "ffmpeg_location": ffmpeg_path,
+            "keepvideo": False,
+        }
     # Output template will result in an MP3 file due to postprocessor
     # yt-dlp handles naming the final file correctly with .mp3 extension.
-    output_template = os.path.join(out_dir, "%(title)s.%(ext)s") 
-                                   # Using %(ext)s and letting postprocessor handle final ext.
-                                   # Alternatively, could force .mp3: "%(title)s.mp3"
-                                   # but yt-dlp is usually good at this.
-
-    ydl_opts = {
+    return {
         "format": "bestaudio/best",
-        "outtmpl": output_template,
+        "outtmpl": os.path.join(out_dir, filename_template),
         "noplaylist": True,
         "quiet": quiet_yt_dlp,
         "postprocessors": [{
@@ -61,52 +110,454 @@ def download_audio(url, out_dir="audio_input", quiet_yt_dlp=True):
             "preferredcodec": "mp3",
             "preferredquality": "192", # Bitrate for MP3
         }],
+        "postprocessor_args": _ffmpeg_postprocessor_args(),
         "ffmpeg_location": ffmpeg_path,
         "keepvideo": False, # Remove original downloaded file after conversion
     }
-    
-    log.info(f"Attempting to download and convert audio from {url} to MP3 in {out_dir}.")
+
+
+def _close_ydl(ydl):
+    """Close a YoutubeDL instance, ignoring releases without close() and close errors."""
+    close = getattr(ydl, "close", None)  # Older yt-dlp releases have no close()
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        log.debug("Closing YoutubeDL instance failed: %s", e)
+
+
+class _YdlCache:
+    """
+    Small LRU cache of YoutubeDL instances keyed on JSON-encoded options.
+
+    Constructing YoutubeDL loads and registers every extractor, which dominates
+    the cost of downloading short clips, so instances are reused. The key
+    includes the output template, so evictions happen in normal use; an
+    evicted instance is closed straight away, and whatever is still cached is
+    closed at interpreter exit.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._instances = collections.OrderedDict()
+        self._lock = threading.Lock()
+        atexit.register(self.cache_clear)
+
+    def __call__(self, opts_key):
+        evicted = []
+        with self._lock:
+            ydl = self._instances.get(opts_key)
+            if ydl is not None:
+                self._instances.move_to_end(opts_key)
+                return ydl
+            yt_dlp = _import_yt_dlp()
+            ydl = self._instances[opts_key] = yt_dlp.YoutubeDL(json.loads(opts_key))
+            while len(self._instances) > self.maxsize:
+                evicted.append(self._instances.popitem(last=False)[1])
+        for old in evicted:
+            _close_ydl(old)
+        return ydl
+
+    def cache_clear(self):
+        """Close and drop every cached instance."""
+        with self._lock:
+            instances = list(self._instances.values())
+            self._instances.clear()
+        for ydl in instances:
+            _close_ydl(ydl)
+
+
+_get_ydl = _YdlCache(maxsize=4)
+
+
+def _ydl_for(ydl_opts):
+    """Look up (or create) the shared YoutubeDL instance for these options."""
+    return _get_ydl(json.dumps(ydl_opts, sort_keys=True))
+
+
+def _resolve_final_path(ydl, info, out_dir, require_mp3=True):
+    """
+    Work out the path of the final audio file produced for a yt-dlp info dict.
+    Unless require_mp3 is False (passthrough downloads), it must be an MP3.
+    """
+    # After download and postprocessing, 'filepath' should point to the final .mp3
+    # For single video downloads (noplaylist=True), info itself is the video's info.
+    # If 'requested_downloads' exists, it's more robust.
+    final_filepath = None
+    if 'requested_downloads' in info and info['requested_downloads']:
+        final_filepath = info['requested_downloads'][0].get('filepath')
+    elif 'filepath' in info: # Fallback for some cases
+        final_filepath = info.get('filepath')
+
+    if final_filepath and not require_mp3 and os.path.exists(final_filepath):
+        return final_filepath
+    if not final_filepath or not os.path.exists(final_filepath) or not final_filepath.endswith(".mp3"):
+        # If path not found or not mp3, try to construct it if title and ext are updated
+        log.warning("Could not reliably get final MP3 path from info dict (path: %s). Trying to build from title.", final_filepath)
+        title = info.get('title', 'downloaded_audio')
+        # Sanitize title for filename (yt-dlp does this, but good to be aware)
+        # For simplicity, assume ydl.prepare_filename on updated info works
+        # If info['ext'] was updated to 'mp3' by postprocessor:
+        if info.get('ext') == 'mp3' or (not require_mp3 and info.get('ext')):
+            final_filepath = ydl.prepare_filename(info) # This should give the .mp3 name
+        else: # Construct it manually as a last resort
+            sanitized_title = ydl.prepare_filename({'title': title, 'ext': 'mp3'}) # Get sanitized name with .mp3
+            # Remove the directory part if prepare_filename added it based on a different outtmpl
+            base_sanitized_title = os.path.basename(sanitized_title)
+            final_filepath = os.path.join(out_dir, base_sanitized_title)
+
+        if not os.path.exists(final_filepath):
+            log.error("Final MP3 file not found at expected path: %s. Original info ext: %s", final_filepath, info.get('ext'))
+            raise Exception(f"Downloaded audio processing to MP3 failed or file not found at {final_filepath}.")
+    return final_filepath
+
+
+def download_audio(url, out_dir="audio_input", quiet_yt_dlp=True, prefer_passthrough=False):
+    """
+    Download audio from a URL (YouTube, SoundCloud, etc.) to the specified directory,
+    converting to MP3 format.
+    With prefer_passthrough=True the native AAC/Opus stream is kept without
+    re-encoding, and the returned path has whatever extension that produces.
+    Returns the path to the downloaded MP3 (or passthrough audio) file.
+    Raises ImportError if yt-dlp is not installed.
+    Raises FileNotFoundError if ffmpeg is not found (for MP3 conversion).
+    Raises Exception for download/network errors.
+    """
+    yt_dlp = _import_yt_dlp()
+    ffmpeg_path = _find_ffmpeg()
+    _ensure_out_dir(out_dir)
+
+    ydl_opts = _build_ydl_opts(out_dir, quiet_yt_dlp, ffmpeg_path, prefer_passthrough=prefer_passthrough)
+
+    log.info("Attempting to download and convert audio from %s to MP3 in %s.", url, out_dir)
+    try:
+        ydl = _ydl_for(ydl_opts)
+        info = ydl.extract_info(url, download=True)
+        final_filepath = _resolve_final_path(ydl, info, out_dir, require_mp3=not prefer_passthrough)
+        log.info("Audio downloaded and processed to: %s", final_filepath)
+        return final_filepath
+    except yt_dlp.utils.DownloadError as de:
+        log.error("yt-dlp download error for %s: %s", url, de)
+        raise Exception(f"Audio download failed (yt-dlp error): {de}") from de
+    except Exception as e:
+        log.error("Audio download processing failed for %s: %s", url, e, exc_info=True)
+        raise Exception(f"Audio download processing failed: {e}") from e
+
+
+def download_audio_many(urls, out_dir="audio_input", concurrency=4, quiet_yt_dlp=True,
+                        prefer_passthrough=False):
+    """
+    Download several URLs concurrently.
+
+    YoutubeDL keeps per-download state and is not thread-safe, so each worker
+    thread builds its own instance and reuses it for every URL it handles;
+    the instances are closed once the batch is done. ``concurrency`` bounds
+    both the number of URLs in flight and yt-dlp's per-download fragment
+    concurrency.
+    Returns a dict mapping each URL to its MP3 path (native audio path with
+    prefer_passthrough), or to {"error": str} if that URL failed.
+    Raises ImportError if yt-dlp is not installed.
+    Raises FileNotFoundError if ffmpeg is not found (for MP3 conversion).
+    """
+    yt_dlp = _import_yt_dlp()
+    ffmpeg_path = _find_ffmpeg()
+    _ensure_out_dir(out_dir)
+
+    # Include the video id so two URLs with the same title cannot collide.
+    ydl_opts = _build_ydl_opts(
+        out_dir, quiet_yt_dlp, ffmpeg_path, "%(title)s [%(id)s].%(ext)s",
+        prefer_passthrough=prefer_passthrough,
+    )
+    ydl_opts["concurrent_fragment_downloads"] = concurrency
+
+    results = {}
+    log.info("Attempting to download %s URLs to MP3 in %s (%s concurrent).", len(urls), out_dir, concurrency)
+    worker_state = threading.local()
+    instances = []
+
+    def _download_one(url):
+        ydl = getattr(worker_state, "ydl", None)
+        if ydl is None:
+            ydl = worker_state.ydl = yt_dlp.YoutubeDL(dict(ydl_opts))
+            instances.append(ydl)
+        info = ydl.extract_info(url, download=True)
+        return _resolve_final_path(ydl, info, out_dir, require_mp3=not prefer_passthrough)
+
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            
-            # After download and postprocessing, 'filepath' should point to the final .mp3
-            # For single video downloads (noplaylist=True), info itself is the video's info.
-            # If 'requested_downloads' exists, it's more robust.
-            final_filepath = None
-            if 'requested_downloads' in info and info['requested_downloads']:
-                final_filepath = info['requested_downloads'][0].get('filepath')
-            elif 'filepath' in info: # Fallback for some cases
-                final_filepath = info.get('filepath')
-            
-            if not final_filepath or not os.path.exists(final_filepath) or not final_filepath.endswith(".mp3"):
-                # If path not found or not mp3, try to construct it if title and ext are updated
-                log.warning(f"Could not reliably get final MP3 path from info dict (path: {final_filepath}). Trying to build from title.")
-                title = info.get('title', 'downloaded_audio')
-                # Sanitize title for filename (yt-dlp does this, but good to be aware)
-                # For simplicity, assume ydl.prepare_filename on updated info works
-                # If info['ext'] was updated to 'mp3' by postprocessor:
-                if info.get('ext') == 'mp3':
-                    final_filepath = ydl.prepare_filename(info) # This should give the .mp3 name
-                else: # Construct it manually as a last resort
-                    sanitized_title = ydl.prepare_filename({'title': title, 'ext': 'mp3'}) # Get sanitized name with .mp3
-                    # Remove the directory part if prepare_filename added it based on a different outtmpl
-                    base_sanitized_title = os.path.basename(sanitized_title)
-                    final_filepath = os.path.join(out_dir, base_sanitized_title)
-
-                if not os.path.exists(final_filepath):
-                    log.error(f"Final MP3 file not found at expected path: {final_filepath}. Original info ext: {info.get('ext')}")
-                    raise Exception(f"Downloaded audio processing to MP3 failed or file not found at {final_filepath}.")
-
-            log.info(f"Audio downloaded and processed to: {final_filepath}")
-            return final_filepath
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            future_to_url = {executor.submit(_download_one, url): url for url in urls}
+            for future in as_completed(future_to_url):
+                url = future_to_url[future]
+                try:
+                    results[url] = future.result()
+                    log.info("Audio downloaded and processed to: %s", results[url])
+                except Exception as e:
+                    log.error("Audio download failed for %s: %s", url, e)
+                    results[url] = {"error": f"Audio download failed: {e}"}
+    finally:
+        for ydl in instances:
+            _close_ydl(ydl)
+    return results
+
+def _evict_cache(cache_dir, max_bytes, keep=None):
+    """
+    Delete least-recently-accessed audio files from cache_dir until its total size is
+    at most max_bytes. The file at `keep` (the one just served) is never removed.
+    """
+    try:
+        entries = [
+            e for e in os.scandir(cache_dir)
+            if e.is_file() and e.name.endswith(AUDIO_OUTPUT_EXTENSIONS)
+        ]
+    except OSError as e:
+        log.warning("Could not scan audio cache %s: %s", cache_dir, e)
+        return
+    stats = {e.path: e.stat() for e in entries}
+    total = sum(st.st_size for st in stats.values())
+    for path, st in sorted(stats.items(), key=lambda item: item[1].st_atime):
+        if total <= max_bytes:
+            break
+        if keep and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+            total -= st.st_size
+            log.info("Evicted cached audio: %s", path)
+        except OSError as e:
+            log.warning("Could not evict cached audio %s: %s", path, e)
+
+
+def download_audio_cached(url, cache_dir=None, max_cache_mb=None, quiet_yt_dlp=True,
+                          prefer_passthrough=False):
+    """
+    Download audio from a URL into a persistent cache keyed on the video id.
+
+    A cheap metadata-only lookup (no download, no format processing) yields the
+    id; if `<cache_dir>/<id>.mp3` already exists it is returned without touching
+    the network again. Otherwise the audio is downloaded and converted into the
+    cache, after which the least-recently-used entries are evicted to keep the
+    cache under `max_cache_mb`. With prefer_passthrough, any cached audio format
+    for the id is accepted and misses are stored without re-encoding.
+    Returns the path to the cached audio file. Cached files must not be deleted by
+    the caller.
+    Raises ImportError if yt-dlp is not installed.
+    Raises FileNotFoundError if ffmpeg is not found (for MP3 conversion).
+    Raises Exception for download/network errors.
+    """
+    yt_dlp = _import_yt_dlp()
+    if not cache_dir or max_cache_mb is None:
+        # Imported here so the module still runs standalone (see Command-line usage)
+        from config import AUDIO_CACHE_DIR, MAX_CACHE_MB
+        cache_dir = cache_dir or AUDIO_CACHE_DIR
+        max_cache_mb = MAX_CACHE_MB if max_cache_mb is None else max_cache_mb
+
+    try:
+        ydl = _ydl_for({"quiet": quiet_yt_dlp, "noplaylist": True, "skip_download": True})
+        info = ydl.extract_info(url, download=False, process=False)
+    except Exception as e:
+        log.error("Could not resolve video id for %s: %s", url, e)
+        raise Exception(f"Audio download failed (metadata lookup): {e}") from e
+
+    video_id = (info or {}).get("id")
+    if not video_id:
+        log.warning("No video id for %s; downloading without caching.", url)
+        return download_audio(url, out_dir=cache_dir, quiet_yt_dlp=quiet_yt_dlp,
+                              prefer_passthrough=prefer_passthrough)
+
+    accepted_exts = AUDIO_OUTPUT_EXTENSIONS if prefer_passthrough else (".mp3",)
+    for ext in accepted_exts:
+        cached_path = os.path.join(cache_dir, f"{video_id}{ext}")
+        if os.path.isfile(cached_path):
+            log.info("Using cached audio for %s: %s", url, cached_path)
+            # Refresh atime explicitly; many filesystems are mounted noatime/relatime.
+            try:
+                os.utime(cached_path)
+            except OSError:
+                pass
+            return cached_path
+
+    ffmpeg_path = _find_ffmpeg()
+    _ensure_out_dir(cache_dir)
+    ydl_opts = _build_ydl_opts(cache_dir, quiet_yt_dlp, ffmpeg_path, "%(id)s.%(ext)s",
+                               prefer_passthrough=prefer_passthrough)
+
+    log.info("Attempting to download audio from %s into cache %s.", url, cache_dir)
+    try:
+        ydl = _ydl_for(ydl_opts)
+        info = ydl.extract_info(url, download=True)
+        final_filepath = _resolve_final_path(ydl, info, cache_dir, require_mp3=not prefer_passthrough)
     except yt_dlp.utils.DownloadError as de:
-        log.error(f"yt-dlp download error for {url}: {de}")
+        log.error("yt-dlp download error for %s: %s", url, de)
         raise Exception(f"Audio download failed (yt-dlp error): {de}") from de
     except Exception as e:
-        log.error(f"Audio download processing failed for {url}: {e}", exc_info=True)
+        log.error("Audio download processing failed for %s: %s", url, e, exc_info=True)
         raise Exception(f"Audio download processing failed: {e}") from e
 
+    log.info("Audio downloaded and cached at: %s", final_filepath)
+    _evict_cache(cache_dir, max_cache_mb * 1024 * 1024, keep=final_filepath)
+    return final_filepath
+
+def stream_audio_pcm(url, sample_rate=44100, quiet_yt_dlp=True):
+    """
+    Stream a URL's best audio through ffmpeg without writing any file.
+
+    yt-dlp writes the raw stream to stdout (`-o -`), which is piped into
+    ffmpeg and decoded once to mono 32-bit float PCM at `sample_rate`.
+    Returns the raw little-endian float32 sample bytes.
+    Raises ImportError if yt-dlp is not installed.
+    Raises FileNotFoundError if ffmpeg is not found.
+    Raises Exception if either process fails.
+    """
+    _import_yt_dlp()
+    ffmpeg_path = _find_ffmpeg()
+
+    ytdlp_cmd = [sys.executable, "-m", "yt_dlp", "--format", "bestaudio/best",
+                 "--no-playlist", "-o", "-", url]
+    if quiet_yt_dlp:
+        ytdlp_cmd.insert(3, "--quiet")
+    ffmpeg_cmd = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+                  "-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"]
+
+    log.info("Streaming audio from %s through ffmpeg at %s Hz.", url, sample_rate)
+    # yt-dlp's stderr goes to a file: an unread pipe can fill up and stall it
+    # (and with it the whole pipeline) while ffmpeg is still decoding.
+    with tempfile.TemporaryFile() as ytdlp_err_file:
+        ytdlp_proc = subprocess.Popen(ytdlp_cmd, stdout=subprocess.PIPE, stderr=ytdlp_err_file)
+        ffmpeg_proc = None
+        try:
+            try:
+                ffmpeg_proc = subprocess.Popen(
+                    ffmpeg_cmd, stdin=ytdlp_proc.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+            finally:
+                # ffmpeg owns the pipe now (or never started): let yt-dlp get
+                # SIGPIPE rather than block if nobody reads its output.
+                ytdlp_proc.stdout.close()
+            pcm, ffmpeg_err = ffmpeg_proc.communicate()
+        except BaseException:
+            for proc in (ffmpeg_proc, ytdlp_proc):
+                if proc is not None and proc.poll() is None:
+                    proc.kill()
+            if ffmpeg_proc is not None:
+                ffmpeg_proc.wait()
+            raise
+        finally:
+            ytdlp_proc.wait()
+        ytdlp_err_file.seek(0)
+        ytdlp_err = ytdlp_err_file.read()
+
+    if ytdlp_proc.returncode != 0:
+        log.error("yt-dlp streaming failed for %s: %s", url, ytdlp_err.decode(errors='replace').strip())
+        raise Exception(f"Audio streaming failed (yt-dlp exit {ytdlp_proc.returncode})")
+    if ffmpeg_proc.returncode != 0:
+        log.error("ffmpeg decode failed for %s: %s", url, ffmpeg_err.decode(errors='replace').strip())
+        raise Exception(f"Audio streaming failed (ffmpeg exit {ffmpeg_proc.returncode})")
+    return pcm
+
+def _fetch_range(media_url, headers, start, end, buf):
+    """Fetch bytes [start, end] of media_url into buf[start:end + 1]."""
+    range_headers = dict(headers, Range=f"bytes={start}-{end}")
+    with requests.get(media_url, headers=range_headers, stream=True, timeout=30) as resp:
+        resp.raise_for_status()
+        if resp.status_code != 206:
+            raise Exception(f"Server ignored Range request (HTTP {resp.status_code})")
+        offset = start
+        for chunk in resp.iter_content(chunk_size=1 << 16):
+            buf[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+    if offset != end + 1:
+        raise Exception(f"Short read for range {start}-{end}: got {offset - start} bytes")
+
+
+def _download_ranges(media_url, headers, size, dest_path, workers):
+    """Download size bytes of media_url into dest_path with concurrent Range requests."""
+    chunk = -(-size // workers)  # ceil division
+    ranges = [(start, min(start + chunk, size) - 1) for start in range(0, size, chunk)]
+    with open(dest_path, "wb+") as f:
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size) as buf:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [
+                    executor.submit(_fetch_range, media_url, headers, start, end, buf)
+                    for start, end in ranges
+                ]
+                for future in as_completed(futures):
+                    future.result()
+            buf.flush()
+
+
+def download_audio_ranged(url, out_dir="audio_input", workers=8, quiet_yt_dlp=True):
+    """
+    Download a single large audio file over several parallel HTTP connections.
+
+    yt-dlp only resolves the direct media URL; the file is then fetched in
+    `workers` concurrent byte ranges into a pre-allocated memory map and
+    converted to MP3 with ffmpeg. Falls back to download_audio when requests is
+    missing, the format is fragmented (HLS/DASH), or the server does not
+    support byte ranges.
+    Returns the path to the downloaded MP3 file.
+    Raises ImportError if yt-dlp is not installed.
+    Raises FileNotFoundError if ffmpeg is not found (for MP3 conversion).
+    Raises Exception for download/network errors.
+    """
+    _import_yt_dlp()
+    ffmpeg_path = _find_ffmpeg()
+
+    def _fallback(reason):
+        log.info("Ranged download not possible for %s (%s); using yt-dlp downloader.", url, reason)
+        return download_audio(url, out_dir=out_dir, quiet_yt_dlp=quiet_yt_dlp)
+
+    if requests is None:
+        return _fallback("requests not installed")
+
+    try:
+        ydl = _ydl_for({"format": "bestaudio/best", "quiet": quiet_yt_dlp, "noplaylist": True})
+        info = ydl.extract_info(url, download=False)
+    except Exception as e:
+        log.error("Could not resolve media URL for %s: %s", url, e)
+        raise Exception(f"Audio download failed (metadata lookup): {e}") from e
+
+    media_url = info.get("url")
+    if not media_url or info.get("fragments") or not str(info.get("protocol", "https")).startswith("http"):
+        return _fallback("no single direct media URL")
+    headers = info.get("http_headers") or {}
+
+    try:
+        head = requests.head(media_url, headers=headers, allow_redirects=True, timeout=30)
+        size = int(head.headers.get("Content-Length", 0))
+        accepts_ranges = head.headers.get("Accept-Ranges", "").lower() == "bytes"
+    except (requests.RequestException, ValueError) as e:
+        return _fallback(f"HEAD failed: {e}")
+    if not size or not accepts_ranges:
+        return _fallback("server does not advertise byte ranges")
+
+    _ensure_out_dir(out_dir)
+    video_id = info.get("id") or "download"
+    raw_path = os.path.join(out_dir, f"{video_id}.{info.get('ext') or 'bin'}.part")
+    mp3_path = os.path.join(out_dir, f"{video_id}.mp3")
+
+    log.info("Downloading %s bytes from %s in %s parallel ranges.", size, url, workers)
+    try:
+        _download_ranges(media_url, headers, size, raw_path, max(1, workers))
+        subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y", "-i", raw_path, "-vn",
+             "-codec:a", "libmp3lame", "-b:a", "192k", "-threads", "0", mp3_path],
+            check=True, capture_output=True,
+        )
+    except subprocess.CalledProcessError as e:
+        log.error("ffmpeg conversion failed for %s: %s", url, e.stderr)
+        raise Exception(f"Audio download processing failed: ffmpeg exited with {e.returncode}") from e
+    except Exception as e:
+        log.error("Ranged download failed for %s: %s", url, e)
+        raise Exception(f"Audio download failed: {e}") from e
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    log.info("Audio downloaded and processed to: %s", mp3_path)
+    return mp3_path
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Download audio from a URL (YouTube, SoundCloud, etc.)")
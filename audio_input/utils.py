@@ -3,7 +3,10 @@ Audio file utilities for validation and preprocessing.
 """
 
 import os
+import stat
+import shutil
 import mimetypes
+import subprocess
 from typing import Set
 
 from config import ALLOWED_AUDIO_EXTENSIONS as ALLOWED_EXTENSIONS, MAX_AUDIO_FILE_SIZE_MB as MAX_FILE_SIZE_MB
@@ -67,7 +70,12 @@ def check_audio_file(filepath: str) -> bool:
     Raises:
         ValueError: With a descriptive message if any check fails.
     """
-    if not os.path.isfile(filepath):
+    # A single stat() serves both the existence and the size checks.
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        raise ValueError(f"File does not exist: {filepath}")
+    if not stat.S_ISREG(st.st_mode):
         raise ValueError(f"File does not exist: {filepath}")
     if not is_allowed_audio_file(filepath):
         # Sort extensions for consistent error message
@@ -75,7 +83,36 @@ def check_audio_file(filepath: str) -> bool:
         raise ValueError(f"Unsupported file type: {filepath}. Allowed types: {', '.join(sorted_extensions)}")
     if not is_valid_audio_mime(filepath):
         raise ValueError(f"Invalid audio MIME type for file: {filepath}")
-    if not is_file_size_ok(filepath):
+    if st.st_size / (1024 * 1024) > MAX_FILE_SIZE_MB:
         raise ValueError(f"File too large (>{MAX_FILE_SIZE_MB} MB): {filepath}")
     # Optionally: add more checks for corruption or decoding here
     return True
+
+def decode_audio_pcm(filepath: str, sample_rate: int = 44100) -> bytes:
+    """
+    Decodes an audio file once with ffmpeg to mono 32-bit float PCM.
+
+    Args:
+        filepath (str): The path to the audio file.
+        sample_rate (int): The output sample rate in Hz.
+
+    Returns:
+        bytes: Raw little-endian float32 samples.
+
+    Raises:
+        FileNotFoundError: If ffmpeg is not on PATH.
+        ValueError: If ffmpeg cannot decode the file.
+    """
+    ffmpeg_path = shutil.which("ffmpeg")
+    if not ffmpeg_path:
+        raise FileNotFoundError("ffmpeg not found in PATH. It is required for audio decoding.")
+    proc = subprocess.run(
+        [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-i", filepath,
+         "-f", "f32le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        raise ValueError(
+            f"Could not decode audio file {filepath}: {proc.stderr.decode(errors='replace').strip()}"
+        )
+    return proc.stdout
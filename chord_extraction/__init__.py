@@ -1,7 +1,7 @@
 """
 Unified chord extraction interface.
 
-Provides get_chords(audio_path) which tries multiple backends (Chordino, autochord, chord-extractor)
+Provides get_chords(audio_path) which tries multiple backends (autochord, chord-extractor, Essentia)
 and returns a list of dicts: [{"time": float, "chord": str}, ...].
 
 Backends are tried in order of preference. If one fails, the next is used.
@@ -11,63 +11,105 @@ Example usage:
     chords = get_chords("audio_input/song.mp3")
 """
 
-from . import autochord_util
-from . import chord_extractor_util
-from .backend_registry import _registered_plugins
+# Backend modules are imported lazily by extract_chords_with_fallback so that
+# importing this package does not pull in heavy ML dependencies.
+from .backend_registry import _registered_plugins, ChordEvent
+import atexit
+import functools
+import importlib.util
 import logging
 import shutil
-from typing import List, Dict, Callable, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Callable, Any, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import os
-import mimetypes
 import tempfile
-from audio_input.downloader import download_audio # New import
+from audio_input.downloader import (
+    download_audio_cached, download_audio_many, stream_audio_pcm
+)
+
+log = logging.getLogger(__name__)
+
+# Extensions accepted by get_chords; checked directly instead of via mimetypes.
+_AUDIO_EXTS = frozenset({'.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac', '.opus', '.webm'})
 
 def register_chord_extraction_backend(backend_func: Callable[[str], List[Dict[str, Any]]]) -> None:
     """Register a custom chord extraction backend."""
     from .backend_registry import register_plugin_backend
     register_plugin_backend(backend_func)
 
+@functools.lru_cache(maxsize=1)
 def check_backend_availability() -> Dict[str, bool]:
-    """Check which chord extraction backends are available on this system."""
+    """
+    Check which chord extraction backends are available on this system.
+
+    Backends are located with importlib.util.find_spec rather than imported, so
+    heavy dependencies (e.g. TensorFlow via autochord) are never loaded here.
+    The result is cached for the life of the process and must be treated as
+    read-only; call check_backend_availability.cache_clear() after installing
+    or removing a backend.
+    """
     availability = {}
     # Chordino (pyvamp)
-    try:
-        import vamp
-        availability['chordino'] = True
-    except ImportError:
-        availability['chordino'] = False
+    availability['chordino'] = importlib.util.find_spec("vamp") is not None
     # autochord
-    try:
-        import autochord
-        availability['autochord'] = True
-    except ImportError:
-        availability['autochord'] = False
+    availability['autochord'] = importlib.util.find_spec("autochord") is not None
     # chord-extractor CLI
     availability['chord_extractor'] = shutil.which('chord-extractor') is not None
+    # Essentia
+    availability['essentia'] = importlib.util.find_spec("essentia") is not None
     return availability
 
-def get_chords(audio_input_source: str) -> List[Dict[str, Any]]:
+def _get_chords_streamed(url: str) -> List[Dict[str, Any]]:
+    """
+    Decode a URL straight into memory and run the array-capable backend on it.
+    Returns [] if streaming is not possible so the caller can fall back.
+    """
+    from .essentia_wrapper import EssentiaBackend, ESSENTIA_SAMPLE_RATE
+    if not EssentiaBackend.is_available():
+        return []
+    try:
+        import numpy as np  # Always present alongside essentia
+        pcm = stream_audio_pcm(url, sample_rate=ESSENTIA_SAMPLE_RATE)
+        samples = np.frombuffer(pcm, dtype=np.float32)
+        from .postprocess import merge_consecutive_chords
+        return merge_consecutive_chords(
+            EssentiaBackend.extract_chords_from_array(samples, ESSENTIA_SAMPLE_RATE)
+        )
+    except Exception as e:
+        log.warning(f"Streamed extraction failed for {url}, falling back to download: {e}")
+        return []
+
+def _check_audio_ext(audio_path: str) -> None:
+    """Raise ValueError unless the path has a supported audio extension."""
+    # Skip the audio type check for .txt test files
+    ext = os.path.splitext(audio_path)[1].lower()
+    if ext != '.txt' and ext not in _AUDIO_EXTS:
+        log.error(f"Unsupported or invalid audio file type: {audio_path}")
+        raise ValueError(f"Unsupported or invalid audio file type: {audio_path}")
+
+def get_chords(audio_input_source: str, stream: bool = False) -> List[Dict[str, Any]]:
     """
     Extract chords from an audio file or URL using registered backends and plugins.
-    If a URL is provided, the audio will be downloaded to a temporary file first.
+    If a URL is provided, the audio is fetched through the persistent download cache first.
+    With stream=True, a URL is first decoded in memory (no file written) for the
+    Essentia backend; the cached-download path is used if that yields nothing.
     """
-    log = logging.getLogger("chord_extraction")
 
     is_url = audio_input_source.startswith(("http://", "https://"))
-    temp_file_path = None
     processed_audio_path = audio_input_source
 
+    if is_url and stream:
+        chords = _get_chords_streamed(audio_input_source)
+        if chords:
+            return chords
+
     if is_url:
         try:
             log.info(f"Downloading audio from URL: {audio_input_source}")
-            # Create a temporary directory for the downloaded file
-            temp_dir = tempfile.mkdtemp()
-            # download_audio returns the full path to the downloaded file
-            downloaded_full_path = download_audio(audio_input_source, out_dir=temp_dir)
-            processed_audio_path = downloaded_full_path
-            temp_file_path = processed_audio_path # Store for cleanup
-            log.info(f"Audio downloaded to: {processed_audio_path}")
+            # Served from (or stored in) the persistent audio cache; not deleted afterwards.
+            # Chord analysis decodes any codec, so skip the MP3 re-encode.
+            processed_audio_path = download_audio_cached(audio_input_source, prefer_passthrough=True)
+            log.info(f"Audio available at: {processed_audio_path}")
         except Exception as e:
             log.error(f"Failed to download audio from URL {audio_input_source}: {e}")
             raise RuntimeError(f"Failed to download audio: {e}")
@@ -78,53 +120,150 @@ def get_chords(audio_input_source: str) -> List[Dict[str, Any]]:
             raise FileNotFoundError(f"Audio file not found: {audio_input_source}")
         processed_audio_path = audio_input_source
 
-    # Skip mime type check for .txt test files (or if it's a downloaded file that might not have a standard extension yet)
-    if not processed_audio_path.endswith('.txt'):
-        mime, _ = mimetypes.guess_type(processed_audio_path)
-        if not (mime and mime.startswith("audio")):
-            log.error(f"Unsupported or invalid audio file type: {processed_audio_path}")
-            raise ValueError(f"Unsupported or invalid audio file type: {processed_audio_path}")
+    _check_audio_ext(processed_audio_path)
 
     from .backend_registry import extract_chords_with_fallback # Import here to avoid circular dependency if backend_registry imports get_chords
+    return extract_chords_with_fallback(processed_audio_path)
+
+def _batch_worker(audio_path: str) -> List[Dict[str, Any]]:
+    """Top-level (picklable) entry point used by the batch process pool."""
+    return get_chords(audio_path)
+
+def _extraction_is_subprocess_bound() -> bool:
+    """
+    True when the chord-extractor CLI is the only usable backend.
+    Its work happens in a child process, so threads are enough to overlap
+    files and the per-worker process startup can be skipped.
+    """
+    availability = check_backend_availability()
+    in_process = availability.get('autochord') or availability.get('essentia')
+    return bool(availability.get('chord_extractor')) and not in_process and not _registered_plugins
+
+def _batch_via_cli(local_for_input: Dict[str, str], backend) -> Dict[str, Any]:
+    """Validate local inputs, then extract them all with one backend batch call."""
+    results: Dict[str, Any] = {}
+    runnable: Dict[str, str] = {}
+    for input_path, local_path in local_for_input.items():
+        try:
+            if not os.path.isfile(local_path):
+                raise FileNotFoundError(f"Audio file not found: {local_path}")
+            _check_audio_ext(local_path)
+            runnable[input_path] = local_path
+        except Exception as e:
+            results[input_path] = {"error": str(e)}
+    extracted = backend.extract_chords_batch(list(dict.fromkeys(runnable.values())))
+    for input_path, local_path in runnable.items():
+        results[input_path] = extracted[local_path]
+    return results
+
+_TMP_POOL: Optional[tempfile.TemporaryDirectory] = None
+
+def _tmp_pool_dir() -> str:
+    """
+    Return the process-wide scratch directory for batch downloads.
+    It is created on first use and removed at interpreter exit, so batches
+    don't pay a mkdtemp/rmdir pair each.
+    """
+    global _TMP_POOL
+    if _TMP_POOL is None:
+        _TMP_POOL = tempfile.TemporaryDirectory(prefix="acoustical_")
+        atexit.register(_TMP_POOL.cleanup)
+    return _TMP_POOL.name
+
+def _cleanup_temp_download(path: str) -> None:
+    """Remove a downloaded temporary file; the pooled directory is kept."""
     try:
-        chords = extract_chords_with_fallback(processed_audio_path)
-        return chords
-    finally:
-        # Clean up temporary downloaded file and directory if applicable
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.remove(temp_file_path)
-                # Also remove the temporary directory if it's empty
-                if os.path.exists(os.path.dirname(temp_file_path)) and not os.listdir(os.path.dirname(temp_file_path)):
-                    os.rmdir(os.path.dirname(temp_file_path))
-            except OSError as e:
-                log.warning(f"Failed to clean up temporary file {temp_file_path}: {e}")
-
-def get_chords_batch(audio_paths: List[str], parallel: bool = True) -> Dict[str, Any]:
-    """Batch process multiple audio files for chord extraction."""
-    results = {}
-    log = logging.getLogger("chord_extraction")
-    if parallel:
-        with ThreadPoolExecutor() as executor:
-            future_to_path = {executor.submit(get_chords, path): path for path in audio_paths}
-            for future in as_completed(future_to_path):
-                path = future_to_path[future]
-                try:
-                    results[path] = future.result()
-                except Exception as e:
-                    log.error(f"Batch extraction failed for {path}: {e}")
-                    results[path] = {"error": str(e)}
-    else:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        log.warning(f"Failed to clean up temporary file {path}: {e}")
+
+def get_chords_batch(
+    audio_paths: List[str], parallel: bool = True, max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Batch process multiple audio files or URLs for chord extraction.
+
+    In parallel mode the work is split in two phases: URL inputs are downloaded
+    on a small thread pool (I/O-bound), then every local file is handed to a
+    process pool (CPU-bound) so extraction scales with the number of cores.
+    When the chord-extractor CLI is the only usable backend a thread pool is
+    used instead, since each extraction already runs in its own subprocess;
+    if that CLI has a batch mode, all files go through one CLI process.
+    Results are keyed by the original input path/URL; failures map to
+    ``{"error": str}``.
+
+    Note: worker processes re-import the package, so plugins registered at
+    runtime are only visible to them on platforms that fork (Linux).
+    """
+    results: Dict[str, Any] = {}
+
+    if not parallel:
         for path in audio_paths:
             try:
                 results[path] = get_chords(path)
             except Exception as e:
                 log.error(f"Batch extraction failed for {path}: {e}")
                 results[path] = {"error": str(e)}
+        return results
+
+    # Phase 1: download URL inputs concurrently through one shared yt-dlp instance.
+    urls = [p for p in audio_paths if p.startswith(("http://", "https://"))]
+    local_for_input: Dict[str, str] = {
+        p: p for p in audio_paths if not p.startswith(("http://", "https://"))
+    }
+    downloaded: List[str] = []
+    if urls:
+        try:
+            downloads = download_audio_many(
+                urls, out_dir=_tmp_pool_dir(), concurrency=min(8, len(urls)),
+                prefer_passthrough=True,
+            )
+        except Exception as e:  # e.g. yt-dlp or ffmpeg missing
+            downloads = {url: {"error": str(e)} for url in urls}
+        for url, outcome in downloads.items():
+            if isinstance(outcome, dict):
+                log.error(f"Batch download failed for {url}: {outcome['error']}")
+                results[url] = {"error": f"Failed to download audio: {outcome['error']}"}
+            else:
+                local_for_input[url] = outcome
+                downloaded.append(outcome)
+
+    # Phase 2: extract chords from local files on a process pool (CPU-bound).
+    try:
+        if local_for_input and _extraction_is_subprocess_bound():
+            from .chord_extractor_util import ChordExtractorBackend
+            if ChordExtractorBackend.supports_batch():
+                results.update(_batch_via_cli(local_for_input, ChordExtractorBackend))
+                local_for_input = {}
+        if local_for_input:
+            workers = max_workers or min(os.cpu_count() or 1, len(local_for_input))
+            executor_cls = (
+                ThreadPoolExecutor if _extraction_is_subprocess_bound() else ProcessPoolExecutor
+            )
+            with executor_cls(max_workers=workers) as executor:
+                future_to_input = {
+                    executor.submit(_batch_worker, local_path): input_path
+                    for input_path, local_path in local_for_input.items()
+                }
+                for future in as_completed(future_to_input):
+                    input_path = future_to_input[future]
+                    try:
+                        results[input_path] = future.result()
+                    except Exception as e:
+                        log.error(f"Batch extraction failed for {input_path}: {e}")
+                        results[input_path] = {"error": str(e)}
+    finally:
+        for local_path in downloaded:
+            _cleanup_temp_download(local_path)
     return results
 
 # Example plugin for demonstration and testing
-def example_plugin_backend(audio_path: str) -> List[Dict[str, Any]]:
-    """Example plugin backend for chord extraction."""
-    logging.getLogger("chord_extraction").info(f"Plugin backend called for {audio_path}")
-    return [{"time": 0.0, "chord": "PluginC"}, {"time": 1.0, "chord": "PluginG"}]
+def example_plugin_backend(audio_path: str) -> List[ChordEvent]:
+    """
+    Example plugin backend for chord extraction.
+    Plugins may return ChordEvent tuples; get_chords converts them to dicts.
+    """
+    log.info(f"Plugin backend called for {audio_path}")
+    return [ChordEvent(0.0, "PluginC"), ChordEvent(1.0, "PluginG")]
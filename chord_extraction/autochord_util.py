@@ -2,7 +2,9 @@
 Chord extraction using autochord as a backend class.
 """
 
+import functools
 import logging
+import sys
 from typing import Dict, List, Union
 
 from chord_extraction.backend_registry import (
@@ -10,13 +12,23 @@ from chord_extraction.backend_registry import (
     register_backend,
 )
 
-try:
-    from autochord import guess_chords
-except ImportError:
-    guess_chords = None
+log = logging.getLogger(__name__)
 
+# Resolved on first use by _load_autochord(); autochord imports TensorFlow,
+# which takes seconds, so it is not imported with this module.
+guess_chords = None
 
-log = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
+def _load_autochord():
+    """Import autochord once, returning guess_chords or None if unavailable."""
+    global guess_chords
+    try:
+        from autochord import guess_chords as _guess_chords
+    except ImportError:
+        return None
+    guess_chords = _guess_chords
+    return _guess_chords
 
 
 class AutochordBackend(ChordExtractionBackend):
@@ -24,7 +36,7 @@ class AutochordBackend(ChordExtractionBackend):
 
     @classmethod
     def is_available(cls) -> bool:
-        return guess_chords is not None
+        return guess_chords is not None or _load_autochord() is not None
 
     @classmethod
     def extract_chords(cls, audio_path: str) -> List[Dict[str, Union[float, str]]]:
@@ -32,13 +44,14 @@ class AutochordBackend(ChordExtractionBackend):
             log.warning("autochord is not installed. Skipping autochord backend.")
             return []
         try:
-            log.info(f"Extracting chords from {audio_path} using autochord.")
+            log.info("Extracting chords from %s using autochord.", audio_path)
             chords = guess_chords(audio_path)
-            return [{"time": float(t), "chord": str(c)} for t, c in chords]
+            # A song uses a small chord vocabulary across thousands of frames;
+            # interning shares one string object per distinct label.
+            intern = sys.intern
+            return [{"time": float(t), "chord": intern(str(c))} for t, c in chords]
         except Exception as e:
-            log.error(
-                f"autochord extraction failed for {audio_path}: {e}", exc_info=True
-            )
+            log.error("autochord extraction failed for %s: %s", audio_path, e, exc_info=True)
             raise RuntimeError(f"autochord extraction failed: {e}") from e
 
 
@@ -4,8 +4,35 @@ Backend registry for chord extraction plugins.
 Manages registration and fallback logic for chord extraction backends.
 """
 
-from typing import List, Dict, Any, Callable
+import functools
+import importlib
+import logging
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, Sequence, Tuple, Union
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import BACKEND_ORDER, RACE_BACKENDS
+from . import result_cache
+
+log = logging.getLogger(__name__)
+
+
+class ChordEvent(NamedTuple):
+    """Lightweight (time, chord) pair a backend may return instead of a dict."""
+    time: float
+    chord: str
+
+
+def _as_dicts(
+    events: Sequence[Union[ChordEvent, Dict[str, Any]]]
+) -> List[Dict[str, Any]]:
+    """
+    Convert ChordEvent/(time, chord) results to the public list-of-dicts form.
+    Dict results and empty/None results are passed through unchanged.
+    """
+    if not events or isinstance(events[0], dict):
+        return events
+    return [{"time": float(t), "chord": c} for t, c in events]
 
 
 class ChordExtractionBackend(ABC):
@@ -53,23 +80,148 @@ def get_registered_plugins() -> List[Callable]:
     return list(_registered_plugins)
 
 
-def extract_chords_with_fallback(audio_path: str) -> List[Dict[str, Any]]:
-    """Try each backend in order until one succeeds."""
-    # Try built-in backends first
-    # Updated to use essentia_wrapper instead of chordino_wrapper
-    from . import autochord_util, chord_extractor_util, essentia_wrapper
-
-    for backend in [
-        autochord_util.AutochordBackend.extract_chords,
-        chord_extractor_util.ChordExtractorBackend.extract_chords,
-        essentia_wrapper.EssentiaBackend.extract_chords,
-        *_registered_plugins,  # Then try registered plugins
-    ]:
+def _decode_audio(audio_path: str, sample_rate: int):
+    """
+    Decode a file to a mono float32 NumPy array for an array-capable backend.
+    Not cached: a decode is tens of MB and repeat files hit result_cache.
+    """
+    import numpy as np  # Only needed by array-capable backends
+    from audio_input.utils import decode_audio_pcm
+
+    return np.frombuffer(decode_audio_pcm(audio_path, sample_rate), dtype=np.float32)
+
+
+def _call_backend(backend: Callable, audio_path: str) -> List[Dict[str, Any]]:
+    """
+    Run one backend. Classes that provide extract_chords_from_array (and a
+    sample_rate) get a decoded buffer instead of re-reading the file.
+    Runs of the same chord (frame-level backends repeat it) are collapsed to
+    their first event.
+    """
+    owner = getattr(backend, "__self__", None)
+    from_array = getattr(owner, "extract_chords_from_array", None)
+    events = None
+    if from_array is not None and owner.is_available():
+        sample_rate = getattr(owner, "sample_rate", 44100)
         try:
-            result = backend(audio_path)
+            samples = _decode_audio(audio_path, sample_rate)
+        except Exception as e:
+            log.debug(f"Decode failed for {audio_path}, using file path: {e}")
+        else:
+            events = _as_dicts(from_array(samples, sample_rate))
+    if events is None:
+        events = _as_dicts(backend(audio_path))
+    if not events:
+        return events
+    from .postprocess import merge_consecutive_chords  # numpy/numba only once extracting
+    return merge_consecutive_chords(events)
+
+
+def _order_builtins(
+    backends: Sequence[Tuple[str, str, str]], order: Sequence[str]
+) -> List[Tuple[str, str, str]]:
+    """Stable-sort backends by their name's position in `order`; unlisted ones go last."""
+    rank = {name: i for i, name in enumerate(order)}
+    return sorted(backends, key=lambda backend: rank.get(backend[0], len(rank)))
+
+
+# Built-in backends in fallback order: (availability key, module, class).
+# Sorted once here by config.BACKEND_ORDER so lookups never re-sort.
+_BUILTIN_BACKENDS = _order_builtins(
+    [
+        ("autochord", "autochord_util", "AutochordBackend"),
+        ("chord_extractor", "chord_extractor_util", "ChordExtractorBackend"),
+        ("essentia", "essentia_wrapper", "EssentiaBackend"),
+    ],
+    BACKEND_ORDER,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _builtin_backend_classes(enabled: Tuple[str, ...]) -> Tuple[type, ...]:
+    """Resolve (once per availability set) the built-in backend classes to try."""
+    return tuple(
+        getattr(importlib.import_module(f".{module_name}", __package__), class_name)
+        for name, module_name, class_name in _BUILTIN_BACKENDS
+        if name in enabled
+    )
+
+
+def _race_backends(
+    backends: Sequence[Callable], audio_path: str
+) -> Optional[List[Dict[str, Any]]]:
+    """Run backends concurrently and return the first non-empty result, if any."""
+    executor = ThreadPoolExecutor(max_workers=len(backends))
+    try:
+        futures = [
+            executor.submit(_call_backend, backend, audio_path) for backend in backends
+        ]
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception:  # noqa: E722
+                continue
             if result:
                 return result
-        except Exception:  # noqa: E722
-            continue
+        return None
+    finally:
+        # Don't block on slower backends once a winner is known.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _backends_tag(backends: Sequence[Callable]) -> str:
+    """Name the backend set, so cached results are only reused for the same one."""
+    return ",".join(
+        f"{getattr(b, '__module__', '')}.{getattr(b, '__qualname__', None) or repr(b)}"
+        for b in backends
+    )
+
+
+def extract_chords_with_fallback(
+    audio_path: str, race: Optional[bool] = None
+) -> List[Dict[str, Any]]:
+    """
+    Try each backend in order until one succeeds.
+
+    With race=True (default: the RACE_BACKENDS environment variable), all
+    backends run concurrently in threads and the first non-empty result wins.
+    The heavy backends spend their time in native code that releases the GIL.
+    Successful results are cached on disk per (file, mtime, size); see
+    chord_extraction.result_cache.
+    """
+    from . import check_backend_availability
+
+    # Try built-in backends first, skipping (and not even importing) the ones
+    # the cached availability probe reports as missing.
+    availability = check_backend_availability()
+    enabled = tuple(name for name, _, _ in _BUILTIN_BACKENDS if availability.get(name, True))
+    # extract_chords is looked up per call so patched/rebound methods are honoured;
+    # the tuple also snapshots the plugin list against concurrent registration.
+    backends: Tuple[Callable, ...] = (
+        *(cls.extract_chords for cls in _builtin_backend_classes(enabled)),
+        *_registered_plugins,  # Then try registered plugins
+    )
+    if not backends:
+        raise RuntimeError("All chord extraction backends failed or returned no results.")
+
+    tag = _backends_tag(backends)
+    cached = result_cache.get_cached(audio_path, tag)
+    if cached:
+        return cached
+
+    if RACE_BACKENDS if race is None else race:
+        result = _race_backends(backends, audio_path)
+        if result:
+            result_cache.put_cached(audio_path, result, tag)
+            return result
+    else:
+        for backend in backends:
+            try:
+                result = _call_backend(backend, audio_path)
+                if result:
+                    result_cache.put_cached(audio_path, result, tag)
+                    return result
+            except Exception:  # noqa: E722
+                continue
 
     raise RuntimeError("All chord extraction backends failed or returned no results.")
@@ -2,21 +2,103 @@
 Chord extraction using chord-extractor backend as a backend class.
 """
 
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
+import functools
 import subprocess
 import json
 import logging
 import shutil
+import tempfile
+import threading
 from chord_extraction.backend_registry import ChordExtractionBackend, register_backend
+from common.utils import loads_json
+
+try:
+    import ijson  # Optional: parse chord-extractor output incrementally
+except ImportError:
+    ijson = None
 
 log = logging.getLogger(__name__) # Module-level logger
 
+CHORD_EXTRACTOR_TIMEOUT = 120  # seconds
+
+# Decode errors from whichever JSON parser is in use
+_JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+@functools.lru_cache(maxsize=1)
+def _find_chord_extractor() -> Optional[str]:
+    """Resolve the chord-extractor CLI on PATH once per process."""
+    return shutil.which('chord-extractor')
+
+
+@functools.lru_cache(maxsize=1)
+def _supports_batch_mode() -> bool:
+    """Whether the installed CLI advertises --stdin-paths (probed once via --help)."""
+    exe = _find_chord_extractor()
+    if exe is None:
+        return False
+    try:
+        result = subprocess.run([exe, "--help"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return "--stdin-paths" in result.stdout + result.stderr
+
+
+def _is_chord_item(item) -> bool:
+    return isinstance(item, dict) and "time" in item and "chord" in item
+
+
+def _is_chord_list(chords) -> bool:
+    """
+    Cheap shape check for a fully parsed CLI result. Only the first and last
+    items are inspected: malformed output is broken throughout, and a full pass
+    here would just repeat the consumer's own loop. (The streaming parser
+    checks every item as it arrives instead.)
+    """
+    return isinstance(chords, list) and (
+        not chords or (_is_chord_item(chords[0]) and _is_chord_item(chords[-1]))
+    )
+
+def _match_batch_lines(
+    audio_paths: List[str], lines: List[str]
+) -> Dict[str, Union[List[Dict[str, Union[float, str]]], Dict[str, str]]]:
+    """
+    Pair batch output lines with their input paths by the "path" each names.
+
+    Returns {} (so every file is re-run on its own) unless there is exactly
+    one well-formed line per input path; a line whose chords are malformed
+    only marks that path as failed.
+    """
+    if len(lines) != len(audio_paths):
+        log.warning(f"chord-extractor batch answered {len(lines)} lines for {len(audio_paths)} files; extracting per file")
+        return {}
+    expected = set(audio_paths)
+    results: Dict[str, Union[List[Dict[str, Union[float, str]]], Dict[str, str]]] = {}
+    for line in lines:
+        try:
+            answer = loads_json(line)
+        except _JSON_ERRORS:
+            answer = None
+        path = answer.get("path") if isinstance(answer, dict) else None
+        if not isinstance(path, str) or path not in expected or path in results:
+            log.warning(f"Unmatched chord-extractor batch line, extracting per file: {line[:200]}")
+            return {}
+        chords = answer.get("chords")
+        if _is_chord_list(chords):
+            results[path] = chords
+        else:
+            log.error(f"Invalid batch output from chord-extractor for {path}: {line[:200]}")
+            results[path] = {"error": "Invalid output format from chord-extractor"}
+    return results
+
+
 class ChordExtractorBackend(ChordExtractionBackend):
     name = "chord_extractor"
 
     @classmethod
     def is_available(cls) -> bool:
-        return shutil.which('chord-extractor') is not None
+        return _find_chord_extractor() is not None
 
     @classmethod
     def extract_chords(cls, audio_path: str) -> List[Dict[str, Union[float, str]]]:
@@ -26,27 +108,21 @@ class ChordExtractorBackend(ChordExtractionBackend):
             raise RuntimeError("chord-extractor CLI is not installed or not in PATH.")
         try:
             log.info(f"Running chord-extractor CLI on {audio_path}")
-            result = subprocess.run(
-                ["chord-extractor", "--input", audio_path, "--output-format", "json"],
-                capture_output=True, text=True, check=True, timeout=120
-            )
-            chords = json.loads(result.stdout)
-            # Validate output format
-            if not isinstance(chords, list) or not all(isinstance(c, dict) and "time" in c and "chord" in c for c in chords):
-                log.error(f"Invalid output format from chord-extractor: {result.stdout[:200]}") # Log part of output
-                raise ValueError("Invalid output format from chord-extractor")
+            if ijson is not None:
+                chords = cls._run_streaming(audio_path)
+            else:
+                chords = cls._run_buffered(audio_path)
             log.info(f"Extracted {len(chords)} chords from {audio_path} using chord-extractor.")
             return chords
         except subprocess.TimeoutExpired as e:
             log.error(f"chord-extractor timed out for {audio_path}: {e}")
             raise RuntimeError("chord-extractor backend timed out") from e
-        except json.JSONDecodeError as e:
-            # Ensure result is defined in this scope if json.loads fails early
-            # It's defined after subprocess.run, so it should be fine.
-            log.error(f"Failed to decode JSON output from chord-extractor for {audio_path}: {e}. Output: {result.stdout[:200] if 'result' in locals() and hasattr(result, 'stdout') else 'N/A'}")
+        except _JSON_ERRORS as e:
+            log.error(f"Failed to decode JSON output from chord-extractor for {audio_path}: {e}")
             raise RuntimeError("chord-extractor returned invalid JSON") from e
         except subprocess.CalledProcessError as e:
-            log.error(f"chord-extractor CLI returned non-zero exit code for {audio_path}: {e.returncode}. Stderr: {e.stderr}")
+            stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+            log.error(f"chord-extractor CLI returned non-zero exit code for {audio_path}: {e.returncode}. Stderr: {stderr}")
             raise RuntimeError("chord-extractor CLI failed") from e
         except ValueError as e: # Catch the specific ValueError from our validation
             log.error(f"Output validation failed for chord-extractor output from {audio_path}: {e}")
@@ -55,5 +131,142 @@ class ChordExtractorBackend(ChordExtractionBackend):
             log.error(f"chord-extractor backend failed for {audio_path} with an unexpected error: {e}")
             raise RuntimeError("chord-extractor backend failed with an unexpected error") from e
 
+    @classmethod
+    def supports_batch(cls) -> bool:
+        """True if one CLI process can be fed many paths (see extract_chords_batch)."""
+        return cls.is_available() and _supports_batch_mode()
+
+    @classmethod
+    def extract_chords_batch(
+        cls, audio_paths: List[str]
+    ) -> Dict[str, Union[List[Dict[str, Union[float, str]]], Dict[str, str]]]:
+        """
+        Extract chords for many files with a single chord-extractor process.
+
+        Paths are written to the CLI's stdin one per line and it answers with
+        one JSON object per line, ``{"path": str, "chords": [...]}``, naming
+        the input it belongs to. Results are matched on that path; if the
+        answers don't cover every input exactly once (a dropped, extra or
+        unrecognized line), the whole batch output is discarded and every
+        file is extracted one process per file, as when the CLI has no batch
+        mode.
+
+        Args:
+            audio_paths (List[str]): Local audio file paths.
+
+        Returns:
+            Dict[str, Union[list, Dict[str, str]]]: Chords per path, or
+                ``{"error": str}`` for paths that failed.
+        """
+        results: Dict[str, Union[List[Dict[str, Union[float, str]]], Dict[str, str]]] = {}
+        if audio_paths and cls.supports_batch():
+            log.info(f"Running chord-extractor in batch mode on {len(audio_paths)} files")
+            lines: List[str] = []
+            try:
+                proc = subprocess.run(
+                    cls._batch_command(),
+                    input="".join(f"{path}\n" for path in audio_paths),
+                    capture_output=True, text=True,
+                    timeout=CHORD_EXTRACTOR_TIMEOUT * len(audio_paths),
+                )
+                lines = proc.stdout.splitlines()
+                if proc.returncode != 0:
+                    log.warning(
+                        f"chord-extractor batch run exited with {proc.returncode} after "
+                        f"{len(lines)} of {len(audio_paths)} files: {proc.stderr[:200]}"
+                    )
+            except (OSError, subprocess.SubprocessError) as e:
+                log.warning(f"chord-extractor batch run failed, extracting per file: {e}")
+            results = _match_batch_lines(audio_paths, lines)
+
+        for path in audio_paths:
+            if path not in results:
+                try:
+                    results[path] = cls.extract_chords(path)
+                except Exception as e:
+                    results[path] = {"error": str(e)}
+        return results
+
+    @staticmethod
+    def _command(audio_path: str) -> List[str]:
+        return ["chord-extractor", "--input", audio_path, "--output-format", "json"]
+
+    @staticmethod
+    def _batch_command() -> List[str]:
+        return ["chord-extractor", "--stdin-paths", "--output-format", "jsonl"]
+
+    @classmethod
+    def _run_buffered(cls, audio_path: str) -> List[Dict[str, Union[float, str]]]:
+        """
+        Run the CLI to completion, then parse its whole stdout at once.
+        run() drains stdout and stderr concurrently and kills the process on
+        timeout; stdout stays bytes and goes to the parser without a decode pass.
+        """
+        result = subprocess.run(
+            cls._command(audio_path),
+            capture_output=True, check=True, timeout=CHORD_EXTRACTOR_TIMEOUT
+        )
+        chords = loads_json(result.stdout)
+        # Validate output format
+        if not _is_chord_list(chords):
+            log.error(f"Invalid output format from chord-extractor: {result.stdout[:200]}") # Log part of output
+            raise ValueError("Invalid output format from chord-extractor")
+        return chords
+
+    @classmethod
+    def _run_streaming(cls, audio_path: str) -> List[Dict[str, Union[float, str]]]:
+        """
+        Parse the CLI's JSON array with ijson while the process is still
+        writing it, validating each item as it arrives, so the full output is
+        never held as one string alongside the parsed list.
+        """
+        cmd = cls._command(audio_path)
+        timed_out = threading.Event()
+        # stderr goes to a temp file so a chatty CLI can't block on a full pipe.
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, bufsize=65536)
+            timer = threading.Timer(
+                CHORD_EXTRACTOR_TIMEOUT, lambda: (timed_out.set(), proc.kill())
+            )
+            timer.start()
+            try:
+                # JSON allows leading whitespace; anything but an array is invalid.
+                head = proc.stdout.peek(1)[:1]
+                while head.isspace():
+                    proc.stdout.read(1)
+                    head = proc.stdout.peek(1)[:1]
+                if head != b"[":
+                    if timed_out.is_set():
+                        raise subprocess.TimeoutExpired(cmd, CHORD_EXTRACTOR_TIMEOUT)
+                    proc.wait()
+                    if proc.returncode == 0:
+                        log.error(f"Invalid output format from chord-extractor: expected a JSON array, got {head!r}")
+                        raise ValueError("Invalid output format from chord-extractor")
+                    chords = []
+                else:
+                    chords = []
+                    for item in ijson.items(proc.stdout, "item", use_float=True):
+                        if not _is_chord_item(item):
+                            log.error(f"Invalid output item from chord-extractor: {str(item)[:200]}")
+                            raise ValueError("Invalid output format from chord-extractor")
+                        chords.append(item)
+                proc.wait()
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                if timed_out.is_set():
+                    raise subprocess.TimeoutExpired(cmd, CHORD_EXTRACTOR_TIMEOUT)
+                raise
+            finally:
+                timer.cancel()
+                proc.stdout.close()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, CHORD_EXTRACTOR_TIMEOUT)
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode(errors="replace")
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+        return chords
+
 # Register backend on import
 register_backend(ChordExtractorBackend)
@@ -2,32 +2,42 @@
 Chord extraction using Essentia as a backend class.
 """
 
+import functools
+import importlib.util
 import logging
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from chord_extraction.backend_registry import (
     ChordExtractionBackend,
     register_backend,
 )
 
-try:
-    import essentia
-    import essentia.standard as es
-
-    ESSENTIA_AVAILABLE = True
-    log = logging.getLogger(__name__)
-    log.debug("Essentia and essentia.standard imported successfully at module level.")
-except ImportError:
-    essentia = None  # type: ignore
-    es = None  # type: ignore
-    ESSENTIA_AVAILABLE = False
-    if "log" not in globals():
-        log = logging.getLogger(__name__)
-    log.debug(
-        "Essentia library not found at module level import, "
-        "EssentiaBackend will be unavailable."
-    )
+log = logging.getLogger(__name__)
 
+# Resolved on first use by _load_essentia(); essentia loads large C++ shared
+# libraries, so only its presence is checked when this module is imported.
+essentia = None  # type: ignore
+es = None  # type: ignore
+ESSENTIA_AVAILABLE = importlib.util.find_spec("essentia") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _load_essentia() -> bool:
+    """Import essentia and essentia.standard once, returning True on success."""
+    global essentia, es
+    try:
+        import essentia as _essentia
+        import essentia.standard as _es
+    except ImportError as e:
+        log.error(f"Essentia was found but could not be imported: {e}")
+        return False
+    essentia, es = _essentia, _es
+    log.debug("Essentia and essentia.standard imported successfully.")
+    return True
+
+
+# MonoLoader's default rate, which the beat tracker and chord detector assume.
+ESSENTIA_SAMPLE_RATE = 44100
 
 ESSENTIA_TO_COMMON_CHORD = {
     "maj": "",
@@ -40,8 +50,46 @@ ESSENTIA_TO_COMMON_CHORD = {
 }
 
 
+# Qualities Essentia may emit that are already in common notation
+_DIRECT_QUALITIES = frozenset({"7", "maj7", "m7", "dim7", "aug", "dim", "sus4", "sus2"})
+
+# Every quality -> suffix rewrite in one table (unlisted qualities pass through)
+_QUALITY_SUFFIX = {**ESSENTIA_TO_COMMON_CHORD, "major": "", "minor": "m"}
+
+
+def _format_label_uncached(essentia_label: str) -> str:
+    if essentia_label == "N":
+        return "N.C."
+    root, sep, quality = essentia_label.partition(":")
+    if not sep:
+        quality = "maj"
+    suffix = _QUALITY_SUFFIX.get(quality, quality)
+    if suffix.startswith(root) and len(suffix) > len(root):
+        return suffix
+    return root + suffix
+
+
+def _build_label_table() -> Dict[str, str]:
+    """Precompute formatted labels for every root/quality Essentia emits."""
+    roots = [
+        "C", "C#", "Db", "D", "D#", "Eb", "E", "F",
+        "F#", "Gb", "G", "G#", "Ab", "A", "A#", "Bb", "B",
+    ]
+    qualities = set(_QUALITY_SUFFIX) | _DIRECT_QUALITIES
+    labels = ["N"]
+    for root in roots:
+        labels += [root, root + "m"]
+        labels += [f"{root}:{quality}" for quality in qualities]
+    return {label: _format_label_uncached(label) for label in labels}
+
+
+# Labels are formatted once per beat, so look the common ones up instead.
+_LABEL_TABLE = _build_label_table()
+
+
 class EssentiaBackend(ChordExtractionBackend):
     name = "essentia"
+    sample_rate = ESSENTIA_SAMPLE_RATE
 
     @classmethod
     def is_available(cls) -> bool:
@@ -49,89 +97,158 @@ class EssentiaBackend(ChordExtractionBackend):
 
     @classmethod
     def _format_essentia_chord_label(cls, essentia_label: str) -> str:
-        if essentia_label == "N":
-            return "N.C."
-        parts = essentia_label.split(":")
-        root = parts[0]
-        quality = parts[1] if len(parts) > 1 else "maj"
-        suffix = ESSENTIA_TO_COMMON_CHORD.get(quality, quality)
-        if quality in ["7", "maj7", "m7", "dim7", "aug", "dim", "sus4", "sus2"]:
-            suffix = quality
-        elif quality == "major":
-            suffix = ""
-        elif quality == "minor":
-            suffix = "m"
-        if suffix.startswith(root) and len(suffix) > len(root):
-            return suffix
-        return root + suffix
+        formatted = _LABEL_TABLE.get(essentia_label)
+        if formatted is None:
+            formatted = _format_label_uncached(essentia_label)
+        return formatted
 
     @classmethod
-    def extract_chords(cls, audio_path: str) -> List[Dict[str, Union[float, str]]]:
+    def _check_ready(cls) -> bool:
         if not cls.is_available():
             log.warning("Essentia library is not installed. Skipping Essentia backend.")
-            return []
+            return False
 
-        if es is None:
+        if es is None and not _load_essentia():
             log.error(
-                "Essentia standard module (es) is None; "
+                "Essentia standard module (es) could not be loaded; "
                 "this should not happen if is_available passed."
             )
             raise RuntimeError(
                 "Essentia standard module not available for extraction "
                 "despite is_available passing."
             )
+        return True
+
+    @classmethod
+    def extract_chords(cls, audio_path: str) -> List[Dict[str, Union[float, str]]]:
+        if not cls._check_ready():
+            return []
 
         try:
             log.info(f"Extracting chords from {audio_path} using Essentia.")
 
             loader = es.MonoLoader(filename=audio_path)
             audio_samples = loader()
+        except Exception as e:
+            log.error(
+                f"Essentia chord extraction failed for {audio_path}: {e}",
+                exc_info=True,
+            )
+            raise RuntimeError(f"Essentia chord extraction failed: {e}") from e
+
+        return cls._extract_from_samples(audio_samples, audio_path)
+
+    @classmethod
+    def extract_chords_from_array(
+        cls, samples, sample_rate: int = ESSENTIA_SAMPLE_RATE
+    ) -> List[Dict[str, Union[float, str]]]:
+        """
+        Extract chords from mono float32 samples already in memory, e.g. audio
+        streamed from ffmpeg, skipping the file load entirely.
+        """
+        if not cls._check_ready():
+            return []
+        samples = cls._resample(samples, sample_rate)
+        return cls._extract_from_samples(samples, "<in-memory audio>")
+
+    @classmethod
+    def extract_chord_columns_from_array(
+        cls, samples, sample_rate: int = ESSENTIA_SAMPLE_RATE
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Like extract_chords_from_array, but returns columns instead of one dict
+        per beat: {"times": float32 ndarray, "chords": object ndarray}. Suited
+        to long recordings whose consumers can work on whole arrays; convert
+        with _chords_to_dicts when the list-of-dicts form is needed.
+
+        Returns:
+            Optional[Dict[str, Any]]: The columns, or None if Essentia is unavailable.
+        """
+        if not cls._check_ready():
+            return None
+        samples = cls._resample(samples, sample_rate)
+        return cls._columns_from_samples(samples, "<in-memory audio>")
+
+    @classmethod
+    def _resample(cls, samples, sample_rate: int):
+        try:
+            if sample_rate != ESSENTIA_SAMPLE_RATE:
+                samples = es.Resample(
+                    inputSampleRate=sample_rate, outputSampleRate=ESSENTIA_SAMPLE_RATE
+                )(samples)
+        except Exception as e:
+            log.error(f"Essentia resampling failed: {e}", exc_info=True)
+            raise RuntimeError(f"Essentia chord extraction failed: {e}") from e
+        return samples
 
+    @classmethod
+    def _extract_from_samples(
+        cls, audio_samples, source: str
+    ) -> List[Dict[str, Union[float, str]]]:
+        return _chords_to_dicts(cls._columns_from_samples(audio_samples, source))
+
+    @classmethod
+    def _columns_from_samples(cls, audio_samples, source: str) -> Dict[str, Any]:
+        import numpy as np  # Always present alongside essentia
+
+        try:
             # Use a simpler beat tracker as RhythmExtractor2013 is causing issues
             rhythm_extractor = es.BeatTrackerDegara()
             beats = rhythm_extractor(audio_samples)
-            log.debug(f"Essentia: Number of beats: {len(beats)}")
-            log.debug(f"Type of audio_samples: {type(audio_samples)}")
-            log.debug(f"Size of audio_samples: {audio_samples.size}")
-            log.debug(f"Type of beats: {type(beats)}")
-            log.debug(f"Size of beats: {beats.size}")
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(f"Essentia: Number of beats: {len(beats)}")
+                log.debug(f"Type of audio_samples: {type(audio_samples)}")
+                log.debug(f"Size of audio_samples: {audio_samples.size}")
+                log.debug(f"Type of beats: {type(beats)}")
+                log.debug(f"Size of beats: {beats.size}")
 
             if not beats.size:
                 log.warning(
-                    f"Essentia: No beats detected in {audio_path}. "
+                    f"Essentia: No beats detected in {source}. "
                     "Cannot perform beat-aligned chord detection."
                 )
-                return []
+                return {
+                    "times": np.empty(0, dtype=np.float32),
+                    "chords": np.empty(0, dtype=object),
+                }
 
             chord_detector = es.ChordsDetectionBeats()
 
-            # Explicitly ensure inputs are VectorReal
-            audio_samples_vr = essentia.VectorReal(audio_samples)
-            beats_vr = essentia.VectorReal(beats)
-            essentia_chords, chord_strength = chord_detector(
-                audio_samples_vr, beats_vr
-            )
+            # Essentia takes C-contiguous float32 arrays as-is; this is a no-op
+            # for decoded buffers and avoids dtype promotion for anything else.
+            audio_samples = np.ascontiguousarray(audio_samples, dtype=np.float32)
+            beats_f32 = np.ascontiguousarray(beats, dtype=np.float32)
+            try:
+                essentia_chords, chord_strength = chord_detector(audio_samples, beats_f32)
+            except TypeError:
+                # Older builds only accept VectorReal inputs
+                essentia_chords, chord_strength = chord_detector(
+                    essentia.VectorReal(audio_samples), essentia.VectorReal(beats_f32)
+                )
 
-            output_chords: List[Dict[str, Union[float, str]]] = []
-            for i, beat_time in enumerate(beats):
-                if i < len(essentia_chords):
-                    chord_label = essentia_chords[i]
-                    formatted_chord = cls._format_essentia_chord_label(chord_label)
-                    output_chords.append(
-                        {"time": float(beat_time), "chord": formatted_chord}
-                    )
-
-            log.info(
-                f"Extracted {len(output_chords)} chords from {audio_path} using Essentia."
-            )
-            return output_chords
+            # One chord per beat
+            n = min(len(beats), len(essentia_chords))
+            chords = np.empty(n, dtype=object)
+            chords[:] = [cls._format_essentia_chord_label(c) for c in essentia_chords[:n]]
+
+            log.info(f"Extracted {n} chords from {source} using Essentia.")
+            return {"times": np.asarray(beats[:n]), "chords": chords}
 
         except Exception as e:
             log.error(
-                f"Essentia chord extraction failed for {audio_path}: {e}",
+                f"Essentia chord extraction failed for {source}: {e}",
                 exc_info=True,
             )
             raise RuntimeError(f"Essentia chord extraction failed: {e}") from e
 
 
+def _chords_to_dicts(columns: Dict[str, Any]) -> List[Dict[str, Union[float, str]]]:
+    """Convert {"times", "chords"} columns to the public list-of-dicts form."""
+    # tolist() yields Python floats/strs in one pass per column.
+    return [
+        {"time": t, "chord": c}
+        for t, c in zip(columns["times"].tolist(), columns["chords"].tolist())
+    ]
+
+
 register_backend(EssentiaBackend)
@@ -0,0 +1,72 @@
+"""
+Post-processing helpers for chord extraction results.
+
+Operates on the public list-of-dicts form ([{"time": float, "chord": str}, ...])
+and is applied to every backend result by backend_registry._call_backend.
+When Numba (and NumPy) are installed, long results are merged by a compiled
+kernel over an array of chord ids; otherwise a pure-Python loop is used.
+"""
+
+import logging
+from typing import Any, Dict, List
+
+log = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    from numba import njit
+
+    _numba_available = True
+except ImportError:
+    np = None  # type: ignore
+    njit = None  # type: ignore
+    _numba_available = False
+
+# Below this many events the array conversion costs more than the loop saves.
+NUMBA_MIN_EVENTS = 2048
+
+
+if _numba_available:
+
+    @njit(cache=True)
+    def _transition_indices(chord_ids):
+        """Indices of events whose chord differs from the previous event."""
+        keep = np.empty(chord_ids.shape[0], dtype=np.int64)
+        n = 0
+        prev = -1
+        for i in range(chord_ids.shape[0]):
+            if chord_ids[i] != prev:
+                keep[n] = i
+                n += 1
+                prev = chord_ids[i]
+        return keep[:n]
+
+
+def merge_consecutive_chords(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Collapse runs of identical consecutive chords, keeping the first event of
+    each run (and therefore its start time).
+
+    Args:
+        events (List[Dict[str, Any]]): Chord events ordered by time.
+
+    Returns:
+        List[Dict[str, Any]]: One event per chord change.
+    """
+    if _numba_available and len(events) >= NUMBA_MIN_EVENTS:
+        vocab: Dict[str, int] = {}
+        chord_ids = np.fromiter(
+            (vocab.setdefault(e["chord"], len(vocab)) for e in events),
+            dtype=np.int64,
+            count=len(events),
+        )
+        return [events[i] for i in _transition_indices(chord_ids)]
+
+    merged: List[Dict[str, Any]] = []
+    prev = None
+    for event in events:
+        chord = event["chord"]
+        if chord != prev:
+            merged.append(event)
+            prev = chord
+    return merged
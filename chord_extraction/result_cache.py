@@ -0,0 +1,90 @@
+"""
+On-disk cache of chord extraction results.
+
+Entries are gzipped JSON files under config.CHORD_CACHE_DIR, keyed on a sha1
+of the file's real path, mtime and size (the audio itself is never hashed)
+plus a tag naming the backends that produced the result. Set the environment
+variable ACOUSTICAL_NO_CACHE=1 to bypass the cache.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from config import CHORD_CACHE_DIR
+
+log = logging.getLogger(__name__)
+
+
+def cache_enabled() -> bool:
+    """False when ACOUSTICAL_NO_CACHE is set to a true value (checked per call)."""
+    return os.environ.get("ACOUSTICAL_NO_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def _cache_path(audio_path: str, tag: str) -> Optional[str]:
+    try:
+        st = os.stat(audio_path)
+    except OSError:
+        return None
+    key = f"{os.path.realpath(audio_path)}\0{st.st_mtime_ns}\0{st.st_size}\0{tag}"
+    digest = hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(CHORD_CACHE_DIR, f"{digest}.json.gz")
+
+
+def get_cached(audio_path: str, tag: str = "") -> Optional[List[Dict[str, Any]]]:
+    """
+    Return the cached result for an unchanged file, or None on a miss.
+
+    Args:
+        audio_path (str): Local audio file path.
+        tag (str): Identifies the backend set the result must come from.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: The cached chords, or None.
+    """
+    if not cache_enabled():
+        return None
+    path = _cache_path(audio_path, tag)
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, EOFError, ValueError) as e:
+        log.debug(f"Ignoring unreadable chord cache entry {path}: {e}")
+        return None
+    log.info(f"Using cached chords for {audio_path}")
+    return result
+
+
+def put_cached(audio_path: str, result: List[Dict[str, Any]], tag: str = "") -> None:
+    """
+    Store a result for audio_path. Failures are logged and otherwise ignored.
+
+    Args:
+        audio_path (str): Local audio file path.
+        result (List[Dict[str, Any]]): Chords to store.
+        tag (str): Identifies the backend set that produced the result.
+    """
+    if not cache_enabled():
+        return
+    path = _cache_path(audio_path, tag)
+    if path is None:
+        return
+    try:
+        os.makedirs(CHORD_CACHE_DIR, exist_ok=True)
+        # Write-then-rename so concurrent batch workers never see partial files.
+        fd, tmp_path = tempfile.mkstemp(dir=CHORD_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(result, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        log.debug(f"Could not write chord cache entry for {audio_path}: {e}")
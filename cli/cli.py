@@ -1,36 +1,47 @@
+import importlib
 import logging
 import click
 
-from cli.commands.extract_chords import extract_chords
-from cli.commands.transpose import transpose
-from cli.commands.capo import capo
-from cli.commands.flourish import flourish
-from cli.commands.key import key
-from cli.commands.check_backends import check_backends
-from cli.commands.download_audio import download_audio_command
-from cli.commands.get_lyrics import get_lyrics_command
-from cli.commands.fingering import fingering_command
-
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
-
-@click.group()
+# Command name -> (module under cli.commands, attribute). Modules are imported
+# only when their command runs, so e.g. `capo` never loads the audio backends.
+_LAZY_COMMANDS = {
+    "extract-chords": ("extract_chords", "extract_chords"),
+    "transpose": ("transpose", "transpose"),
+    "capo": ("capo", "capo"),
+    "flourish": ("flourish", "flourish"),
+    "key": ("key", "key"),
+    "check-backends": ("check_backends", "check_backends"),
+    "download-audio": ("download_audio", "download_audio_command"),
+    "get-lyrics": ("get_lyrics", "get_lyrics_command"),
+    "fingering": ("fingering", "fingering_command"),
+}
+
+
+class LazyGroup(click.Group):
+    """click.Group that imports each subcommand's module on first use."""
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(_LAZY_COMMANDS))
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is not None or cmd_name not in _LAZY_COMMANDS:
+            return command
+        module_name, attr = _LAZY_COMMANDS[cmd_name]
+        module = importlib.import_module(f"cli.commands.{module_name}")
+        command = getattr(module, attr)
+        self.add_command(command, cmd_name)
+        return command
+
+
+@click.group(cls=LazyGroup)
 def cli():
     """Acoustic Cover Assistant CLI"""
     pass
 
 
-cli.add_command(extract_chords)
-cli.add_command(transpose)
-cli.add_command(capo)
-cli.add_command(flourish)
-cli.add_command(key)
-cli.add_command(check_backends)
-cli.add_command(download_audio_command)
-cli.add_command(get_lyrics_command)
-cli.add_command(fingering_command)
-
-
 if __name__ == "__main__":
     cli()
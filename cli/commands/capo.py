@@ -1,35 +1,73 @@
 import json
+
 import click
+from common.chord_json import (
+    locate_chord_fields, rewrite_chord_fields, scan_chord_strings
+)
+from cli.options import pretty_option
+from common.utils import dumps_json, stdout_is_tty
 from key_transpose_capo.capo_advisor import recommend_capo
 
 
+def _capo_full_parse(text: bytes, pretty: bool) -> str:
+    data = json.loads(text)  # Load the entire JSON object
+
+    chord_objects = data.get('chords', [])
+    if not chord_objects:
+        raise ValueError("No 'chords' array found in JSON or it's empty.")
+
+    original_chord_strings = [c.get('chord') for c in chord_objects]
+
+    capo_fret, new_chord_shapes = recommend_capo(original_chord_strings)
+
+    # Update the chord strings in the list of chord objects
+    for i, chord_obj in enumerate(chord_objects):
+        if i < len(new_chord_shapes):  # Ensure we don't go out of bounds
+            chord_obj['chord'] = new_chord_shapes[i]
+        else:
+            # This case should ideally not happen if recommend_capo returns
+            # a list of the same length as input. Handle defensively.
+            chord_obj['chord'] = "N/A (shape error)"
+
+    # 'data' now contains the modified chord_objects.
+    # Output: {'capo': fret, 'chords': original_data_with_new_shapes}
+    return dumps_json({'capo': capo_fret, 'chords': data}, pretty=pretty)
+
+
 @click.command()
-@click.argument('chords_json', type=click.File('r'))
-def capo(chords_json):
+@click.argument('chords_json', type=click.File('rb'))
+@pretty_option
+def capo(chords_json, pretty):
     """Recommend capo position."""
+    # The fast path keeps the input document's formatting, so it is only
+    # used when no explicit --pretty/--compact asks for re-serialization.
+    splice = pretty is None
+    if pretty is None:
+        pretty = stdout_is_tty()
     try:
         with chords_json as f:
-            data = json.load(f)  # Load the entire JSON object
-
-        chord_objects = data.get('chords', [])
-        if not chord_objects:
-            raise ValueError("No 'chords' array found in JSON or it's empty.")
+            text = f.read()
 
-        original_chord_strings = [c.get('chord') for c in chord_objects]
-
-        capo_fret, new_chord_shapes = recommend_capo(original_chord_strings)
-
-        # Update the chord strings in the list of chord objects
-        for i, chord_obj in enumerate(chord_objects):
-            if i < len(new_chord_shapes):  # Ensure we don't go out of bounds
-                chord_obj['chord'] = new_chord_shapes[i]
+        # Fast path: read just the chord strings and patch them in place,
+        # leaving the rest of the document (metadata, beats, ...) untouched.
+        original_chord_strings = scan_chord_strings(text) if splice else None
+        matches = (
+            locate_chord_fields(text, original_chord_strings)
+            if original_chord_strings is not None else None
+        )
+        if matches is not None:
+            capo_fret, new_chord_shapes = recommend_capo(original_chord_strings)
+            missing = len(matches) - len(new_chord_shapes)
+            if missing > 0:
+                new_chord_shapes = list(new_chord_shapes) + ["N/A (shape error)"] * missing
+            patched = rewrite_chord_fields(text, matches, new_chord_shapes)
+            if pretty:
+                head, sep, tail = b'{\n  "capo": ', b',\n  "chords": ', b'\n}'
             else:
-                # This case should ideally not happen if recommend_capo returns
-                # a list of the same length as input. Handle defensively.
-                chord_obj['chord'] = "N/A (shape error)" 
-        
-        # 'data' now contains the modified chord_objects.
-        # Output: {'capo': fret, 'chords': original_data_with_new_shapes}
-        click.echo(json.dumps({'capo': capo_fret, 'chords': data}, indent=2))
+                head, sep, tail = b'{"capo":', b',"chords":', b'}'
+            click.echo(head + json.dumps(capo_fret).encode() + sep + patched.strip() + tail)
+            return
+
+        click.echo(_capo_full_parse(text, pretty))
     except Exception as e:
         raise click.ClickException(f"Capo recommendation failed: {e}")
@@ -3,12 +3,18 @@ import sys
 import click
 from chord_extraction import get_chords, get_chords_batch
 from audio_input.utils import check_audio_file
+from cli.options import pretty_option
 from common.utils import format_error, serialize_result
 
+# Extensions picked up from a --batch directory
+_BATCH_AUDIO_EXTS = frozenset(('.mp3', '.wav', '.flac'))
+
 @click.command()
 @click.argument('source', type=str) # Changed to 'source' and type=str to accept URLs or paths
 @click.option('--batch', is_flag=True, help='Batch process all audio files in a local directory (source must be a directory path).')
-def extract_chords(source, batch):
+@click.option('--jobs', type=click.IntRange(min=1), default=None, help='Number of files to process at once in batch mode (default: number of CPUs; 1 disables parallelism).')
+@pretty_option
+def extract_chords(source, batch, jobs, pretty):
     """
     Extract chords from an audio file (local path or URL) or a local directory.
     If --batch is used, source must be a local directory.
@@ -19,7 +25,11 @@ def extract_chords(source, batch):
                 click.echo(format_error(f"Batch mode requires a local directory path, but '{source}' is not a directory."), err=True)
                 sys.exit(1)
             
-            files = [os.path.join(source, f) for f in os.listdir(source) if f.lower().endswith(('.mp3', '.wav', '.flac'))]
+            with os.scandir(source) as entries:
+                files = [
+                    e.path for e in entries
+                    if e.name[e.name.rfind('.'):].lower() in _BATCH_AUDIO_EXTS and e.is_file()
+                ]
             valid_files = []
             for f in files:
                 try:
@@ -32,8 +42,8 @@ def extract_chords(source, batch):
             if not valid_files:
                 click.echo(format_error("No valid audio files found in batch directory."), err=True)
                 sys.exit(1)
-            results = get_chords_batch(valid_files)
-            click.echo(serialize_result(results))
+            results = get_chords_batch(valid_files, parallel=jobs != 1, max_workers=jobs)
+            click.echo(serialize_result(results, pretty=pretty))
         else:
             # Determine if source is a URL or a local file path
             is_url = source.startswith(("http://", "https://"))
@@ -48,7 +58,7 @@ def extract_chords(source, batch):
             
             # get_chords now handles both local paths and URLs internally
             chords = get_chords(source)
-            click.echo(serialize_result(chords))
+            click.echo(serialize_result(chords, pretty=pretty))
     except Exception as e:
         click.echo(format_error("Chord extraction failed", e), err=True)
         click.echo("Tip: Run 'python cli/cli.py check-backends' to diagnose backend availability or check your URL/file path.", err=True)
@@ -1,14 +1,22 @@
 import click
+import functools
 import logging
 import sys # Added sys import
-from typing import List, Optional # Added Optional
-from key_transpose_capo.fingering_advisor import suggest_fingerings, score_shape_playability
+from typing import List, Optional, Tuple # Added Optional
+from key_transpose_capo.fingering_advisor import suggest_fingerings
 from music_theory.fretboard import Fretboard
+from cli.options import pretty_option
 from common.utils import format_error, serialize_result
 
 log = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=8)
+def _fretboard(tuning: Optional[Tuple[str, ...]]) -> Fretboard:
+    """Build (once per tuning) the Fretboard used for suggestions; treat as read-only."""
+    return Fretboard(tuning=list(tuning) if tuning else None)
+
+
 @click.command("fingering")
 @click.argument("chord_string", type=str)
 @click.option(
@@ -19,7 +27,12 @@ log = logging.getLogger(__name__)
     "--tuning", "-t", type=str, default=None,
     help="Custom tuning, e.g., DADGBe. Comma-separated."
 )
-def fingering_command(chord_string: str, num_suggestions: int, tuning: Optional[str]): # Renamed function
+@click.option(
+    "--no-cache", "no_cache", is_flag=True, default=False,
+    help="Recompute suggestions instead of reusing memoized results."
+)
+@pretty_option
+def fingering_command(chord_string: str, num_suggestions: int, tuning: Optional[str], no_cache: bool, pretty: Optional[bool]): # Renamed function
     """
     Suggests guitar fingerings for a given CHORD_STRING.
     """
@@ -29,8 +42,13 @@ def fingering_command(chord_string: str, num_suggestions: int, tuning: Optional[
             fretboard_tuning = [s.strip() for s in tuning.split(',')]
             log.info(f"Using custom tuning: {fretboard_tuning}")
 
-        fb = Fretboard(tuning=fretboard_tuning)
-        suggestions_with_scores = suggest_fingerings(chord_string, fretboard=fb)
+        fb = _fretboard(tuple(fretboard_tuning) if fretboard_tuning else None)
+        # Only rank as many shapes as will be shown; with 0, keeping the best
+        # one is enough to report whether any exist.
+        suggestions_with_scores = suggest_fingerings(
+            chord_string, fretboard=fb, top_k=max(num_suggestions, 1),
+            use_cache=not no_cache
+        )
 
         if not suggestions_with_scores:
             click.echo(
@@ -42,9 +60,8 @@ def fingering_command(chord_string: str, num_suggestions: int, tuning: Optional[
             return
 
         output_suggestions = []
-        for i, (shape, score) in enumerate(suggestions_with_scores):
-            if i >= num_suggestions:
-                break
+        # Scores come back with the ranked shapes; no need to re-score here.
+        for shape, score in suggestions_with_scores[:max(num_suggestions, 0)]:
             output_suggestions.append({
                 "name": shape.name,
                 "root": shape.template_root_note_str,
@@ -59,7 +76,7 @@ def fingering_command(chord_string: str, num_suggestions: int, tuning: Optional[
         click.echo(serialize_result({
             "chord": chord_string,
             "suggestions": output_suggestions
-        }))
+        }, pretty=pretty))
 
     except Exception as e:
         log.error(f"Error in fingering CLI for '{chord_string}': {e}", exc_info=True)
@@ -1,15 +1,17 @@
-import json
 import click
 from flourish_engine.rule_based import apply_rule_based_flourishes
 from flourish_engine.magenta_flourish import generate_magenta_flourish
 from flourish_engine.gpt4all_flourish import suggest_chord_substitutions
+from cli.options import pretty_option
+from common.utils import dumps_json_bytes, load_json_text
 
 
 @click.command()
-@click.argument('chords_json', type=click.File('r'))
+@click.argument('chords_json', type=click.File('rb'))
 @click.option('--magenta', is_flag=True, help='Use Magenta for AI flourishes.')
 @click.option('--gpt4all', is_flag=True, help='Use GPT4All LLM suggestions.')
-def flourish(chords_json, magenta, gpt4all):
+@pretty_option
+def flourish(chords_json, magenta, gpt4all, pretty):
     """Suggest flourishes using rule-based, Magenta, or GPT4All."""
     try:
         if magenta and gpt4all:
@@ -17,7 +19,9 @@ def flourish(chords_json, magenta, gpt4all):
                    "simultaneously. Please choose one.")
             raise click.ClickException(msg)
 
-        data = json.load(chords_json)
+        text = chords_json.read()
+        # Empty input has no chords; skip the parser entirely
+        data = load_json_text(text) if text.strip() else {}
         chord_objects_list = data.get('chords', [])
         if not chord_objects_list:
             # Or handle as an error if the JSON must contain 'chords'
@@ -25,7 +29,7 @@ def flourish(chords_json, magenta, gpt4all):
                 'flourishes': [],
                 'error': "No 'chords' array found in JSON or it's empty."
             }
-            click.echo(json.dumps(error_payload, indent=2))
+            click.echo(dumps_json_bytes(error_payload, pretty=pretty), nl=False)
             return
 
         # Full chord progression (list of dicts) for rule_based and gpt4all.
@@ -41,6 +45,6 @@ def flourish(chords_json, magenta, gpt4all):
             # Default to rule-based, pass the full chord progression
             flourishes = apply_rule_based_flourishes(chord_objects_list)
         
-        click.echo(json.dumps({'flourishes': flourishes}, indent=2))
+        click.echo(dumps_json_bytes({'flourishes': flourishes}, pretty=pretty), nl=False)
     except Exception as e:
         raise click.ClickException(f"Flourish suggestion failed: {e}")
@@ -1,5 +1,6 @@
 import click
 import sys
+from cli.options import pretty_option
 from common.utils import format_error, serialize_result
 from lyrics_analysis.lyrics_retriever import get_lyrics_from_url_or_metadata
 
@@ -11,7 +12,8 @@ from lyrics_analysis.lyrics_retriever import get_lyrics_from_url_or_metadata
 )
 @click.option('--title', type=str, help='Title of the song.')
 @click.option('--artist', type=str, help='Artist of the song.')
-def get_lyrics_command(url, title, artist):  # Removed async
+@pretty_option
+def get_lyrics_command(url, title, artist, pretty):  # Removed async
     """
     Retrieve lyrics for a song using a URL or by providing title and artist.
     """
@@ -30,39 +32,40 @@ def get_lyrics_command(url, title, artist):  # Removed async
             url=url, title=title, artist=artist
         )
 
+        method = lyrics_info.get("method")
+        lyrics_text = lyrics_info.get("lyrics_text")
+        prepared_url = lyrics_info.get("url")
+
         # Simplified logic: get_lyrics_from_url_or_metadata should handle
         # fetching or return placeholders.
         # No direct MCP tool interaction from CLI for now.
-        if lyrics_info.get("lyrics_text"):  # Safely check if lyrics_text exists
-            source = lyrics_info.get("method", "unknown")
+        if lyrics_text:
             payload = {
-                "lyrics": lyrics_info["lyrics_text"],
-                "source": source
+                "lyrics": lyrics_text,
+                "source": method or "unknown"
             }
-            click.echo(serialize_result(payload))
-        elif lyrics_info.get("method") == "scrape_azlyrics":
+            click.echo(serialize_result(payload, pretty=pretty))
+        elif method == "scrape_azlyrics":
             # This CLI command currently does not fetch/parse from AZLyrics.
             # It only prepares the URL.
             msg_main = "AZLyrics retrieval not implemented in CLI."
-            prepared_url = lyrics_info.get('url', 'N/A')
             msg_detail = (
-                f"Prepared URL: {prepared_url}. "
+                f"Prepared URL: {prepared_url or 'N/A'}. "
                 "Manual fetching/parsing needed."
             )
             full_error_message = f"{msg_main} {msg_detail}"
             click.echo(format_error(full_error_message), err=True)
             sys.exit(1)
-        elif lyrics_info.get("method") == "placeholder_url":
+        elif method == "placeholder_url":
             lyrics_text = (
-                f"Lyrics for song from URL: {lyrics_info['url']}\n\n"
+                f"Lyrics for song from URL: {prepared_url}\n\n"
                 "(Placeholder lyrics: Verse 1...\nChorus...\nVerse 2...)"
             )
             payload = {"lyrics": lyrics_text, "source": "placeholder_url"}
-            click.echo(serialize_result(payload))
+            click.echo(serialize_result(payload, pretty=pretty))
         else:
-            method_info = lyrics_info.get('method', 'N/A')
             msg_main = "Unknown lyrics retrieval method or no lyrics found."
-            msg_detail = f"Method: {method_info}"
+            msg_detail = f"Method: {method or 'N/A'}"
             click.echo(format_error(msg_main, msg_detail), err=True)
             sys.exit(1)
 
@@ -1,18 +1,26 @@
-import json
 import click
 from key_transpose_capo.key_analysis import detect_key_from_chords
+from common.chord_json import scan_chord_strings
+from cli.options import pretty_option
+from common.utils import dumps_json_bytes, load_json_text
 
 
 @click.command()
-@click.argument('chords_json', type=click.File('r'))
-def key(chords_json):
+@click.argument('chords_json', type=click.File('rb'))
+@pretty_option
+def key(chords_json, pretty):
     """Detect key from chords."""
     try:
-        chords_data = json.load(chords_json)  # Renamed for clarity
-        # Correctly access the list of chord objects under the "chords" key
-        chord_objects = chords_data['chords']
-        chord_strings = [c['chord'] for c in chord_objects]
+        text = chords_json.read()
+        # Stream just the chord names; only odd-shaped or invalid documents
+        # need the full parse (which also produces the error messages).
+        chord_strings = scan_chord_strings(text)
+        if chord_strings is None:
+            chords_data = load_json_text(text)  # Renamed for clarity
+            # Correctly access the list of chord objects under the "chords" key
+            chord_objects = chords_data['chords']
+            chord_strings = [c['chord'] for c in chord_objects]
         key_result = detect_key_from_chords(chord_strings)
-        click.echo(json.dumps({'key': key_result}, indent=2))
+        click.echo(dumps_json_bytes({'key': key_result}, pretty=pretty), nl=False)
     except Exception as e:
         raise click.ClickException(f"Key detection failed: {e}")
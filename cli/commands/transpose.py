@@ -1,12 +1,16 @@
-import json
 import click
 from key_transpose_capo.transpose import transpose_chords
+from common.chord_json import (
+    locate_chord_fields, rewrite_chord_fields, scan_chord_strings
+)
+from cli.options import pretty_option
+from common.utils import dumps_json, load_json_text
 
 
 @click.command()
 @click.argument(
     'chords_json',
-    type=click.File('r')
+    type=click.File('rb')
 )
 @click.option(
     '--semitones',
@@ -14,13 +18,33 @@ from key_transpose_capo.transpose import transpose_chords
     required=True,
     help='Number of semitones to transpose'
 )
-def transpose(chords_json, semitones):
+@pretty_option
+def transpose(chords_json, semitones, pretty):
     """Transpose chords by semitones."""
     try:
         # Ensure the file is properly closed using a 'with' statement
         with chords_json as f:
-            data = json.load(f)  # Load the entire JSON object
-        
+            text = f.read()
+
+        # Fast path: stream out just the chord strings and patch the
+        # transposed names into the original text, never building the
+        # full document (metadata, beats, ...) in memory. It keeps the
+        # input's formatting, so an explicit --pretty/--compact re-serializes.
+        original_chord_strings = scan_chord_strings(text) if pretty is None else None
+        matches = (
+            locate_chord_fields(text, original_chord_strings)
+            if original_chord_strings is not None else None
+        )
+        if matches is not None:
+            transposed_chord_strings = transpose_chords(
+                original_chord_strings,
+                semitones
+            )
+            click.echo(rewrite_chord_fields(text, matches, transposed_chord_strings).strip())
+            return
+
+        data = load_json_text(text)  # Load the entire JSON object
+
         # Extract the list of chord objects
         chord_objects = data.get('chords', [])
         if not chord_objects:
@@ -34,14 +58,14 @@ def transpose(chords_json, semitones):
         )
         
         # Update the chord strings in the original list of chord objects
-        for i, chord_obj in enumerate(chord_objects):
-            chord_obj['chord'] = transposed_chord_strings[i]
+        for chord_obj, new_chord in zip(chord_objects, transposed_chord_strings):
+            chord_obj['chord'] = new_chord
         
         # data['chords'] is already updated if chord_objects was a direct reference
         # If it was a copy, then data['chords'] = chord_objects would be needed.
         # Assuming chord_objects is a reference to the list within data.
         
         # Echo the modified full data structure
-        click.echo(json.dumps(data, indent=2))
+        click.echo(dumps_json(data, pretty=pretty))
     except Exception as e:
         raise click.ClickException(f"Transposition failed: {e}")
@@ -0,0 +1,11 @@
+"""
+Options shared by several CLI commands.
+"""
+
+import click
+
+# --pretty/--compact; unset (None) means "pretty only when stdout is a terminal"
+pretty_option = click.option(
+    '--pretty/--compact', 'pretty', default=None,
+    help='Indent JSON output (default: only when writing to a terminal).'
+)
@@ -0,0 +1,77 @@
+"""
+Streaming helpers for chord JSON documents ({"chords": [{"chord": ...}, ...]}).
+
+Commands that only read or rewrite the chord names use these to avoid
+building the whole document as Python objects: the chord strings are
+collected with ijson, and rewritten values are spliced back into the
+original UTF-8 bytes (the CLI reads its input files in binary mode).
+"""
+
+import io
+import json
+import re
+from typing import List, Optional
+
+try:
+    import ijson  # Optional: scan only the chord fields of large documents
+except ImportError:
+    ijson = None
+
+# A "chord": "<string>" member anywhere in the document
+_CHORD_FIELD = re.compile(rb'"chord"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+def scan_chord_strings(text: bytes) -> Optional[List[str]]:
+    """
+    Collect chords[*].chord from a top-level object without building it.
+
+    Returns None whenever the document is not the plain shape the fast path
+    understands (or is invalid), so the caller can fall back to a full parse.
+    """
+    if ijson is None:
+        return None
+    chords: List[str] = []
+    items = 0
+    try:
+        events = ijson.parse(io.BytesIO(text))
+        for prefix, event, value in events:
+            if prefix == "" and event not in ("start_map", "map_key", "end_map"):
+                return None  # Top level is not an object
+            if prefix == "chords.item" and event == "start_map":
+                items += 1
+            elif prefix == "chords.item.chord":
+                if event != "string":
+                    return None
+                chords.append(value)
+    except ijson.JSONError:
+        return None
+    if not chords or len(chords) != items:
+        return None
+    return chords
+
+
+def locate_chord_fields(text: bytes, chords: List[str]) -> Optional[List[re.Match]]:
+    """
+    Find the "chord" members holding the scanned chords, in document order.
+
+    Only succeeds when every "chord" member in the text is one of the scanned
+    chords (same count, same values); otherwise returns None.
+    """
+    matches = list(_CHORD_FIELD.finditer(text))
+    if len(matches) != len(chords):
+        return None
+    if any(json.loads(m.group(1)) != chord for m, chord in zip(matches, chords)):
+        return None
+    return matches
+
+
+def rewrite_chord_fields(text: bytes, matches: List[re.Match], new: List[str]) -> bytes:
+    """Splice new chord strings over the located "chord" values, in order."""
+    parts: List[bytes] = []
+    pos = 0
+    for match, chord in zip(matches, new):
+        parts.append(text[pos:match.start(1)])
+        parts.append(json.dumps(chord, ensure_ascii=False).encode("utf-8"))
+        pos = match.end(1)
+    parts.append(text[pos:])
+    return b"".join(parts)
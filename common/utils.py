@@ -4,7 +4,13 @@ Common utilities for error formatting and result serialization.
 
 import json
 import logging
-from typing import Any, Dict, Optional
+import sys
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson  # Optional: faster JSON encode/decode
+except ImportError:
+    orjson = None
 
 log = logging.getLogger(__name__)
 
@@ -15,8 +21,9 @@ def handle_exception(
     """
     Logs an exception with a custom message and returns a standardized error dictionary.
     """
-    log.exception(f"{message}: {e}")
-    return {"error": f"{message}: {e}"}
+    error = f"{message}: {e}"
+    log.exception("%s", error)
+    return {"error": error}
 
 
 def format_error(message: str, exc: Optional[Exception] = None) -> Dict[str, str]:
@@ -35,22 +42,137 @@ def format_error(message: str, exc: Optional[Exception] = None) -> Dict[str, str
     if exc:
         return handle_exception(exc, message)
     else:
-        log.error(message)
+        log.error("%s", message)
         return {"error": message}
 
 
-def serialize_result(result: Any) -> str:
+def serialize_result(result: Any, pretty: Optional[bool] = None) -> str:
     """
     Serializes a result to a JSON string.
 
     Args:
         result (Any): The data to serialize.
+        pretty (Optional[bool]): Indent the output. Defaults to indenting
+            only when stdout is a terminal, so piped output stays compact.
 
     Returns:
         str: The JSON string representation of the result.
              If serialization fails, returns a JSON string with an error message.
     """
     try:
-        return json.dumps(result, indent=2, ensure_ascii=False)
+        return dumps_json(result, pretty=pretty)
     except Exception as e:
         return handle_exception(e, "Serialization failed")
+
+
+def stdout_is_tty() -> bool:
+    """True when stdout is an interactive terminal (not a pipe or file)."""
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):  # Replaced or closed stdout
+        return False
+
+
+def dumps_json(obj: Any, pretty: Optional[bool] = True) -> str:
+    """
+    Encodes an object as a JSON string.
+
+    Uses orjson when installed (non-string dict keys are stringified, as
+    the standard library does); falls back to the standard library for
+    anything orjson refuses (e.g. unsupported types).
+
+    Args:
+        obj (Any): The data to encode.
+        pretty (Optional[bool]): Indent by two spaces; if False, emit compact
+            JSON with no whitespace between tokens; if None, indent only when
+            stdout is a terminal.
+
+    Returns:
+        str: The JSON text, with non-ASCII kept as-is.
+    """
+    if pretty is None:
+        pretty = stdout_is_tty()
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_orjson_option(pretty)).decode("utf-8")
+        except TypeError:
+            pass
+    return _stdlib_dumps(obj, pretty)
+
+
+def dumps_json_bytes(obj: Any, pretty: Optional[bool] = True) -> bytes:
+    """
+    Encodes an object as newline-terminated UTF-8 JSON, ready to write out.
+
+    Same output as dumps_json plus a trailing newline, but orjson's bytes
+    are returned as-is rather than decoded into a second (str) copy; write
+    them with click.echo(data, nl=False).
+
+    Args:
+        obj (Any): The data to encode.
+        pretty (Optional[bool]): As for dumps_json.
+
+    Returns:
+        bytes: The encoded JSON followed by a newline.
+    """
+    if pretty is None:
+        pretty = stdout_is_tty()
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj, option=_orjson_option(pretty) | orjson.OPT_APPEND_NEWLINE
+            )
+        except TypeError:
+            pass
+    return (_stdlib_dumps(obj, pretty) + "\n").encode("utf-8")
+
+
+def _orjson_option(pretty: bool) -> int:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return option
+
+
+def _stdlib_dumps(obj: Any, pretty: bool) -> str:
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Decodes JSON text, using orjson when installed.
+
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON (orjson's error
+            type subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json_text(data: Union[str, bytes]) -> Any:
+    """
+    Decodes a JSON document read from user input.
+
+    Decodes with orjson when installed. Invalid input is re-parsed with the
+    standard library so the raised error carries its familiar message
+    (e.g. "Expecting value: line 1 column 1 (char 0)").
+
+    Args:
+        data (Union[str, bytes]): The JSON text.
+
+    Returns:
+        Any: The decoded document.
+
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON.
+    """
+    if orjson is None:
+        return json.loads(data)
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
@@ -2,19 +2,31 @@
 Centralized configuration for Acoustic Cover Assistant.
 """
 
+import os
+from types import MappingProxyType
+
 # Default settings
 DEFAULT_OUTPUT_FORMAT = "json"
 MAX_AUDIO_FILE_SIZE_MB = 20
-ALLOWED_AUDIO_EXTENSIONS = {".mp3", ".wav", ".flac"}
+ALLOWED_AUDIO_EXTENSIONS = frozenset({".mp3", ".wav", ".flac"})
+
+# Downloaded-URL audio cache (keyed on video id, LRU-evicted by access time)
+AUDIO_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "acoustical")
+MAX_CACHE_MB = 2048
+
+# Per-file chord results (keyed on path, mtime and size); ACOUSTICAL_NO_CACHE=1 bypasses it
+CHORD_CACHE_DIR = os.path.join(AUDIO_CACHE_DIR, "chords")
 
 # Backend preferences
-BACKEND_ORDER = ["chordino", "autochord", "chord_extractor"]
+BACKEND_ORDER = ("chordino", "autochord", "chord_extractor")
+# Run all chord backends concurrently and keep the first non-empty result
+RACE_BACKENDS = os.environ.get("RACE_BACKENDS", "").lower() in ("1", "true", "yes")
 
 # Logging settings
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(levelname)s: %(message)s"
 
-# Rule-based flourish substitution sets
+# Rule-based flourish substitution sets (frozen below; built once at import)
 RULE_BASED_SUBSTITUTIONS = {
     "default": {
         "C": "Am", "Am": "C",
@@ -44,3 +56,6 @@ RULE_BASED_SUBSTITUTIONS = {
         # Add more blues substitution rules as needed
     }
 }
+RULE_BASED_SUBSTITUTIONS = MappingProxyType({
+    name: MappingProxyType(rules) for name, rules in RULE_BASED_SUBSTITUTIONS.items()
+})
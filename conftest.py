@@ -5,3 +5,6 @@ import os
 # This allows pytest to find main application modules (e.g., audio_input)
 # when running tests from subdirectories.
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+# Keep test runs from reading or writing the user's on-disk chord result cache
+os.environ.setdefault("ACOUSTICAL_NO_CACHE", "1")
@@ -1,18 +1,40 @@
+import contextlib
+import functools
+import importlib.util
 import logging
+import queue
 import re # Added re import
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 from key_transpose_capo.key_analysis import detect_key_from_chords
 from music_theory import utils as music_theory_utils
 
+log = logging.getLogger(__name__)
+
 try:
-    from gpt4all import GPT4All
-    _gpt4all_available = True
+    import re2 as _chord_re_engine  # Optional: linear-time matching of model output
 except ImportError:
-    _gpt4all_available = False
-    GPT4All = None  # Define GPT4All as None if import fails
+    _chord_re_engine = re
+
+# gpt4all is imported on first use (see _load_gpt4all) so that importing this
+# module, e.g. for the `flourish` CLI command, stays cheap.
+GPT4All = None
+_gpt4all_available = importlib.util.find_spec("gpt4all") is not None
 
-log = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
+def _load_gpt4all() -> bool:
+    """Import the GPT4All class once, returning True on success."""
+    global GPT4All
+    try:
+        from gpt4all import GPT4All as _GPT4All
+    except ImportError as e:
+        log.error(f"GPT4All was found but could not be imported: {e}")
+        return False
+    GPT4All = _GPT4All
+    return True
 
 # Model path should be sourced from config.py or environment variable
 try:
@@ -22,6 +44,119 @@ except ImportError:
     DEFAULT_MODEL_PATH = None
 
 
+# Shared instructions, sent once per progression as the chat session's system
+# prompt (after the key context) so the model keeps them in its KV cache;
+# each generate() call then only carries the chord-specific request.
+_SYSTEM_INSTRUCTIONS = (
+    "Given a chord, suggest one or two musically interesting and common "
+    "chord substitutions or extensions (like adding a 7th, 9th, sus, or a "
+    "related minor/major chord). Be concise. Examples: G7, Am7, Csus4."
+)
+
+# Batched request: one numbered line per chord, answered as "i) CHORD -> SUBS"
+_BATCH_PROMPT = (
+    "For each chord below, output one line formatted exactly as "
+    "'i) CHORD -> SUB1, SUB2', with no other text:\n"
+)
+# Replies are parsed up to this many characters per chord asked about, which
+# bounds the parsing work however much text the model produces.
+_MAX_REPLY_CHARS = 256
+
+_BATCH_LINE_RE = re.compile(r'^\s*(\d+)\)\s*[^-]+->\s*(.+)$')
+
+_GLOBAL_INTRO_PHRASES = [
+    "Sure, here are some suggestions:", "Here's a suggestion:",
+    "Okay, how about"
+]
+_ITEM_INTRO_PHRASES = [
+    "Try", "Maybe", "Consider", "Perhaps", "How about", "What about",
+    "An option is", "Another option is", "Or perhaps"
+]
+
+
+def _intro_regex(phrases: List[str]) -> re.Pattern:
+    """One pattern matching a run of leading phrases (each tried in list order)."""
+    alternation = "|".join(map(re.escape, phrases))
+    return re.compile(rf"^(?:(?:{alternation})\s*[:,]?\s*)+", re.IGNORECASE)
+
+
+# Reply-parsing patterns (see _parse_suggestions), compiled once
+_GLOBAL_INTRO_RE = _intro_regex(_GLOBAL_INTRO_PHRASES)
+_ITEM_INTRO_RE = _intro_regex(_ITEM_INTRO_PHRASES)
+_CONJUNCTION_RE = re.compile(r'\s+(?:or|and)\s+', re.IGNORECASE)
+_DELIMITER_TABLE = str.maketrans({c: '|' for c in ',\n\r\t'})
+# Inline (?i) rather than a flag: re2.compile does not take re's flags
+_CHORD_RE = _chord_re_engine.compile(r"(?i)^[A-G][#b]?([\w\d#b\+\-\(\)]*)(/([A-G][#b]?))?$")
+
+
+# Model instances (and threads) used by suggest_chord_substitutions_batch
+DEFAULT_BATCH_WORKERS = 2
+
+# gpt4all backends are not thread-safe: serializes model loads and every
+# chat_session()/generate() so concurrent callers (e.g. the web app) queue.
+_model_lock = threading.RLock()
+
+
+class _ModelPool:
+    """Independent GPT4All instances for one model, each lent to one thread at a time."""
+
+    def __init__(self, model_path: str, size: int):
+        self._idle: "queue.Queue" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(GPT4All(model_path))
+
+    @contextlib.contextmanager
+    def borrow(self):
+        """Block until an instance is free, and hand it back afterwards."""
+        model = self._idle.get()
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_model_pool(model_path: str, size: int) -> _ModelPool:
+    """
+    Load `size` instances of a model for suggest_chord_substitutions_batch.
+
+    Only the latest pool is kept, as each holds `size` copies of the weights.
+    Call with _model_lock held.
+    """
+    log.info(f"Loading {size} GPT4All instances from: {model_path}")
+    pool = _ModelPool(model_path, size)
+    log.info("GPT4All model pool loaded successfully.")
+    return pool
+
+
+@functools.lru_cache(maxsize=2)
+def _get_model(model_path: str):
+    """
+    Load a GPT4All model once per path and reuse it across calls.
+
+    Failed loads raise and are not cached, so a later call can retry.
+    Call with _model_lock held.
+    """
+    log.info(f"Attempting to load GPT4All model from: {model_path}")
+    model = GPT4All(model_path)
+    log.info("GPT4All model loaded successfully.")
+    return model
+
+
+def _static_suggestions(
+    chord_progression: List[Dict[str, Any]], suffixes: Tuple[str, ...]
+) -> List[Dict[str, Any]]:
+    """Fallback results when the model cannot be used: each chord plus each suffix."""
+    return [
+        {
+            "original_chord": (c := chord_obj.get("chord", "N/A")),
+            "start_time": chord_obj.get("time"),
+            "suggestions": [f"{c}{suffix}" for suffix in suffixes] if c != "N/A" else []
+        }
+        for chord_obj in chord_progression
+    ]
+
+
 def suggest_chord_substitutions(
     chord_progression: List[Dict[str, Any]],
     lyrics: Optional[str] = None,
@@ -43,172 +178,264 @@ def suggest_chord_substitutions(
         List[Dict[str, Any]]: A list of suggestions for each original chord.
             Each item: {"original_chord": str, "start_time": float, "suggestions": List[str]}
     """
+    if _gpt4all_available and GPT4All is None:
+        _load_gpt4all()
     if not _gpt4all_available or GPT4All is None:
         log.warning("GPT4All is not installed. Returning static suggestions.")
-        results = []
-        for chord_obj in chord_progression:
-            c = chord_obj.get("chord", "N/A")
-            results.append({
-                "original_chord": c,
-                "start_time": chord_obj.get("time"),
-                "suggestions": [f"{c}maj7", f"{c}9"] if c != "N/A" else []
-            })
-        return results
+        return _static_suggestions(chord_progression, ("maj7", "9"))
 
     actual_model_path = model_path or DEFAULT_MODEL_PATH
     if not actual_model_path:
         log.error("GPT4All model path is not configured. Cannot load model.")
-        results = []
-        for chord_obj in chord_progression:
-            c = chord_obj.get("chord", "N/A")
-            results.append({
-                "original_chord": c,
-                "start_time": chord_obj.get("time"),
-                "suggestions": [f"{c}7", f"{c}add9"] if c != "N/A" else [] 
-            })
-        return results
+        return _static_suggestions(chord_progression, ("7", "add9"))
         
     try:
-        log.info(f"Attempting to load GPT4All model from: {actual_model_path}")
-        model = GPT4All(actual_model_path)
-        log.info("GPT4All model loaded successfully.")
+        with _model_lock:
+            model = _get_model(actual_model_path)
     except Exception as e:
         log.error(f"Failed to load GPT4All model from {actual_model_path}: {e}")
-        results = []
-        for chord_obj in chord_progression:
-            c = chord_obj.get("chord", "N/A")
-            results.append({
-                "original_chord": c,
-                "start_time": chord_obj.get("time"),
-                "suggestions": [f"{c}7", f"{c}add9"] if c != "N/A" else []
-            })
-        return results
-
-    original_chord_strings = [c.get("chord", "") for c in chord_progression]
-    detected_key_info = detect_key_from_chords(original_chord_strings)
+        return _static_suggestions(chord_progression, ("7", "add9"))
+
+    return _progression_suggestions(model, chord_progression, max_tokens, _model_lock)
+
+
+def suggest_chord_substitutions_batch(
+    progressions: List[List[Dict[str, Any]]],
+    lyrics: Optional[str] = None,
+    model_path: Optional[str] = None,
+    max_tokens: int = 50,
+    workers: int = DEFAULT_BATCH_WORKERS
+) -> List[List[Dict[str, Any]]]:
+    """
+    Suggest substitutions for several progressions concurrently.
+
+    A gpt4all model must not be used from two threads at once, so each
+    worker thread borrows its own model instance from a pool and runs whole
+    progressions on it. This keeps `workers` copies of the model in memory.
+    With one worker or one progression (or no usable model) the progressions
+    go through suggest_chord_substitutions one at a time.
+
+    Args:
+        progressions (List[List[Dict[str, Any]]]): Chord progressions, each
+            as accepted by suggest_chord_substitutions.
+        lyrics (str, optional): Associated lyrics for context.
+        model_path (str, optional): Path to GPT4All model file.
+        max_tokens (int): Max tokens to generate per suggestion.
+        workers (int): Number of model instances and worker threads.
+
+    Returns:
+        List[List[Dict[str, Any]]]: The suggestions for each progression, in order.
+    """
+    if _gpt4all_available and GPT4All is None:
+        _load_gpt4all()
+    actual_model_path = model_path or DEFAULT_MODEL_PATH
+    pool = None
+    if (workers > 1 and len(progressions) > 1 and GPT4All is not None
+            and _gpt4all_available and actual_model_path):
+        try:
+            with _model_lock:
+                pool = _get_model_pool(actual_model_path, workers)
+        except Exception as e:
+            log.error(f"Failed to load GPT4All model pool from {actual_model_path}: {e}")
+    if pool is None:
+        return [
+            suggest_chord_substitutions(p, lyrics, model_path, max_tokens)
+            for p in progressions
+        ]
+
+    def run(progression):
+        with pool.borrow() as model:
+            # The instance is ours until returned: no need for _model_lock
+            return _progression_suggestions(
+                model, progression, max_tokens, contextlib.nullcontext()
+            )
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(progressions))) as executor:
+        # Submit everything before collecting any result, so workers overlap
+        futures = [executor.submit(run, p) for p in progressions]
+        return [future.result() for future in futures]
+
+
+def _progression_suggestions(
+    model, chord_progression: List[Dict[str, Any]], max_tokens: int, lock
+) -> List[Dict[str, Any]]:
+    """
+    Generate suggestions for one progression with a loaded model.
+
+    `lock` is held for the progression's chat session: _model_lock for the
+    shared model, a no-op for a pool instance borrowed by this thread.
+    """
+    # Work on parallel chord/time lists rather than the per-event dicts
+    chords = [c.get("chord") or "" for c in chord_progression]
+    times = [c.get("time") for c in chord_progression]
+
+    # Progressions repeat the same few chords; the prompt depends only on the
+    # chord (and the shared key context), so ask once per distinct chord.
+    distinct_chords = list(dict.fromkeys(c for c in chords if c))
+    suggestions_by_chord: Dict[str, List[str]] = {}
+    if distinct_chords:
+        system_prompt = _key_context_prompt(tuple(chords)) + _SYSTEM_INSTRUCTIONS
+        try:
+            # One session for the whole progression: the system prompt is
+            # prefilled once and reused by every generate() below.
+            with lock, model.chat_session(system_prompt=system_prompt):
+                if len(distinct_chords) > 1:
+                    suggestions_by_chord = _batch_suggestions(
+                        model, distinct_chords, max_tokens
+                    )
+                remaining = [c for c in distinct_chords if c not in suggestions_by_chord]
+                if remaining:
+                    suggestions_by_chord.update(
+                        _single_chord_suggestions(model, remaining, max_tokens)
+                    )
+        except Exception as e:
+            log.error(f"GPT4All chat session failed: {e}")
+    for chord_str in distinct_chords:
+        if chord_str not in suggestions_by_chord:
+            suggestions_by_chord[chord_str] = [f"{chord_str}sus", f"{chord_str}6"]
+
+    return [
+        {
+            "original_chord": chord or "N/A",
+            "start_time": time,
+            "suggestions": list(suggestions_by_chord.get(chord, []))
+        }
+        for chord, time in zip(chords, times)
+    ]
+
+
+@functools.lru_cache(maxsize=64)
+def _key_context_prompt(chords: Tuple[str, ...]) -> str:
+    """
+    Describe the progression's detected key (and its scale) for the prompt.
+
+    Cached per progression, so regenerating suggestions for the same chords
+    skips key detection. Returns "" if no key is detected.
+    """
+    detected_key_info = detect_key_from_chords(list(chords))
     key_root_str = detected_key_info.get("key_root")
     key_quality_str = detected_key_info.get("key_quality", "major")
+    if not key_root_str:
+        return ""
+
+    key_context_prompt = (
+        f"The song is likely in the key of {key_root_str} {key_quality_str}. "
+    )
+    key_scale_notes = music_theory_utils.generate_scale(key_root_str, key_quality_str)
+    if key_scale_notes:
+        key_context_prompt += f"The notes in this key are: {', '.join(key_scale_notes)}. "
+    return key_context_prompt
+
 
-    key_context_prompt = ""
-    if key_root_str:
-        key_context_prompt = (
-            f"The song is likely in the key of {key_root_str} {key_quality_str}. "
+def _single_chord_suggestions(
+    model, chords: List[str], max_tokens: int
+) -> Dict[str, List[str]]:
+    """
+    Ask the model about each chord in turn, with one prompt per chord.
+
+    Generation runs on a single worker thread, so the model still handles one
+    prompt at a time, while each reply is parsed here as the next one is being
+    generated. A chord whose generation fails gets static suggestions.
+    Must run inside the progression's chat session.
+    """
+    suggestions_by_chord: Dict[str, List[str]] = {}
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = [
+            (chord_str, executor.submit(
+                model.generate, f"Chord: {chord_str}\nSubstitutions:",
+                max_tokens=max_tokens, temp=0.7, top_k=40, top_p=0.9
+            ))
+            for chord_str in chords
+        ]
+        for chord_str, future in pending:
+            try:
+                cleaned_suggestions = _parse_suggestions(future.result())
+            except Exception as e:
+                log.error(f"GPT4All generation failed for '{chord_str}': {e}")
+                suggestions_by_chord[chord_str] = [f"{chord_str}sus", f"{chord_str}6"]
+                continue
+            suggestions_by_chord[chord_str] = cleaned_suggestions or [chord_str]
+    return suggestions_by_chord
+
+
+def _batch_suggestions(
+    model, chords: List[str], max_tokens: int
+) -> Dict[str, List[str]]:
+    """
+    Ask the model about several chords in one generation call.
+
+    Must run inside the progression's chat session. Returns suggestions for
+    the chords whose numbered reply line parsed to at least one valid chord;
+    the caller asks about the rest one at a time.
+    """
+    numbered = "\n".join(f"{i}) {chord}" for i, chord in enumerate(chords, 1))
+    prompt = _BATCH_PROMPT + numbered
+    try:
+        response = model.generate(
+            prompt, max_tokens=max_tokens * len(chords),
+            temp=0.7, top_k=40, top_p=0.9
         )
-        key_scale_notes = music_theory_utils.generate_scale(key_root_str, key_quality_str)
-        if key_scale_notes:
-            key_context_prompt += f"The notes in this key are: {', '.join(key_scale_notes)}. "
-
-    llm_results = []
-    for chord_obj in chord_progression:
-        current_chord_str = chord_obj.get("chord")
-        if not current_chord_str:
-            llm_results.append({
-                "original_chord": "N/A",
-                "start_time": chord_obj.get("time"),
-                "suggestions": []
-            })
+    except Exception as e:
+        log.error(f"GPT4All batch generation failed, asking per chord: {e}")
+        return {}
+
+    suggestions_by_chord: Dict[str, List[str]] = {}
+    for line in response[:_MAX_REPLY_CHARS * len(chords)].splitlines():
+        match = _BATCH_LINE_RE.match(line)
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        if not 0 <= index < len(chords) or chords[index] in suggestions_by_chord:
             continue
+        cleaned_suggestions = _parse_suggestions(match.group(2))
+        if cleaned_suggestions:
+            suggestions_by_chord[chords[index]] = cleaned_suggestions
+    missing = len(chords) - len(suggestions_by_chord)
+    if missing:
+        log.debug(f"{missing} of {len(chords)} chords missing from batch reply")
+    return suggestions_by_chord
 
-        prompt = (
-            f"{key_context_prompt}"
-            f"Given the chord '{current_chord_str}', suggest one or two musically "
-            f"interesting and common chord substitutions or extensions (like adding a "
-            f"7th, 9th, sus, or a related minor/major chord). "
-            f"Be concise. Examples: G7, Am7, Csus4. "
-        )
 
-        try:
-            with model.chat_session():
-                response = model.generate(
-                    prompt, max_tokens=max_tokens, temp=0.7, top_k=40, top_p=0.9
-                )
-
-            text_to_parse = response.strip()
-            
-            # 1. Remove global introductory phrases iteratively
-            global_intro_phrases = [
-                "Sure, here are some suggestions:", "Here's a suggestion:", 
-                "Okay, how about" 
-            ]
-            active_text = text_to_parse
-            made_change_in_pass = True
-            while made_change_in_pass:
-                made_change_in_pass = False
-                for phrase in global_intro_phrases:
-                    match = re.match(f"^{re.escape(phrase)}\s*[:,]?\s*", active_text, re.IGNORECASE)
-                    if match:
-                        active_text = active_text[match.end():].strip()
-                        made_change_in_pass = True
-                        break 
-            text_to_parse = active_text
-            
-            # 2. Normalize conjunctions and primary delimiters (newline, comma) to a single unique delimiter (e.g., pipe)
-            text_to_parse = re.sub(r'\s+(?:or|and)\s+', '|', text_to_parse, flags=re.IGNORECASE)
-            text_to_parse = re.sub(r'[\n\r\t,]+', '|', text_to_parse) # Newlines and commas to pipe
-            text_to_parse = re.sub(r'[|]+', '|', text_to_parse) # Consolidate multiple pipes
-            
-            # Now split by the pipe. Then, each part might still contain space-separated chords.
-            parts_from_pipe_split = text_to_parse.split('|')
-            
-            potential_suggestions_final = []
-            for part in parts_from_pipe_split:
-                # Split parts that might be space-separated chords, e.g., "C G Am"
-                space_separated_sub_parts = re.split(r'\s+', part.strip())
-                potential_suggestions_final.extend(p for p in space_separated_sub_parts if p)
-
-            cleaned_suggestions = set()
-            item_intro_phrases = ["Try", "Maybe", "Consider", "Perhaps", "How about", "What about", "An option is", "Another option is", "Or perhaps"] 
-            trailing_punctuation = ".?!\"'"
-            
-            for part_to_clean in potential_suggestions_final: # Iterate over the fully split parts
-                s_processed = part_to_clean.strip()
-                if not s_processed: continue
-
-                # 3. Remove item-specific leading phrases iteratively for each part
-                active_s_part = s_processed
-                made_item_change = True
-                while made_item_change:
-                    made_item_change = False
-                    original_len = len(active_s_part)
-                    for phrase in item_intro_phrases:
-                        match = re.match(f"^{re.escape(phrase)}\s*[:,]?\s*", active_s_part, re.IGNORECASE)
-                        if match:
-                            active_s_part = active_s_part[match.end():].strip()
-                            if len(active_s_part) < original_len:
-                                made_item_change = True
-                            break 
-                    if not made_item_change: # No phrase removed in this pass for this item
-                        break
-                s_processed = active_s_part
-
-                # 4. Remove common trailing punctuation
-                if s_processed and s_processed[-1] in trailing_punctuation:
-                    s_processed = s_processed[:-1].strip()
-                
-                # 5. Validate with regex
-                chord_pattern = r"^[A-G][#b]?([\w\d#b\+\-\(\)]*)(/([A-G][#b]?))?$"
-                if s_processed and re.fullmatch(chord_pattern, s_processed, re.IGNORECASE):
-                    cleaned_suggestions.add(s_processed)
-                elif s_processed: 
-                    log.debug(f"Filtered out potential non-chord suggestion: '{s_processed}' from original part: '{part_to_clean}'")
-
-            if not cleaned_suggestions and current_chord_str: 
-                cleaned_suggestions.add(current_chord_str)
-
-            llm_results.append({
-                "original_chord": current_chord_str,
-                "start_time": chord_obj.get("time"),
-                "suggestions": sorted(list(cleaned_suggestions))
-            })
-        except Exception as e:
-            log.error(f"GPT4All generation failed for '{current_chord_str}': {e}")
-            llm_results.append({
-                "original_chord": current_chord_str,
-                "start_time": chord_obj.get("time"),
-                "suggestions": [f"{current_chord_str}sus", f"{current_chord_str}6"]
-            })
-
-    return llm_results
+def _parse_suggestions(response: str) -> List[str]:
+    """
+    Extract the valid chord names from a free-text model reply, in reply order.
+
+    Only the first _MAX_REPLY_CHARS characters are read: we want one or two
+    chords, and anything a verbose model adds beyond that is dropped.
+    """
+    text_to_parse = response[:_MAX_REPLY_CHARS].strip()
+
+    # 1. Remove global introductory phrases (any number, in one pass)
+    text_to_parse = _GLOBAL_INTRO_RE.sub('', text_to_parse, count=1)
+    
+    # 2. Normalize conjunctions and primary delimiters (newline, comma) to a
+    # pipe, then split on pipes and whitespace (parts may hold "C G Am")
+    text_to_parse = _CONJUNCTION_RE.sub('|', text_to_parse).translate(_DELIMITER_TABLE)
+    potential_suggestions_final = [
+        token for part in text_to_parse.split('|') for token in part.split()
+    ]
+
+    cleaned_suggestions: Dict[str, None] = {}  # Ordered set: keeps the model's ranking
+    trailing_punctuation = ".?!\"'"
+    
+    for part_to_clean in potential_suggestions_final: # Iterate over the fully split parts
+        s_processed = part_to_clean.strip()
+        if not s_processed: continue
+
+        # 3. Remove item-specific leading phrases for each part
+        s_processed = _ITEM_INTRO_RE.sub('', s_processed, count=1)
+
+        # 4. Remove common trailing punctuation
+        if s_processed and s_processed[-1] in trailing_punctuation:
+            s_processed = s_processed[:-1].strip()
+        
+        # 5. Validate with regex
+        if s_processed and _CHORD_RE.fullmatch(s_processed):
+            cleaned_suggestions.setdefault(s_processed, None)
+        elif s_processed: 
+            log.debug(f"Filtered out potential non-chord suggestion: '{s_processed}' from original part: '{part_to_clean}'")
+
+    return list(cleaned_suggestions)
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.DEBUG)
@@ -1,6 +1,7 @@
+import functools
 import logging
 import re # Import re for direct use
-from typing import List, Dict, Any 
+from typing import List, Dict, Any, NamedTuple, Optional, Sequence, Tuple
 
 from config import RULE_BASED_SUBSTITUTIONS
 from key_transpose_capo.key_analysis import detect_key_from_chords
@@ -8,6 +9,150 @@ from music_theory import utils as music_theory_utils
 
 log = logging.getLogger(__name__)
 
+try:
+    import numpy as np
+    from numba import njit
+
+    _numba_available = True
+except ImportError:
+    np = None  # type: ignore
+    njit = None  # type: ignore
+    _numba_available = False
+
+_ROOT_RE = re.compile(r"([A-G][#b]?)")
+# Qualities the 7th rules leave alone
+_DIM_AUG_SUS = ("dim", "aug", "sus")
+
+class _ChordQuality(NamedTuple):
+    """Substring tests on a chord name that the rules branch on."""
+    has_m: bool  # "m" anywhere, so also "min" and "maj"
+    has_maj: bool
+    has_7: bool
+    is_dim_aug_sus: bool
+    ends_7: bool
+    ends_maj7: bool
+
+
+@functools.lru_cache(maxsize=512)
+def _chord_quality(chord_str: str) -> _ChordQuality:
+    """Run the rules' substring tests once per distinct chord name."""
+    return _ChordQuality(
+        has_m="m" in chord_str,
+        has_maj="maj" in chord_str,
+        has_7="7" in chord_str,
+        is_dim_aug_sus=any(q in chord_str for q in _DIM_AUG_SUS),
+        ends_7=chord_str.endswith("7"),
+        ends_maj7=chord_str.endswith("maj7"),
+    )
+
+
+# Per-chord flags from _interval_flags
+_M7_IN_KEY = 1  # Minor 7th above the root is in the key's scale
+_MAJ7_IN_KEY = 2  # Major 7th above the root is in the key's scale
+_STEP_TO_NEXT = 4  # Next chord's root is a whole step up
+
+# Below this many chords the array conversion costs more than the loop saves.
+NUMBA_MIN_CHORDS = 2048
+
+
+if _numba_available:
+
+    @njit(cache=True)
+    def _interval_flags_kernel(root_values, scale_mask):
+        """Compiled _interval_flags over an int64 array (-1 = no root)."""
+        n = root_values.shape[0]
+        flags = np.zeros(n, dtype=np.int64)
+        for i in range(n):
+            root = root_values[i]
+            if root < 0:
+                continue
+            f = 0
+            if (scale_mask >> ((root + 10) % 12)) & 1:
+                f |= 1
+            if (scale_mask >> ((root + 11) % 12)) & 1:
+                f |= 2
+            if i + 1 < n and root_values[i + 1] >= 0 and (root_values[i + 1] - root + 12) % 12 == 2:
+                f |= 4
+            flags[i] = f
+        return flags
+
+
+def _scale_mask(scale_notes: Sequence[str]) -> int:
+    """12-bit mask of the pitch classes in scale_notes (bit n = note value n)."""
+    mask = 0
+    for note in scale_notes:
+        value = music_theory_utils.get_note_value(note)
+        if value is not None:
+            mask |= 1 << value
+    return mask
+
+
+@functools.lru_cache(maxsize=64)
+def _key_context(
+    chords: Tuple[str, ...]
+) -> Tuple[Optional[str], str, Optional[Tuple[str, ...]], int]:
+    """
+    Detected key root and quality, the key's scale and its _scale_mask.
+
+    Cached per progression, so repeated requests for the same chords skip
+    key detection and scale generation.
+    """
+    detected_key_info = detect_key_from_chords(list(chords))
+    key_root_str = detected_key_info.get("key_root")
+    key_quality_str = detected_key_info.get("key_quality", "major")
+    if not key_root_str:
+        return key_root_str, key_quality_str, None, 0
+    key_scale_notes = tuple(
+        music_theory_utils.generate_scale(key_root_str, key_quality_str)
+    )
+    scale_mask = _scale_mask(key_scale_notes) if key_scale_notes else 0
+    return key_root_str, key_quality_str, key_scale_notes, scale_mask
+
+
+def _interval_flags(root_values: List[Optional[int]], scale_mask: int) -> List[int]:
+    """
+    _M7_IN_KEY / _MAJ7_IN_KEY / _STEP_TO_NEXT flags for each chord root.
+
+    Chords without a root value get no flags, and neither does a whole step
+    onto one.
+    """
+    if _numba_available and len(root_values) >= NUMBA_MIN_CHORDS:
+        roots = np.fromiter(
+            (-1 if r is None else r for r in root_values),
+            dtype=np.int64,
+            count=len(root_values),
+        )
+        return _interval_flags_kernel(roots, scale_mask).tolist()
+
+    flags = []
+    for i, root in enumerate(root_values):
+        f = 0
+        if root is not None:
+            if (scale_mask >> ((root + 10) % 12)) & 1:
+                f |= _M7_IN_KEY
+            if (scale_mask >> ((root + 11) % 12)) & 1:
+                f |= _MAJ7_IN_KEY
+            next_root = root_values[i + 1] if i + 1 < len(root_values) else None
+            if next_root is not None and (next_root - root + 12) % 12 == 2:
+                f |= _STEP_TO_NEXT
+        flags.append(f)
+    return flags
+
+
+@functools.lru_cache(maxsize=512)
+def _chord_root(chord_str: str):
+    """Root note name at the start of a chord string (H read as B), or None."""
+    if not chord_str:
+        return None
+    root_match = _ROOT_RE.match(chord_str.replace("H", "B"))
+    return root_match.group(1) if root_match else None
+
+
+@functools.lru_cache(maxsize=32)
+def _root_value(root: str) -> Optional[int]:
+    """get_note_value for a parsed root, once per distinct root."""
+    return music_theory_utils.get_note_value(root)
+
 
 def apply_rule_based_flourishes(
     chord_progression: List[Dict[str, Any]],
@@ -26,97 +171,90 @@ def apply_rule_based_flourishes(
         List[Dict[str, Any]]: A list of flourish suggestions for each original chord.
             Each item is a dict: {"original_chord": str, "start_time": float, "suggestions": List[str]}
     """
-    substitutions_config = {} # Initialize
-    try:
-        # Attempt to get the specified rule set
-        current_rules = RULE_BASED_SUBSTITUTIONS.get(rule_set_name)
-        if current_rules is not None:
-            substitutions_config = current_rules
-        elif rule_set_name != "default": # If specified set not found and it wasn't "default"
+    substitutions_config = RULE_BASED_SUBSTITUTIONS.get(rule_set_name)
+    if substitutions_config is None:
+        if rule_set_name != "default": # If specified set not found and it wasn't "default"
             log.warning(f"Rule set '{rule_set_name}' not found. Using default rules.")
             substitutions_config = RULE_BASED_SUBSTITUTIONS.get("default", {}) # Fallback to default
         else: # Specified "default" was not found
-             log.warning(f"Default rule set not found. Using empty rules.")
-             substitutions_config = {} # Fallback to empty if default is also missing
-    except Exception as e:
-        log.error(f"Error loading rule set '{rule_set_name}': {e}. Using empty rules.")
-        substitutions_config = {}
+            log.warning("Default rule set not found. Using empty rules.")
+            substitutions_config = {} # Fallback to empty if default is also missing
 
+    # Work on parallel chord/time lists rather than the per-event dicts
+    chords = [c.get("chord") or "" for c in chord_progression]
+    times = [c.get("time") for c in chord_progression]
 
-    original_chord_strings = [c.get("chord", "") for c in chord_progression]
-    detected_key_info = detect_key_from_chords(original_chord_strings)
-    key_root_str = detected_key_info.get("key_root")
-    key_quality_str = detected_key_info.get("key_quality", "major")
+    if not any(chords):
+        return []  # Nothing to suggest for; skip key detection
+    key_root_str, key_quality_str, key_scale_notes, scale_mask = _key_context(tuple(chords))
 
     log.info(f"Detected key for flourishes: {key_root_str} {key_quality_str if key_root_str else 'None'}")
 
     flourish_results = []
 
-    for i, current_chord_obj in enumerate(chord_progression):
-        current_chord_str = current_chord_obj.get("chord")
+    # Loop invariants: the rule table and each chord's root and root value
+    # (every root is needed twice, as "current" and as "next" chord).
+    simple_sub_rules = substitutions_config.get("simple_substitutions", {})
+    chord_roots = [_chord_root(c) for c in chords]
+    root_values = [_root_value(root) if root else None for root in chord_roots]
+    interval_flags = _interval_flags(root_values, scale_mask)
+    # Checked once: the per-chord debug f-strings are only built when shown
+    debug = log.isEnabledFor(logging.DEBUG)
+
+    for i, current_chord_str in enumerate(chords):
         if not current_chord_str:
             continue
 
-        suggestions = {current_chord_str}
+        # The chord itself first, then suggestions as the rules add them;
+        # duplicates are dropped (keeping first position) when emitting
+        suggestions: List[str] = [current_chord_str]
 
-        simple_sub_rules = substitutions_config.get("simple_substitutions", {})
         simple_sub = simple_sub_rules.get(current_chord_str)
         if simple_sub:
-            suggestions.add(simple_sub)
+            suggestions.append(simple_sub)
 
-        # Extract root note directly using regex
-        root_match = re.match(r"([A-G][#b]?)", current_chord_str.replace("H", "B"))
-        actual_chord_root_str = root_match.group(1) if root_match else None
+        actual_chord_root_str = chord_roots[i]
+        quality = _chord_quality(current_chord_str)
         
         if not actual_chord_root_str:
-            log.debug(f"Could not parse root from chord: {current_chord_str}. Skipping some theory-based rules.")
+            if debug:
+                log.debug(f"Could not parse root from chord: {current_chord_str}. Skipping some theory-based rules.")
         
         # Diatonic 7ths (requires key and valid root)
-        if key_root_str and actual_chord_root_str:
-            key_scale_notes = music_theory_utils.generate_scale(key_root_str, key_quality_str)
-            root_val = music_theory_utils.get_note_value(actual_chord_root_str)
-
-            if root_val is not None:
-                # Minor 7th interval
-                m7_interval_val = (root_val + 10) % 12
-                m7_note_name = music_theory_utils.get_note_name(m7_interval_val)
-                log.debug(f"Chord: {current_chord_str}, Key: {key_root_str}{key_quality_str}, Root: {actual_chord_root_str}({root_val}), m7_val: {m7_interval_val}, m7_name: {m7_note_name}, Scale: {key_scale_notes}")
-                if m7_note_name in key_scale_notes:
-                    log.debug(f"Diatonic m7_note_name '{m7_note_name}' IS in scale for {current_chord_str}.")
-                    is_minor = "m" in current_chord_str and "maj" not in current_chord_str
-                    is_dim_aug_sus = any(q in current_chord_str for q in ["dim", "aug", "sus"])
-                    
-                    if is_minor:
-                        added_chord = current_chord_str.replace("m", "m7", 1).replace("min", "min7", 1)
-                        if not (added_chord.endswith("m77") or added_chord.endswith("min77")): # Avoid Am77
-                             suggestions.add(added_chord)
+        if key_root_str and actual_chord_root_str and root_values[i] is not None:
+            if interval_flags[i] & _M7_IN_KEY:
+                if debug:
+                    log.debug(f"Diatonic m7 of {current_chord_str} is in {key_root_str} {key_quality_str}: {key_scale_notes}")
+                is_minor = quality.has_m and not quality.has_maj
+                
+                if is_minor:
+                    added_chord = current_chord_str.replace("m", "m7", 1).replace("min", "min7", 1)
+                    if not (added_chord.endswith("m77") or added_chord.endswith("min77")): # Avoid Am77
+                         suggestions.append(added_chord)
+                         if debug:
                              log.debug(f"Added minor 7th: {added_chord}")
-                    elif not is_dim_aug_sus and not current_chord_str.endswith("7"): # Major or plain
-                        # Check if it's a dominant function (e.g. V in major, V of relative major in minor)
-                        # For simplicity, add "7" if it's not minor, dim, aug, sus
-                        suggestions.add(current_chord_str + "7")
+                elif not quality.is_dim_aug_sus and not quality.ends_7: # Major or plain
+                    # Check if it's a dominant function (e.g. V in major, V of relative major in minor)
+                    # For simplicity, add "7" if it's not minor, dim, aug, sus
+                    suggestions.append(current_chord_str + "7")
+                    if debug:
                         log.debug(f"Added dominant 7th: {current_chord_str + '7'}")
+            
+            if interval_flags[i] & _MAJ7_IN_KEY:
+                if debug:
+                    log.debug(f"Diatonic M7 of {current_chord_str} is in {key_root_str} {key_quality_str}: {key_scale_notes}")
+                is_major_type = (quality.has_maj or \
+                                 current_chord_str == actual_chord_root_str or \
+                                 not (quality.has_m or quality.has_7 or quality.is_dim_aug_sus))
                 
-                # Major 7th interval
-                M7_interval_val = (root_val + 11) % 12
-                M7_note_name = music_theory_utils.get_note_name(M7_interval_val)
-                log.debug(f"Chord: {current_chord_str}, Key: {key_root_str}{key_quality_str}, Root: {actual_chord_root_str}({root_val}), M7_val: {M7_interval_val}, M7_name: {M7_note_name}, Scale: {key_scale_notes}")
-                if M7_note_name in key_scale_notes:
-                    log.debug(f"Diatonic M7_note_name '{M7_note_name}' IS in scale for {current_chord_str}.")
-                    is_major_type = ("maj" in current_chord_str or \
-                                     current_chord_str == actual_chord_root_str or \
-                                     not any(q in current_chord_str for q in ["m", "min", "dim", "aug", "7", "sus"]))
-                    
-                    if is_major_type and not current_chord_str.endswith("maj7"):
-                        suggestions.add(current_chord_str + "maj7")
+                if is_major_type and not quality.ends_maj7:
+                    suggestions.append(current_chord_str + "maj7")
+                    if debug:
                         log.debug(f"Added major 7th: {current_chord_str + 'maj7'}")
         
         # Sus chords (does not require key, but requires valid root for naming)
         if actual_chord_root_str:
-            is_sus_dim_aug = "sus" in current_chord_str or \
-                             "dim" in current_chord_str or \
-                             "aug" in current_chord_str
-            if not is_sus_dim_aug:
+            if not quality.is_dim_aug_sus:
                 # Extract quality suffix from the original chord string
                 quality_suffix = current_chord_str[len(actual_chord_root_str):]
                 # If the quality_suffix makes it a dominant 7th already (like "G7"), 
@@ -154,32 +292,20 @@ def apply_rule_based_flourishes(
                 # Add other qualities if they should be preserved before "sus", e.g. "dom" for G7sus4
                 # For now, this handles "Am" -> "Amsus2" and "C" -> "Csus2" correctly.
 
-                suggestions.add(base_for_sus + "sus4")
-                suggestions.add(base_for_sus + "sus2")
+                suggestions.append(base_for_sus + "sus4")
+                suggestions.append(base_for_sus + "sus2")
 
         # Passing diminished chord (requires valid roots for current and next)
-        if i + 1 < len(chord_progression) and actual_chord_root_str:
-            next_chord_str = chord_progression[i+1].get("chord")
-            if next_chord_str:
-                next_root_match = re.match(r"([A-G][#b]?)", next_chord_str.replace("H", "B"))
-                next_actual_root_str = next_root_match.group(1) if next_root_match else None
-                
-                if next_actual_root_str:
-                    current_root_val = music_theory_utils.get_note_value(actual_chord_root_str)
-                    next_root_val = music_theory_utils.get_note_value(next_actual_root_str)
-
-                    if current_root_val is not None and next_root_val is not None:
-                        if (next_root_val - current_root_val + 12) % 12 == 2: # Whole step up
-                            log.debug(f"Passing dim check: current={current_chord_str} (root_val={current_root_val}), next={next_chord_str} (root_val={next_root_val})")
-                            passing_dim_root_val = (current_root_val + 1) % 12
-                            passing_dim_root_name = music_theory_utils.get_note_name(passing_dim_root_val)
-                            log.debug(f"Calculated passing_dim_root_name: {passing_dim_root_name} (from val {passing_dim_root_val})")
-                            suggestions.add(passing_dim_root_name + "dim")
+        if interval_flags[i] & _STEP_TO_NEXT:
+            if debug:
+                log.debug(f"Passing dim: {current_chord_str} -> {chords[i + 1]} is a whole step up")
+            passing_dim_root_name = music_theory_utils.get_note_name(root_values[i] + 1)
+            suggestions.append(passing_dim_root_name + "dim")
 
         flourish_results.append({
             "original_chord": current_chord_str,
-            "start_time": current_chord_obj.get("time"),
-            "suggestions": sorted(list(suggestions))
+            "start_time": times[i],
+            "suggestions": list(dict.fromkeys(suggestions))
         })
 
     log.info(f"Applied rule-based flourishes. Results: {len(flourish_results)} items.")
@@ -1,12 +1,135 @@
 """
 Capo advisor: recommends capo fret based on chord complexity heuristics.
 """
-from typing import List, Tuple
+from typing import List, NamedTuple, Optional, Tuple
+from collections import Counter
+import functools
 import logging
+import re
 from music_theory import utils as mtu # Added import
 
 log = logging.getLogger(__name__)
 
+# Capo positions considered by recommend_capo (no capo, then frets 1-7)
+CAPO_FRETS = 8
+
+# Consider expanding open_chords if desired, e.g., with common open 7ths
+OPEN_CHORDS = frozenset({
+    "C", "D", "E", "G", "A", "Em", "Am", "Dm",
+    "Cmaj7", "Gmaj7", "Dmaj7", "Amaj7", "Emaj7", # Common open Maj7
+    "C7", "D7", "E7", "G7", "A7",                # Common open Dom7
+    "Dm7", "Em7", "Am7",                          # Common open min7
+})
+
+# Root, quality suffix and optional slash bass, e.g. "F#m7/C#"
+_CHORD_RE = re.compile(r"([A-G][#b]?)([^/]*)(?:/([A-G][#b]?))?")
+# Suffix spellings folded together when scoring against OPEN_CHORDS
+_QUALITY_ALIASES = {"maj": "", "min": "m", "M7": "maj7", "min7": "m7"}
+
+
+class _ParsedChord(NamedTuple):
+    root: int              # Pitch class of the root
+    suffix: str            # Quality suffix as written ("m7", "sus4", ...)
+    bass: Optional[int]    # Pitch class of the slash bass, if any
+
+
+def _parse_chord(chord_str: str) -> Optional[_ParsedChord]:
+    """Split a chord name into pitch classes, or None if it's not a plain known chord."""
+    if not isinstance(chord_str, str):
+        return None
+    match = _CHORD_RE.fullmatch(chord_str.strip().replace("H", "B"))
+    if not match:
+        return None
+    root, suffix, bass = match.groups()
+    if not any(pattern.fullmatch(suffix) for pattern, _ in mtu.CHORD_QUALITY_PATTERNS):
+        return None
+    # Spellings outside the note table (Cb, Fb, E#, B#) are left to music21
+    root_value = mtu.NOTE_TO_VALUE.get(root)
+    bass_value = mtu.NOTE_TO_VALUE.get(bass) if bass else None
+    if root_value is None or (bass and bass_value is None):
+        return None
+    return _ParsedChord(root_value, suffix, bass_value)
+
+
+# (root pitch class, normalized quality) of every open chord
+_OPEN_SHAPES = frozenset(
+    (p.root, _QUALITY_ALIASES.get(p.suffix, p.suffix))
+    for p in map(_parse_chord, OPEN_CHORDS)
+)
+
+
+class _CapoShapes(NamedTuple):
+    names: Tuple[Optional[str], ...]   # Shape per capo fret (None if unworkable)
+    barre: Tuple[int, ...]             # 1 where that shape is not an open chord
+
+
+@functools.lru_cache(maxsize=512)
+def _chord_symbol(chord_str: str):
+    """
+    Parse a chord name to a music21 ChordSymbol once, across frets and calls.
+
+    The result is shared, so it must not be modified (transpose() returns a
+    new object). Raises if the chord cannot be parsed.
+    """
+    from music21 import harmony
+    # Use our more robust parser first to get notes
+    parsed_notes = mtu.parse_chord_to_notes(chord_str)
+    if not parsed_notes or (len(parsed_notes) == 1 and parsed_notes[0] == chord_str):
+        # If our parser fails, let music21 try, or raise error
+        log.warning(f"mtu.parse_chord_to_notes failed for '{chord_str}', trying direct music21 parse.")
+        return harmony.ChordSymbol(chord_str) # music21's direct attempt
+    # Construct music21 chord from our parsed notes for reliable transposition
+    return harmony.ChordSymbol(notes=parsed_notes)
+
+
+@functools.lru_cache(maxsize=4096)
+def _shape_name(chord_str: str, capo_fret: int) -> str:
+    """Chord shape to play for chord_str with a capo on capo_fret."""
+    # To find playable shapes with capo at capo_fret,
+    # transpose the sounding chord DOWN by that many semitones.
+    return _chord_symbol(chord_str).transpose(-capo_fret).figure # Use .figure for standard notation
+
+
+@functools.lru_cache(maxsize=512)
+def _capo_shapes(chord_str: str) -> _CapoShapes:
+    """
+    Shapes to play for chord_str at every capo position, and which are barre.
+
+    Plain chord names are moved down with pitch-class arithmetic; anything
+    else goes through music21, and frets it can't handle are left as None.
+    """
+    parsed = _parse_chord(chord_str)
+    if parsed is not None:
+        root, suffix, bass = parsed
+        quality = _QUALITY_ALIASES.get(suffix, suffix)
+        names = []
+        barre = []
+        for fret in range(CAPO_FRETS):
+            # To find playable shapes with capo at fret, move the sounding chord DOWN.
+            shape_root = (root - fret) % 12
+            name = mtu.NOTES_SHARP[shape_root] + suffix
+            if bass is not None:
+                name += "/" + mtu.NOTES_SHARP[(bass - fret) % 12]
+            names.append(name)
+            barre.append(int((shape_root, quality) not in _OPEN_SHAPES))
+        return _CapoShapes(tuple(names), tuple(barre))
+
+    try:
+        _chord_symbol(chord_str)
+    except Exception as e:
+        log.warning(f"Error processing chord '{chord_str}': {e}", exc_info=False) # Log simple error
+        return _CapoShapes((None,) * CAPO_FRETS, (0,) * CAPO_FRETS)
+    names = []
+    for fret in range(CAPO_FRETS):
+        try:
+            names.append(_shape_name(chord_str, fret))
+        except Exception as e:
+            log.warning(f"Error processing chord '{chord_str}' for capo {fret}: {e}", exc_info=False)
+            names.append(None)
+    # For scoring against OPEN_CHORDS, ignore slash part if present
+    barre = tuple(int(n is not None and n.split('/')[0] not in OPEN_CHORDS) for n in names)
+    return _CapoShapes(tuple(names), barre)
+
 def recommend_capo(chords: List[str]) -> Tuple[int, List[str]]:
     """
     Recommend a capo fret and return the transposed chord set.
@@ -20,71 +143,37 @@ def recommend_capo(chords: List[str]) -> Tuple[int, List[str]]:
         Tuple[int, List[str]]: (recommended fret, list of transposed chords)
 
     Notes:
-        Open chords are defined as {"C", "D", "E", "G", "A", "Em", "Am", "Dm"}.
+        Open chords are the shapes in OPEN_CHORDS (open triads, maj7, 7 and m7).
         The function prefers the fret with the most open chords after transposition.
+        Shapes are spelled with sharps; chords that aren't a plain root,
+        known quality and optional slash bass are transposed with music21.
     """
-    from music21 import harmony # Use harmony.ChordSymbol for better parsing and figure output
-    
-    # Consider expanding open_chords if desired, e.g., with common open 7ths
-    open_chords = {"C", "D", "E", "G", "A", "Em", "Am", "Dm", 
-                   "Cmaj7", "Gmaj7", "Dmaj7", "Amaj7", "Emaj7", # Common open Maj7
-                   "C7", "D7", "E7", "G7", "A7",             # Common open Dom7
-                   "Dm7", "Em7", "Am7"}                       # Common open min7
-
-
     best_fret = 0
-    # Initialize best_score to a high value (e.g., number of chords, assuming all non-open)
-    # or handle the case of an empty chord list first.
     if not chords:
         return 0, []
 
     best_score = len(chords) + 1 # Max possible non-open chords + 1
     best_transposed_shapes = list(chords) # Default to original if no better capo found
 
-    for fret_to_try_capo in range(0, 8): # Capo on fret 0 to 7
-        current_transposed_shapes = []
-        current_score = 0
-        possible_to_transpose_all = True
-        for original_chord_str in chords:
-            try:
-                # Use our more robust parser first to get notes
-                parsed_notes = mtu.parse_chord_to_notes(original_chord_str)
-                if not parsed_notes or (len(parsed_notes) == 1 and parsed_notes[0] == original_chord_str):
-                    # If our parser fails, let music21 try, or raise error
-                    log.warning(f"mtu.parse_chord_to_notes failed for '{original_chord_str}', trying direct music21 parse.")
-                    cs = harmony.ChordSymbol(original_chord_str) # music21's direct attempt
-                else:
-                    # Construct music21 chord from our parsed notes for reliable transposition
-                    cs = harmony.ChordSymbol(notes=parsed_notes)
-
-                # To find playable shapes with capo at fret_to_try_capo,
-                # transpose the sounding chord DOWN by that many semitones.
-                transposed_shape_cs = cs.transpose(-fret_to_try_capo)
-                shape_name = transposed_shape_cs.figure # Use .figure for standard notation
-                current_transposed_shapes.append(shape_name)
-                
-                # For scoring against open_chords, ignore slash part if present
-                score_shape_name = shape_name.split('/')[0]
-                if score_shape_name not in open_chords:
-                    current_score += 1
-            except Exception as e:
-                # If a chord can't be parsed/transposed, this capo position is problematic.
-                # Option 1: Skip this fret entirely.
-                # Option 2: Penalize heavily or mark as invalid.
-                # Current choice: Skip this fret by breaking and not updating best_score.
-                # log is now defined at module level
-                log.warning(f"Error processing chord '{original_chord_str}' for capo {fret_to_try_capo}: {e}", exc_info=False) # Log simple error
-                possible_to_transpose_all = False
-                break # Move to next fret if any chord fails for this capo position
-        
-        if possible_to_transpose_all and current_score < best_score:
+    # Songs repeat a few chords: look each distinct one up once and weight
+    # its barre flags by how often it occurs.
+    counts = Counter(chords)
+    shapes_by_chord = {chord_str: _capo_shapes(chord_str) for chord_str in counts}
+
+    for fret_to_try_capo in range(CAPO_FRETS): # Capo on fret 0 to 7
+        # If a chord can't be parsed/transposed, this capo position is skipped.
+        if any(shapes.names[fret_to_try_capo] is None for shapes in shapes_by_chord.values()):
+            continue
+        current_score = sum(
+            count * shapes_by_chord[chord_str].barre[fret_to_try_capo]
+            for chord_str, count in counts.items()
+        )
+        # Frets are tried in ascending order, so ties keep the lower fret.
+        if current_score < best_score:
             best_score = current_score
             best_fret = fret_to_try_capo
-            best_transposed_shapes = current_transposed_shapes
-        elif possible_to_transpose_all and current_score == best_score:
-            # Tie-breaking: prefer lower capo fret if scores are equal
-            if fret_to_try_capo < best_fret:
-                best_fret = fret_to_try_capo
-                best_transposed_shapes = current_transposed_shapes
-                
+            best_transposed_shapes = [shapes_by_chord[c].names[best_fret] for c in chords]
+            if best_score == 0:
+                break  # All open: no higher fret can beat (or tie-break past) this one
+
     return best_fret, best_transposed_shapes
@@ -1,3 +1,5 @@
+import functools
+import heapq
 import logging
 import re
 from typing import List, Optional, Tuple 
@@ -30,8 +32,10 @@ def score_shape_playability(shape: ChordShape, fretboard: Fretboard) -> int:
         if finger > 0:
             active_fingers.add(finger) 
             if fret != 0: 
-                min_fret_used = min(min_fret_used, fret)
-                max_fret_used = max(max_fret_used, fret)
+                if fret < min_fret_used:
+                    min_fret_used = fret
+                if fret > max_fret_used:
+                    max_fret_used = fret
         elif finger == 0:
             open_strings_count += 1
         elif finger == -1:
@@ -65,21 +69,51 @@ def score_shape_playability(shape: ChordShape, fretboard: Fretboard) -> int:
              barre_len_penalty = len(shape.barre_strings_offset)
              score += barre_len_penalty
     
-    log.debug(
-        f"Shape: {shape.name}, Final Score: {score} (Fingers: {num_fingers_used}, "
-        f"Span: {fret_span}, Open: {open_strings_count}, Muted: {muted_strings_count}, "
-        f"Barre: {bool(shape.barre_strings_offset and shape.base_fret_of_template > 0)})"
-    )
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            f"Shape: {shape.name}, Final Score: {score} (Fingers: {num_fingers_used}, "
+            f"Span: {fret_span}, Open: {open_strings_count}, Muted: {muted_strings_count}, "
+            f"Barre: {bool(shape.barre_strings_offset and shape.base_fret_of_template > 0)})"
+        )
     return score
 
 
 def suggest_fingerings(
     chord_str: str,
-    fretboard: Optional[Fretboard] = None
+    fretboard: Optional[Fretboard] = None,
+    top_k: Optional[int] = None,
+    use_cache: bool = True
 ) -> List[Tuple[ChordShape, int]]: # Changed return type to include score
-    log.info(f"Suggesting fingerings for chord: {chord_str}")
+    """
+    Rank candidate shapes for a chord by playability (lowest score first).
+
+    With top_k, only the best top_k (shape, score) pairs are kept and ordered
+    (a bounded heap instead of a full sort); ties keep candidate order.
+    Results are memoized per (chord, tuning, fret count, top_k) since a song
+    repeats the same few chords; pass use_cache=False to recompute.
+    The returned shapes are shared between calls and must not be mutated.
+    """
     if fretboard is None:
         fretboard = Fretboard()
+    if not use_cache:
+        return _rank_fingerings(chord_str, fretboard, top_k)
+    return list(_suggest_fingerings_cached(
+        chord_str, tuple(fretboard.tuning_str), fretboard.num_frets, top_k
+    ))
+
+
+@functools.lru_cache(maxsize=512)
+def _suggest_fingerings_cached(
+    chord_str: str, tuning: Tuple[str, ...], num_frets: int, top_k: Optional[int]
+) -> Tuple[Tuple[ChordShape, int], ...]:
+    fretboard = Fretboard(tuning=list(tuning), num_frets=num_frets)
+    return tuple(_rank_fingerings(chord_str, fretboard, top_k))
+
+
+def _rank_fingerings(
+    chord_str: str, fretboard: Fretboard, top_k: Optional[int]
+) -> List[Tuple[ChordShape, int]]:
+    log.info(f"Suggesting fingerings for chord: {chord_str}")
 
     root_match = re.match(r"([A-G][#b]?)", chord_str)
     if not root_match:
@@ -132,12 +166,14 @@ def suggest_fingerings(
         if candidate_shapes:
             log.debug(f"Used fallback to basic major/minor shapes for {root_note_str_for_shapes}, original type '{chord_type}'.")
 
-    scored_shapes: List[Tuple[ChordShape, int]] = []
-    for shape in candidate_shapes:
-        score = score_shape_playability(shape, fretboard)
-        scored_shapes.append((shape, score))
+    scored_shapes: List[Tuple[ChordShape, int]] = [
+        (shape, score_shape_playability(shape, fretboard)) for shape in candidate_shapes
+    ]
 
-    scored_shapes.sort(key=lambda item: item[1])
+    if top_k is not None:
+        scored_shapes = heapq.nsmallest(max(top_k, 0), scored_shapes, key=lambda item: item[1])
+    else:
+        scored_shapes.sort(key=lambda item: item[1])
     # Return the shapes along with their scores
     final_suggestions_with_scores = scored_shapes
 
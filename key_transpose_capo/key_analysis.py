@@ -1,7 +1,9 @@
 """
 Key analysis using music21's KrumhanslSchmuckler algorithm.
 """
-from typing import List, Dict, Optional # Tuple removed, Counter removed
+from typing import List, Dict, Optional, Tuple # Counter removed
+import copy
+import functools
 import logging
 # from collections import Counter # No longer needed for heuristic
 from music_theory import utils as mtu # Still needed for get_note_name if we parse root ourselves
@@ -10,29 +12,62 @@ log = logging.getLogger(__name__)
 
 # Heuristic related constants and functions are removed for now.
 
+
+@functools.lru_cache(maxsize=256)
+def _chord_symbol_template(c_str: str):
+    """
+    Parse a chord name to a music21 ChordSymbol once, across calls.
+
+    Returns None if music21 cannot parse it. The result is shared: callers
+    must append deep copies (a Stream also cannot hold one object twice).
+    """
+    from music21 import harmony
+    try:
+        chord_obj = harmony.ChordSymbol(c_str)
+    except Exception as e_parse:
+        log.debug(f"Could not parse chord '{c_str}' with music21: {e_parse}")
+        return None
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"Parsed '{c_str}' to music21 ChordSymbol: Root: {chord_obj.root().name}, Quality: {chord_obj.quality}")
+    return chord_obj
+
+
 def detect_key_from_chords(chord_list: List[str]) -> Dict[str, Optional[str]]:
-    log.debug(f"Detecting key for: {chord_list} using music21 KrumhanslSchmuckler.")
+    # The same progression is often analyzed again (per rule set, per
+    # request), so results are cached per chord tuple. Callers get their
+    # own copy of the dict.
+    chords = tuple(chord_list or ())
+    try:
+        hash(chords)
+    except TypeError:  # Unhashable junk entries: analyze without caching
+        return _detect_key(chords)
+    return dict(_detect_key_cached(chords))
+
+
+def _detect_key(chord_list: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+    debug = log.isEnabledFor(logging.DEBUG)
+    if debug:
+        log.debug(f"Detecting key for: {chord_list} using music21 KrumhanslSchmuckler.")
     
     if not chord_list:
         log.warning("Empty chord list provided for key detection.")
         return {"key_root": None, "key_quality": None, "full_key_name": None, "error": "Empty chord list."}
 
     try:
-        from music21 import stream, harmony, analysis, pitch
+        from music21 import stream, analysis, pitch
         s = stream.Stream()
         valid_chords_added = 0
+        # Songs repeat a few chords: each distinct name is parsed once (and
+        # remembered across calls) and copies are appended.
         for c_str in chord_list:
             if not c_str or not isinstance(c_str, str):
                 log.debug(f"Skipping invalid chord input: {c_str}")
                 continue
-            try:
-                chord_obj = harmony.ChordSymbol(c_str)
-                log.debug(f"Parsed '{c_str}' to music21 ChordSymbol: Root: {chord_obj.root().name}, Quality: {chord_obj.quality}")
-                s.append(chord_obj)
-                valid_chords_added += 1
-            except Exception as e_parse:
-                log.debug(f"Could not parse chord '{c_str}' with music21: {e_parse}")
+            template = _chord_symbol_template(c_str)
+            if template is None:
                 continue
+            s.append(copy.deepcopy(template))
+            valid_chords_added += 1
         
         if valid_chords_added == 0:
             log.warning("No valid chords found in list for music21 key detection.")
@@ -68,3 +103,6 @@ def detect_key_from_chords(chord_list: List[str]) -> Dict[str, Optional[str]]:
     except Exception as e:
         log.error(f"Key detection failed with music21: {e}", exc_info=True)
         return {"key_root": None, "key_quality": None, "full_key_name": None, "error": f"Music21 key detection failed: {str(e)}"}
+
+
+_detect_key_cached = functools.lru_cache(maxsize=256)(_detect_key)
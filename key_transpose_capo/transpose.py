@@ -1,12 +1,16 @@
 """
 Chord transposition utilities using music21.
 """
-from typing import List
+import functools
+from typing import Callable, List
 
 def transpose_chords(chords: List[str], interval: int) -> List[str]:
     """
     Transpose a list of chords by the given interval (in semitones) using music21.
 
+    Each distinct (chord, interval) pair is transposed once and memoized, so
+    repeated chords (within a song or across calls) skip music21 entirely.
+
     Args:
         chords (List[str]): List of chord names as strings.
         interval (int): Number of semitones to transpose.
@@ -17,21 +21,43 @@ def transpose_chords(chords: List[str], interval: int) -> List[str]:
     Raises:
         ValueError: If a chord cannot be parsed or transposed.
     """
+    return list(map(make_transposer(interval), chords))
+
+
+@functools.lru_cache(maxsize=32)
+def make_transposer(semitones: int) -> Callable[[str], str]:
+    """
+    Build a single-argument transposer with `semitones` bound in.
+
+    The interval is kept as given rather than reduced modulo 12: music21
+    spells the result by direction (E down 1 is Eb, up 11 is D#).
+
+    Args:
+        semitones (int): Number of semitones to transpose.
+
+    Returns:
+        Callable[[str], str]: Function mapping a chord name to its
+        transposed name; raises ValueError for unparseable chords.
+    """
+    def _transposer(chord: str) -> str:
+        return _transpose_chord(chord, semitones)
+    return _transposer
+
+
+@functools.lru_cache(maxsize=1024)
+def _transpose_chord(c: str, interval: int) -> str:
     from music21 import harmony, pitch
-    transposed = []
-    for c in chords:
+    try:
+        # Use ChordSymbol for common chord names (e.g., Am, F#m, G7)
+        cs = harmony.ChordSymbol(c)
+        cs = cs.transpose(interval)
+        # Output as string (e.g., 'Am', 'F#m', 'G7')
+        return cs.figure
+    except Exception:
+        # Fallback: try as a single note
         try:
-            # Use ChordSymbol for common chord names (e.g., Am, F#m, G7)
-            cs = harmony.ChordSymbol(c)
-            cs = cs.transpose(interval)
-            # Output as string (e.g., 'Am', 'F#m', 'G7')
-            transposed.append(cs.figure)
+            p = pitch.Pitch(c)
+            p = p.transpose(interval)
+            return p.name
         except Exception:
-            # Fallback: try as a single note
-            try:
-                p = pitch.Pitch(c)
-                p = p.transpose(interval)
-                transposed.append(p.name)
-            except Exception:
-                raise ValueError(f"Invalid chord: {c}")
-    return transposed
+            raise ValueError(f"Invalid chord: {c}")
@@ -1,23 +1,39 @@
+import functools
+import importlib.util
 import logging
 import re
 from typing import Optional, Dict, Any
 
-from bs4 import BeautifulSoup
 # from urllib.parse import quote # Not used, removed
 
 
 log = logging.getLogger(__name__)
 
+# lxml builds the tree in C; bs4 falls back to the stdlib parser without it
+_HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+_LYRICS_CONTAINER_CLASS = 'col-xs-12 col-lg-8 text-center'
+
+_EMBED_SHARE_RE = re.compile(r'Embed\s*Share\s*Url:.*', flags=re.DOTALL)
+_TRANSLATIONS_RE = re.compile(r'\(\d+ translations?\)')
+_SECTION_TAG_RE = re.compile(r'\[.*?\]')
+_MULTI_SPACE_RE = re.compile(r' {2,}')
+_MULTI_NEWLINE_RE = re.compile(r'\n{3,}')
+
 
 def _sanitize_name(name: str) -> str:
     """Sanitizes a string for use in a URL path (lowercase, alphanumeric only)."""
     return re.sub(r'[^a-z0-9]', '', name.lower())
 
 
+@functools.lru_cache(maxsize=32)
 def parse_azlyrics_html(html_content: str, title: str, artist: str) -> Optional[str]:
     """
     Parses lyrics from AZLyrics.com HTML content.
 
+    Parsing is pure, so results are memoized per (html, title, artist); the
+    HTML parser (bs4, backed by lxml when installed) is only imported on
+    first use, and only the lyrics container is turned into a tree.
+
     Args:
         html_content (str): The HTML content of the AZLyrics page.
         title (str): The title of the song.
@@ -28,9 +44,15 @@ def parse_azlyrics_html(html_content: str, title: str, artist: str) -> Optional[
     """
     log.info(f"Parsing AZLyrics HTML for {title} by {artist}")
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        # Only build the lyrics container's subtree, not the whole page
+        soup = BeautifulSoup(
+            html_content, _HTML_PARSER,
+            parse_only=SoupStrainer('div', class_=_LYRICS_CONTAINER_CLASS)
+        )
 
-        lyrics_div = soup.find('div', class_='col-xs-12 col-lg-8 text-center')
+        lyrics_div = soup.find('div', class_=_LYRICS_CONTAINER_CLASS)
         if lyrics_div:
             lyrics_content = None
             candidate_divs = []
@@ -62,14 +84,12 @@ def parse_azlyrics_html(html_content: str, title: str, artist: str) -> Optional[
 
             if lyrics_content:
                 # Remove any common AZLyrics disclaimers
-                lyrics_content = re.sub(
-                    r'Embed\s*Share\s*Url:.*', '', lyrics_content, flags=re.DOTALL
-                )
-                lyrics_content = re.sub(r'\(\d+ translations?\)', '', lyrics_content)
-                lyrics_content = re.sub(r'\[.*?\]', '', lyrics_content) # Removes [Chorus] etc.
+                lyrics_content = _EMBED_SHARE_RE.sub('', lyrics_content)
+                lyrics_content = _TRANSLATIONS_RE.sub('', lyrics_content)
+                lyrics_content = _SECTION_TAG_RE.sub('', lyrics_content) # Removes [Chorus] etc.
                 
                 # Convert multiple spaces to a single space (e.g., left by [Chorus] removal)
-                lyrics_content = re.sub(r' {2,}', ' ', lyrics_content)
+                lyrics_content = _MULTI_SPACE_RE.sub(' ', lyrics_content)
 
                 # Normalize newlines and strip each line
                 lines = [line.strip() for line in lyrics_content.split('\n')]
@@ -78,7 +98,7 @@ def parse_azlyrics_html(html_content: str, title: str, artist: str) -> Optional[
                 # We want to preserve intentional single blank lines between stanzas if they result from <br>\n<br>.
                 # A simple approach: join, then normalize multiple newlines, then final strip.
                 lyrics_content = '\n'.join(lines)
-                lyrics_content = re.sub(r'\n{3,}', '\n\n', lyrics_content) # Reduce 3+ newlines to 2
+                lyrics_content = _MULTI_NEWLINE_RE.sub('\n\n', lyrics_content) # Reduce 3+ newlines to 2
 
                 return lyrics_content.strip() # Final strip of the whole block
 
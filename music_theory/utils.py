@@ -13,6 +13,9 @@ NOTE_TO_VALUE.update({note: i for i, note in enumerate(NOTES_FLAT)})  # Add flat
 VALUE_TO_NOTE_SHARP: Dict[int, str] = {i: note for i, note in enumerate(NOTES_SHARP)}
 VALUE_TO_NOTE_FLAT: Dict[int, str] = {i: note for i, note in enumerate(NOTES_FLAT)}
 
+# Root note at the start of a note or chord name
+_ROOT_RE = re.compile(r"([A-G][#b]?)")
+
 INTERVALS: Dict[str, int] = {
     "P1": 0, "unison": 0,
     "m2": 1, "min2": 1,
@@ -85,7 +88,7 @@ def get_note_value(note_str: str) -> Optional[int]:
         log.warning(f"Invalid input type for note_str: {type(note_str)}. Expected string.")
         return None
     note_str_processed = note_str.strip().capitalize().replace("H", "B")
-    match = re.match(r"([A-G][#b]?)", note_str_processed)
+    match = _ROOT_RE.match(note_str_processed)
     if not match:
         log.warning(f"Could not extract valid note name from: {note_str}")
         return None
@@ -103,7 +106,7 @@ def parse_chord_to_notes(chord_string: str, prefer_sharp_for_output: bool = True
     log.info(f"Parsing chord: {chord_string}")
     original_chord_string = chord_string
     processed_chord_string = chord_string.replace("H", "B")
-    root_match = re.match(r"([A-G][#b]?)", processed_chord_string)
+    root_match = _ROOT_RE.match(processed_chord_string)
     if not root_match:
         log.warning(f"Could not parse root note from: {original_chord_string}")
         return [original_chord_string]
@@ -1,9 +1,15 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import os
+import subprocess
 import sys
 
-from audio_input.downloader import download_audio
+import tempfile
+
+from audio_input.downloader import (
+    download_audio, download_audio_many, download_audio_cached, download_audio_ranged,
+    stream_audio_pcm, _evict_cache, _ffmpeg_postprocessor_args, _get_ydl
+)
 
 # Store original import for use in mock side effects
 original_builtins_import = __import__
@@ -22,9 +28,11 @@ class TestDownloadAudio(unittest.TestCase):
             {'yt_dlp.utils': self.mock_yt_dlp_utils_module}
         )
         self.patcher_sys_modules_yt_dlp_utils.start()
+        _get_ydl.cache_clear()
 
     def tearDown(self):
         self.patcher_sys_modules_yt_dlp_utils.stop()
+        _get_ydl.cache_clear()
 
     @patch('shutil.which')
     @patch('os.makedirs')
@@ -36,7 +44,7 @@ class TestDownloadAudio(unittest.TestCase):
         mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module")
         MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class")
         mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
-        mock_ydl_instance = MockYoutubeDL_class.return_value.__enter__.return_value
+        mock_ydl_instance = MockYoutubeDL_class.return_value
         
         expected_filepath = os.path.join("test_out", "Test Title.mp3")
         mock_info_dict = {
@@ -66,7 +74,7 @@ class TestDownloadAudio(unittest.TestCase):
         mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_info")
         MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_info")
         mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
-        mock_ydl_instance = MockYoutubeDL_class.return_value.__enter__.return_value
+        mock_ydl_instance = MockYoutubeDL_class.return_value
         
         expected_filepath = os.path.join("test_out", "Another Title.mp3")
         mock_info_dict = {'title': 'Another Title', 'ext': 'mp3', 'filepath': expected_filepath}
@@ -118,7 +126,7 @@ class TestDownloadAudio(unittest.TestCase):
         mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
         # Ensure the mocked yt_dlp module has a 'utils' attribute pointing to our mock utils
         mock_yt_dlp_module.utils = self.mock_yt_dlp_utils_module
-        mock_ydl_instance = MockYoutubeDL_class.return_value.__enter__.return_value
+        mock_ydl_instance = MockYoutubeDL_class.return_value
         mock_ydl_instance.extract_info.side_effect = self.mock_yt_dlp_utils_module.DownloadError("Network issue")
         
         def import_side_effect_dl(name, *args, **kwargs):
@@ -138,7 +146,7 @@ class TestDownloadAudio(unittest.TestCase):
         mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
         # Ensure the mocked yt_dlp module has a 'utils' attribute for consistency, though not strictly needed for generic Exception
         mock_yt_dlp_module.utils = self.mock_yt_dlp_utils_module 
-        mock_ydl_instance = MockYoutubeDL_class.return_value.__enter__.return_value
+        mock_ydl_instance = MockYoutubeDL_class.return_value
         mock_ydl_instance.extract_info.side_effect = Exception("Some other yt-dlp problem")
 
         def import_side_effect_gen(name, *args, **kwargs):
@@ -159,7 +167,7 @@ class TestDownloadAudio(unittest.TestCase):
         mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_mkdir")
         MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_mkdir")
         mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
-        mock_ydl_instance = MockYoutubeDL_class.return_value.__enter__.return_value
+        mock_ydl_instance = MockYoutubeDL_class.return_value
         
         expected_filepath = os.path.join("new_dir", "Test.mp3")
         mock_info_dict = {'requested_downloads': [{'filepath': expected_filepath}], 'title': 'Test', 'ext': 'mp3'}
@@ -206,5 +214,209 @@ class TestDownloadAudio(unittest.TestCase):
 
         mock_makedirs.assert_called_once_with("new_dir")
 
+    @patch('shutil.which')
+    @patch('os.path.exists')
+    def test_download_audio_many_one_instance_per_worker(self, mock_path_exists, mock_shutil_which):
+        mock_shutil_which.return_value = "/fake/ffmpeg"
+        mock_path_exists.return_value = True
+
+        mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_many")
+        MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_many")
+        mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
+        mock_ydl_instance = MockYoutubeDL_class.return_value
+
+        def extract_info_side_effect(url, download=True):
+            if url == "bad_url":
+                raise Exception("Unavailable")
+            return {'requested_downloads': [{'filepath': os.path.join("out", f"{url}.mp3")}]}
+        mock_ydl_instance.extract_info.side_effect = extract_info_side_effect
+
+        def import_side_effect_many(name, *args, **kwargs):
+            if name == 'yt_dlp': return mock_yt_dlp_module
+            return original_builtins_import(name, *args, **kwargs)
+
+        with patch('builtins.__import__', side_effect=import_side_effect_many):
+            results = download_audio_many(["url_a", "url_b", "bad_url"], out_dir="out", concurrency=2)
+
+        # At most one instance per worker thread, each closed after the batch
+        self.assertIn(MockYoutubeDL_class.call_count, (1, 2))
+        self.assertEqual(mock_ydl_instance.close.call_count, MockYoutubeDL_class.call_count)
+        ydl_opts = MockYoutubeDL_class.call_args[0][0]
+        self.assertEqual(ydl_opts["concurrent_fragment_downloads"], 2)
+        self.assertEqual(results["url_a"], os.path.join("out", "url_a.mp3"))
+        self.assertEqual(results["url_b"], os.path.join("out", "url_b.mp3"))
+        self.assertIn("Unavailable", results["bad_url"]["error"])
+
+    @patch('shutil.which')
+    @patch('os.path.exists')
+    def test_download_audio_reuses_youtubedl_instance(self, mock_path_exists, mock_shutil_which):
+        mock_shutil_which.return_value = "/fake/ffmpeg"
+        mock_path_exists.return_value = True
+
+        mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_reuse")
+        MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_reuse")
+        mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
+        mock_ydl_instance = MockYoutubeDL_class.return_value
+        mock_ydl_instance.extract_info.return_value = {
+            'requested_downloads': [{'filepath': os.path.join("out", "a.mp3")}]
+        }
+
+        def import_side_effect_reuse(name, *args, **kwargs):
+            if name == 'yt_dlp': return mock_yt_dlp_module
+            return original_builtins_import(name, *args, **kwargs)
+
+        with patch('builtins.__import__', side_effect=import_side_effect_reuse):
+            download_audio("url_one", out_dir="out")
+            download_audio("url_two", out_dir="out")
+
+        MockYoutubeDL_class.assert_called_once()
+        self.assertEqual(mock_ydl_instance.extract_info.call_count, 2)
+
+    def test_get_ydl_closes_evicted_instances(self):
+        mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_evict")
+        mock_yt_dlp_module.YoutubeDL.side_effect = lambda opts: MagicMock(name=opts["outtmpl"])
+
+        def import_side_effect_evict(name, *args, **kwargs):
+            if name == 'yt_dlp': return mock_yt_dlp_module
+            return original_builtins_import(name, *args, **kwargs)
+
+        with patch('builtins.__import__', side_effect=import_side_effect_evict):
+            instances = [_get_ydl(f'{{"outtmpl": "dir{i}"}}') for i in range(_get_ydl.maxsize + 1)]
+
+        instances[0].close.assert_called_once()  # Least recently used, evicted
+        for ydl in instances[1:]:
+            ydl.close.assert_not_called()
+        _get_ydl.cache_clear()
+        for ydl in instances[1:]:
+            ydl.close.assert_called_once()
+
+    @patch('shutil.which')
+    @patch('os.path.exists')
+    def test_download_audio_passthrough_keeps_native_codec(self, mock_path_exists, mock_shutil_which):
+        mock_shutil_which.return_value = "/fake/ffmpeg"
+        mock_path_exists.return_value = True
+
+        mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_passthrough")
+        MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_passthrough")
+        mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
+        expected_filepath = os.path.join("out", "Song.m4a")
+        MockYoutubeDL_class.return_value.extract_info.return_value = {
+            'ext': 'm4a', 'requested_downloads': [{'filepath': expected_filepath}]
+        }
+
+        def import_side_effect_passthrough(name, *args, **kwargs):
+            if name == 'yt_dlp': return mock_yt_dlp_module
+            return original_builtins_import(name, *args, **kwargs)
+
+        with patch('builtins.__import__', side_effect=import_side_effect_passthrough):
+            result_path = download_audio("fake_url", out_dir="out", prefer_passthrough=True)
+
+        self.assertEqual(result_path, expected_filepath)
+        ydl_opts = MockYoutubeDL_class.call_args[0][0]
+        self.assertTrue(ydl_opts["format"].startswith("bestaudio[ext=m4a]"))
+        self.assertEqual(ydl_opts["postprocessors"][0]["preferredcodec"], "best")
+
+    @patch('subprocess.run')
+    @patch('shutil.which')
+    def test_download_audio_ranged_assembles_parallel_ranges(self, mock_shutil_which, mock_run):
+        mock_shutil_which.return_value = "/fake/ffmpeg"
+        payload = bytes(range(256)) * 40  # 10240 bytes
+
+        mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_ranged")
+        MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_ranged")
+        mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
+        MockYoutubeDL_class.return_value.extract_info.return_value = {
+            'id': 'vid1', 'ext': 'm4a', 'url': 'https://media.example/vid1', 'protocol': 'https'
+        }
+
+        mock_requests = MagicMock(name="mock_requests")
+        mock_requests.RequestException = Exception
+        mock_requests.head.return_value.headers = {"Content-Length": str(len(payload)), "Accept-Ranges": "bytes"}
+
+        def fake_get(url, headers, stream, timeout):
+            start, end = (int(x) for x in headers["Range"][len("bytes="):].split("-"))
+            resp = MagicMock()
+            resp.status_code = 206
+            resp.iter_content.return_value = [payload[start:end + 1]]
+            ctx = MagicMock()
+            ctx.__enter__.return_value = resp
+            return ctx
+        mock_requests.get.side_effect = fake_get
+
+        assembled = {}
+        def fake_run(cmd, **kwargs):
+            with open(cmd[cmd.index("-i") + 1], "rb") as f:
+                assembled["data"] = f.read()
+        mock_run.side_effect = fake_run
+
+        def import_side_effect_ranged(name, *args, **kwargs):
+            if name == 'yt_dlp': return mock_yt_dlp_module
+            return original_builtins_import(name, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            with patch('audio_input.downloader.requests', mock_requests), \
+                 patch('builtins.__import__', side_effect=import_side_effect_ranged):
+                result_path = download_audio_ranged("fake_url", out_dir=out_dir, workers=4)
+            leftovers = os.listdir(out_dir)
+
+        self.assertEqual(result_path, os.path.join(out_dir, "vid1.mp3"))
+        self.assertEqual(assembled["data"], payload)
+        self.assertEqual(mock_requests.get.call_count, 4)
+        self.assertEqual(leftovers, [])
+
+    def test_download_audio_cached_hit_skips_download(self):
+        mock_yt_dlp_module = MagicMock(name="mock_yt_dlp_module_cached")
+        MockYoutubeDL_class = MagicMock(name="MockYoutubeDL_class_cached")
+        mock_yt_dlp_module.YoutubeDL = MockYoutubeDL_class
+        mock_ydl_instance = MockYoutubeDL_class.return_value
+        mock_ydl_instance.extract_info.return_value = {'id': 'abc123'}
+
+        def import_side_effect_cached(name, *args, **kwargs):
+            if name == 'yt_dlp': return mock_yt_dlp_module
+            return original_builtins_import(name, *args, **kwargs)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached = os.path.join(cache_dir, "abc123.mp3")
+            with open(cached, "wb") as f:
+                f.write(b"mp3")
+            with patch('builtins.__import__', side_effect=import_side_effect_cached):
+                result_path = download_audio_cached("fake_url", cache_dir=cache_dir)
+
+        self.assertEqual(result_path, cached)
+        mock_ydl_instance.extract_info.assert_called_once_with("fake_url", download=False, process=False)
+
+    @patch('audio_input.downloader._import_yt_dlp')
+    @patch('shutil.which', return_value="/fake/ffmpeg")
+    @patch('subprocess.Popen')
+    def test_stream_audio_pcm_kills_ytdlp_when_ffmpeg_fails_to_start(self, mock_popen, mock_which, mock_import):
+        ytdlp_proc = MagicMock(name="ytdlp_proc")
+        ytdlp_proc.poll.return_value = None  # Still running, blocked on its stdout
+        mock_popen.side_effect = [ytdlp_proc, OSError("ffmpeg exec failed")]
+
+        with self.assertRaises(OSError):
+            stream_audio_pcm("fake_url")
+
+        ytdlp_proc.stdout.close.assert_called_once()
+        ytdlp_proc.kill.assert_called_once()
+        ytdlp_proc.wait.assert_called_once()
+        self.assertNotEqual(mock_popen.call_args_list[0][1]["stderr"], subprocess.PIPE)
+
+    def test_evict_cache_removes_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for i, name in enumerate(["old.mp3", "mid.mp3", "new.mp3"]):
+                path = os.path.join(cache_dir, name)
+                with open(path, "wb") as f:
+                    f.write(b"x" * 10)
+                os.utime(path, (1000 + i, 1000 + i))
+            _evict_cache(cache_dir, max_bytes=20, keep=os.path.join(cache_dir, "new.mp3"))
+            self.assertEqual(sorted(os.listdir(cache_dir)), ["mid.mp3", "new.mp3"])
+
+    @patch('subprocess.check_output')
+    def test_ffmpeg_postprocessor_args_audio_only(self, mock_check_output):
+        args = _ffmpeg_postprocessor_args()
+        self.assertEqual(args, {"extractaudio+ffmpeg_o": ["-threads", "0"]})  # No -hwaccel input args
+        mock_check_output.assert_not_called()  # No ffmpeg capability probe
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,12 +1,19 @@
+import os
+import stat
 import unittest
 from unittest.mock import patch 
-# Removed MagicMock as it's not directly used, os is also not directly used by tests
+# Removed MagicMock as it's not directly used
 
 # Assuming utils.py is in audio_input directory, and tests are run from project root
 from audio_input import utils as audio_utils 
 # Import constants from config directly for mocking or reference if needed
 # For this test, we'll mostly mock the constants where they are used or the functions that use them.
 
+def _fake_stat(size, mode=stat.S_IFREG):
+    """Build an os.stat_result with the given size and file type."""
+    return os.stat_result((mode, 0, 0, 1, 0, 0, size, 0, 0, 0))
+
+
 class TestAudioUtils(unittest.TestCase):
 
     @patch('audio_input.utils.ALLOWED_EXTENSIONS', {'.mp3', '.wav'})
@@ -67,43 +74,50 @@ class TestAudioUtils(unittest.TestCase):
         self.assertFalse(audio_utils.is_file_size_ok("custom_limit_bad.mp3", max_mb=1))
 
 
-    @patch('os.path.isfile')
+    @patch('os.stat')
     @patch('audio_input.utils.is_allowed_audio_file')
     @patch('audio_input.utils.is_valid_audio_mime')
-    @patch('audio_input.utils.is_file_size_ok')
-    def test_check_audio_file_success(self, mock_size_ok, mock_mime_ok, mock_ext_ok, mock_isfile):
-        mock_isfile.return_value = True
+    def test_check_audio_file_success(self, mock_mime_ok, mock_ext_ok, mock_stat):
+        mock_stat.return_value = _fake_stat(1024)
         mock_ext_ok.return_value = True
         mock_mime_ok.return_value = True
-        mock_size_ok.return_value = True
         self.assertTrue(audio_utils.check_audio_file("good_file.mp3"))
+        mock_stat.assert_called_once_with("good_file.mp3")
 
-    @patch('os.path.isfile', return_value=False)
-    def test_check_audio_file_raises_not_a_file(self, mock_isfile):
+    @patch('os.stat', side_effect=FileNotFoundError)
+    def test_check_audio_file_raises_not_a_file(self, mock_stat):
         with self.assertRaisesRegex(ValueError, "File does not exist: not_a_file.mp3"):
             audio_utils.check_audio_file("not_a_file.mp3")
 
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat')
+    def test_check_audio_file_raises_for_directory(self, mock_stat):
+        mock_stat.return_value = _fake_stat(0, mode=stat.S_IFDIR)
+        with self.assertRaisesRegex(ValueError, "File does not exist: some_dir"):
+            audio_utils.check_audio_file("some_dir")
+
+    @patch('os.stat')
     @patch('audio_input.utils.is_allowed_audio_file', return_value=False)
     @patch('audio_input.utils.ALLOWED_EXTENSIONS', {'.mp3', '.wav'}) # For error message
-    def test_check_audio_file_raises_bad_extension(self, mock_ext_ok, mock_isfile):
+    def test_check_audio_file_raises_bad_extension(self, mock_ext_ok, mock_stat):
+        mock_stat.return_value = _fake_stat(1024)
         with self.assertRaisesRegex(ValueError, "Unsupported file type: bad_ext.txt. Allowed types: .mp3, .wav"):
             audio_utils.check_audio_file("bad_ext.txt")
 
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat')
     @patch('audio_input.utils.is_allowed_audio_file', return_value=True)
     @patch('audio_input.utils.is_valid_audio_mime', return_value=False)
-    def test_check_audio_file_raises_bad_mime(self, mock_mime_ok, mock_ext_ok, mock_isfile):
+    def test_check_audio_file_raises_bad_mime(self, mock_mime_ok, mock_ext_ok, mock_stat):
+        mock_stat.return_value = _fake_stat(1024)
         with self.assertRaisesRegex(ValueError, "Invalid audio MIME type for file: bad_mime.mp3"):
             audio_utils.check_audio_file("bad_mime.mp3")
 
-    @patch('os.path.isfile', return_value=True)
+    @patch('os.stat')
     @patch('audio_input.utils.is_allowed_audio_file', return_value=True)
     @patch('audio_input.utils.is_valid_audio_mime', return_value=True)
-    @patch('audio_input.utils.is_file_size_ok', return_value=False)
     @patch('audio_input.utils.MAX_FILE_SIZE_MB', 5) # For error message
-    def test_check_audio_file_raises_too_large(self, mock_size_ok, mock_mime_ok, mock_ext_ok, mock_isfile):
-        with self.assertRaisesRegex(ValueError, "File too large \(>5 MB\): too_large.mp3"):
+    def test_check_audio_file_raises_too_large(self, mock_mime_ok, mock_ext_ok, mock_stat):
+        mock_stat.return_value = _fake_stat(6 * 1024 * 1024)
+        with self.assertRaisesRegex(ValueError, r"File too large \(>5 MB\): too_large.mp3"):
             audio_utils.check_audio_file("too_large.mp3")
 
 if __name__ == '__main__':
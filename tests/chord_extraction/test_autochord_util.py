@@ -46,6 +46,13 @@ class TestAutochordBackend(unittest.TestCase):
             self.assertEqual(result, expected_output)
             mock_guess_chords.assert_called_once_with("dummy_path.wav")
 
+    @patch('chord_extraction.autochord_util.guess_chords')
+    def test_extract_chords_shares_repeated_labels(self, mock_guess_chords):
+        with patch('chord_extraction.autochord_util.AutochordBackend.is_available', return_value=True):
+            mock_guess_chords.return_value = [(0.0, "".join(["A", "m"])), (1.0, "".join(["A", "m"]))]
+            result = AutochordBackend.extract_chords("dummy_path.wav")
+            self.assertIs(result[0]["chord"], result[1]["chord"])
+
     def test_extract_chords_not_available(self):
         with patch('chord_extraction.autochord_util.AutochordBackend.is_available', return_value=False):
             with self.assertRaisesRegex(ImportError, "autochord is not installed"):
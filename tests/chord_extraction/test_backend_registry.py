@@ -1,6 +1,10 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 
+import numpy as np
+
 from chord_extraction.backend_registry import (
     ChordExtractionBackend,
     register_backend,
@@ -8,6 +12,8 @@ from chord_extraction.backend_registry import (
     unregister_backend_by_method,
     get_registered_plugins,
     extract_chords_with_fallback,
+    _order_builtins,
+    ChordEvent,
     _registered_plugins # For direct manipulation in setup/teardown for clean tests
 )
 
@@ -24,6 +30,24 @@ class DummyBackendTwo(ChordExtractionBackend):
     def extract_chords(cls, audio_path: str):
         return [{"time": 1, "chord": "G from DummyTwo"}]
 
+class DummyArrayBackend(ChordExtractionBackend):
+    name = "dummy_array"
+    sample_rate = 8000
+    received = []
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    @classmethod
+    def extract_chords(cls, audio_path: str):
+        raise AssertionError("file path should not be used when samples are available")
+
+    @classmethod
+    def extract_chords_from_array(cls, samples, sample_rate):
+        cls.received.append((len(samples), sample_rate))
+        return []
+
 def dummy_plugin_func(audio_path: str):
     return [{"time": 2, "chord": "Am from DummyPluginFunc"}]
 
@@ -120,5 +144,80 @@ class TestBackendRegistry(unittest.TestCase):
         self.assertEqual(result, expected_result)
         mock_plugin.assert_called_once()
 
+    @patch('chord_extraction.check_backend_availability', lambda: {"autochord": True, "chord_extractor": True, "essentia": True})
+    @patch('chord_extraction.essentia_wrapper.EssentiaBackend.extract_chords')
+    @patch('chord_extraction.autochord_util.AutochordBackend.extract_chords')
+    @patch('chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords')
+    def test_extract_chords_with_fallback_race_returns_first_result(self, mock_ce, mock_auto, mock_essentia):
+        mock_auto.side_effect = Exception("Autochord failed")
+        mock_ce.return_value = []
+        expected_result = [{"time": 0, "chord": "C from Essentia"}]
+        mock_essentia.return_value = expected_result
+
+        result = extract_chords_with_fallback("dummy.wav", race=True)
+        self.assertEqual(result, expected_result)
+
+    @patch('chord_extraction.essentia_wrapper.EssentiaBackend.extract_chords')
+    @patch('chord_extraction.autochord_util.AutochordBackend.extract_chords')
+    @patch('chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords')
+    def test_extract_chords_with_fallback_race_all_fail(self, mock_ce, mock_auto, mock_essentia):
+        mock_auto.side_effect = Exception("Autochord failed")
+        mock_ce.return_value = []
+        mock_essentia.side_effect = Exception("Essentia failed")
+
+        with self.assertRaisesRegex(RuntimeError, "All chord extraction backends failed"):
+            extract_chords_with_fallback("dummy.wav", race=True)
+
+    @patch('chord_extraction.essentia_wrapper.EssentiaBackend.is_available', return_value=False)
+    @patch('chord_extraction.autochord_util.AutochordBackend.extract_chords', return_value=[])
+    @patch('chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords', return_value=[])
+    @patch('audio_input.utils.decode_audio_pcm')
+    def test_extract_chords_with_fallback_passes_decoded_samples(self, mock_decode, mock_ce, mock_auto, mock_essentia_available):
+        mock_decode.return_value = np.zeros(16, dtype=np.float32).tobytes()
+        DummyArrayBackend.received.clear()
+        register_backend(DummyArrayBackend)
+        register_plugin_backend(DummyArrayBackend.extract_chords)  # second array-capable entry
+        register_plugin_backend(dummy_plugin_func)
+
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            result = extract_chords_with_fallback(path)
+        finally:
+            os.remove(path)
+
+        self.assertEqual(result, dummy_plugin_func(path))
+        self.assertEqual(DummyArrayBackend.received, [(16, 8000), (16, 8000)])
+        # Decoded per backend call; nothing holds on to the samples afterwards
+        self.assertEqual(mock_decode.call_count, 2)
+        mock_decode.assert_called_with(path, 8000)
+
+    def test_extract_chords_with_fallback_converts_chord_events(self):
+        register_plugin_backend(lambda path: [ChordEvent(0.0, "C"), ChordEvent(1.5, "G")])
+        with patch('chord_extraction.autochord_util.AutochordBackend.extract_chords', return_value=[]), \
+             patch('chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords', return_value=[]), \
+             patch('chord_extraction.essentia_wrapper.EssentiaBackend.is_available', return_value=False):
+            result = extract_chords_with_fallback("dummy.wav")
+        self.assertEqual(result, [{"time": 0.0, "chord": "C"}, {"time": 1.5, "chord": "G"}])
+
+    @patch('chord_extraction.check_backend_availability', lambda: {"autochord": False, "chord_extractor": False, "essentia": False})
+    def test_extract_chords_with_fallback_merges_repeated_chords(self):
+        register_plugin_backend(lambda path: [ChordEvent(0.0, "C"), ChordEvent(0.5, "C"), ChordEvent(1.0, "G"), ChordEvent(1.5, "C")])
+        result = extract_chords_with_fallback("dummy.wav")
+        self.assertEqual(result, [{"time": 0.0, "chord": "C"}, {"time": 1.0, "chord": "G"}, {"time": 1.5, "chord": "C"}])
+
+    @patch('chord_extraction.check_backend_availability', lambda: {"autochord": False, "chord_extractor": False, "essentia": False})
+    @patch('chord_extraction.autochord_util.AutochordBackend.extract_chords')
+    def test_extract_chords_with_fallback_skips_unavailable_backends(self, mock_auto):
+        register_plugin_backend(dummy_plugin_func)
+        result = extract_chords_with_fallback("dummy.wav")
+        self.assertEqual(result, dummy_plugin_func("dummy.wav"))
+        mock_auto.assert_not_called()
+
+    def test_order_builtins_follows_configured_order(self):
+        backends = [("a", "m_a", "A"), ("b", "m_b", "B"), ("c", "m_c", "C"), ("d", "m_d", "D")]
+        ordered = _order_builtins(backends, ["chordino", "c", "a"])
+        self.assertEqual([name for name, _, _ in ordered], ["c", "a", "b", "d"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -23,7 +23,7 @@ from chord_extraction import (
     register_chord_extraction_backend,
     get_chords_batch,
 )
-from chord_extraction.chordino_wrapper import ChordinoBackend
+from chord_extraction.essentia_wrapper import EssentiaBackend
 from chord_extraction.autochord_util import AutochordBackend
 from chord_extraction.chord_extractor_util import ChordExtractorBackend
 
@@ -59,7 +59,7 @@ def test_get_chords_interface(monkeypatch, filename, expected):
     _registered_plugins.clear()
     try:
         monkeypatch.setattr(
-            ChordinoBackend, "extract_chords", lambda path: None
+            EssentiaBackend, "extract_chords", lambda path: None
         )
         monkeypatch.setattr(
             AutochordBackend, "extract_chords", lambda path: None
@@ -134,13 +134,13 @@ def test_flourish_engine_edge_cases(progression):
     assert isinstance(flourishes, list)
 
 
-def test_chordino_backend(monkeypatch):
+def test_essentia_backend(monkeypatch):
     expected = [{"time": 0.0, "chord": "C"}]
     monkeypatch.setattr(
-        ChordinoBackend, "extract_chords", lambda path: expected
+        EssentiaBackend, "extract_chords", lambda path: expected
     )
     audio_file_path = os.path.join(AUDIO_INPUT_DIR, "dummy.txt")
-    result = ChordinoBackend.extract_chords(audio_file_path)
+    result = EssentiaBackend.extract_chords(audio_file_path)
     assert isinstance(result, list)
     assert all(
         isinstance(item, dict) and "time" in item and "chord" in item
@@ -177,7 +177,7 @@ def test_chord_extractor_backend(monkeypatch):
 
 
 def test_all_backends_fail(monkeypatch):
-    monkeypatch.setattr(ChordinoBackend, "extract_chords", lambda path: None)
+    monkeypatch.setattr(EssentiaBackend, "extract_chords", lambda path: None)
     monkeypatch.setattr(AutochordBackend, "extract_chords", lambda path: None)
     monkeypatch.setattr(
         ChordExtractorBackend, "extract_chords", lambda path: None
@@ -193,9 +193,9 @@ def test_backend_output_format(monkeypatch):
     audio_file_path = os.path.join(AUDIO_INPUT_DIR, "dummy.txt")
 
     monkeypatch.setattr(
-        ChordinoBackend, "extract_chords", lambda path: valid
+        EssentiaBackend, "extract_chords", lambda path: valid
     )
-    result = ChordinoBackend.extract_chords(audio_file_path)
+    result = EssentiaBackend.extract_chords(audio_file_path)
     assert all(
         isinstance(item["time"], float) and isinstance(item["chord"], str)
         for item in result
@@ -212,7 +212,7 @@ def test_backend_output_format(monkeypatch):
 
 def test_backend_fallback(monkeypatch):
     monkeypatch.setattr(
-        ChordinoBackend,
+        EssentiaBackend,
         "extract_chords",
         lambda path: (_ for _ in ()).throw(Exception("fail")),
     )
@@ -277,7 +277,7 @@ def test_plugin_registration_and_fallback(monkeypatch):
 
     register_chord_extraction_backend(plugin_backend)
     # Monkeypatch all built-in backends to fail
-    monkeypatch.setattr(ChordinoBackend, "extract_chords", lambda path: None)
+    monkeypatch.setattr(EssentiaBackend, "extract_chords", lambda path: None)
     monkeypatch.setattr(AutochordBackend, "extract_chords", lambda path: None)
     monkeypatch.setattr(
         ChordExtractorBackend, "extract_chords", lambda path: None
@@ -301,7 +301,7 @@ def test_plugin_error_handling(monkeypatch):
         register_chord_extraction_backend(bad_plugin)
         # Monkeypatch all built-in backends to fail
         monkeypatch.setattr(
-            ChordinoBackend, "extract_chords", lambda path: None
+            EssentiaBackend, "extract_chords", lambda path: None
         )
         monkeypatch.setattr(
             AutochordBackend, "extract_chords", lambda path: None
@@ -372,9 +372,15 @@ def test_batch_processing_errors(monkeypatch):
             raise Exception("fail")
 
         monkeypatch.setattr(
-            ChordinoBackend, "extract_chords", good_backend
+            EssentiaBackend, "extract_chords", good_backend
         )
         # Create dummy files for batch test
+        # Backends are filtered by availability; treat all built-ins as installed.
+        monkeypatch.setattr(
+            "chord_extraction.check_backend_availability",
+            lambda: {"autochord": True, "chord_extractor": True, "essentia": True},
+        )
+
         good_file_path = os.path.join(AUDIO_INPUT_DIR, "good.txt")
         # Use a .doc extension to ensure it fails the MIME type check in get_chords
         bad_file_path = os.path.join(AUDIO_INPUT_DIR, "bad.doc") 
@@ -23,7 +23,7 @@ from chord_extraction import (
     register_chord_extraction_backend,
     get_chords_batch,
 )
-from chord_extraction.chordino_wrapper import ChordinoBackend
+from chord_extraction.essentia_wrapper import EssentiaBackend
 from chord_extraction.autochord_util import AutochordBackend
 from chord_extraction.chord_extractor_util import ChordExtractorBackend
 
@@ -59,7 +59,7 @@ def test_get_chords_interface(monkeypatch, filename, expected):
     _registered_plugins.clear()
     try:
         monkeypatch.setattr(
-            ChordinoBackend, "extract_chords", lambda path: None
+            EssentiaBackend, "extract_chords", lambda path: None
         )
         monkeypatch.setattr(
             AutochordBackend, "extract_chords", lambda path: None
@@ -134,13 +134,13 @@ def test_flourish_engine_edge_cases(progression):
     assert isinstance(flourishes, list)
 
 
-def test_chordino_backend(monkeypatch):
+def test_essentia_backend(monkeypatch):
     expected = [{"time": 0.0, "chord": "C"}]
     monkeypatch.setattr(
-        ChordinoBackend, "extract_chords", lambda path: expected
+        EssentiaBackend, "extract_chords", lambda path: expected
     )
     audio_file_path = os.path.join(AUDIO_INPUT_DIR, "dummy.txt")
-    result = ChordinoBackend.extract_chords(audio_file_path)
+    result = EssentiaBackend.extract_chords(audio_file_path)
     assert isinstance(result, list)
     assert all(
         isinstance(item, dict) and "time" in item and "chord" in item
@@ -177,7 +177,7 @@ def test_chord_extractor_backend(monkeypatch):
 
 
 def test_all_backends_fail(monkeypatch):
-    monkeypatch.setattr("chord_extraction.chordino_wrapper.ChordinoBackend.extract_chords", lambda path: None)
+    monkeypatch.setattr("chord_extraction.essentia_wrapper.EssentiaBackend.extract_chords", lambda path: None)
     monkeypatch.setattr("chord_extraction.autochord_util.AutochordBackend.extract_chords", lambda path: None)
     monkeypatch.setattr("chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords", lambda path: None)
     
@@ -200,9 +200,9 @@ def test_backend_output_format(monkeypatch):
     audio_file_path = os.path.join(AUDIO_INPUT_DIR, "dummy.txt")
 
     monkeypatch.setattr(
-        ChordinoBackend, "extract_chords", lambda path: valid
+        EssentiaBackend, "extract_chords", lambda path: valid
     )
-    result = ChordinoBackend.extract_chords(audio_file_path)
+    result = EssentiaBackend.extract_chords(audio_file_path)
     assert all(
         isinstance(item["time"], float) and isinstance(item["chord"], str)
         for item in result
@@ -215,7 +215,7 @@ def test_backend_output_format(monkeypatch):
 
 
 def test_backend_fallback(monkeypatch):
-    monkeypatch.setattr("chord_extraction.chordino_wrapper.ChordinoBackend.extract_chords", lambda path: (_ for _ in ()).throw(Exception("fail")))
+    monkeypatch.setattr("chord_extraction.essentia_wrapper.EssentiaBackend.extract_chords", lambda path: (_ for _ in ()).throw(Exception("fail")))
     monkeypatch.setattr("chord_extraction.autochord_util.AutochordBackend.extract_chords", lambda path: (_ for _ in ()).throw(Exception("fail")))
     monkeypatch.setattr("chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords", lambda path: (_ for _ in ()).throw(Exception("fail")))
 
@@ -243,6 +243,21 @@ def test_backend_availability():
     }
 
 
+def test_backend_availability_is_cached(monkeypatch):
+    check_backend_availability.cache_clear()
+    calls = []
+    monkeypatch.setattr(
+        "chord_extraction.shutil.which", lambda name: calls.append(name) or None
+    )
+    try:
+        first = check_backend_availability()
+        second = check_backend_availability()
+        assert first is second
+        assert calls == ["chord-extractor"]
+    finally:
+        check_backend_availability.cache_clear()
+
+
 @pytest.mark.parametrize(
     "fname",
     ["sample_chords.json", "sample_chords2.json", "sample_chords3.json"],
@@ -277,7 +292,7 @@ def test_plugin_registration_and_fallback(monkeypatch):
 
     register_chord_extraction_backend(plugin_backend)
     # Monkeypatch all built-in backends to fail
-    monkeypatch.setattr(ChordinoBackend, "extract_chords", lambda path: None)
+    monkeypatch.setattr(EssentiaBackend, "extract_chords", lambda path: None)
     monkeypatch.setattr(AutochordBackend, "extract_chords", lambda path: None)
     monkeypatch.setattr(
         ChordExtractorBackend, "extract_chords", lambda path: None
@@ -301,7 +316,7 @@ def test_plugin_error_handling(monkeypatch):
         register_chord_extraction_backend(bad_plugin)
         # Monkeypatch all built-in backends to fail
         monkeypatch.setattr(
-            ChordinoBackend, "extract_chords", lambda path: None
+            EssentiaBackend, "extract_chords", lambda path: None
         )
         monkeypatch.setattr(
             AutochordBackend, "extract_chords", lambda path: None
@@ -375,12 +390,18 @@ def test_batch_processing_errors(monkeypatch):
 
 
         monkeypatch.setattr(
-            "chord_extraction.chordino_wrapper.ChordinoBackend.extract_chords", good_backend
+            "chord_extraction.essentia_wrapper.EssentiaBackend.extract_chords", good_backend
         )
         # Ensure other built-in backends also "fail" for bad.doc or don't handle it
         monkeypatch.setattr("chord_extraction.autochord_util.AutochordBackend.extract_chords", lambda p: None if "bad.doc" not in p else (_ for _ in ()).throw(Exception("autochord skip")))
         monkeypatch.setattr("chord_extraction.chord_extractor_util.ChordExtractorBackend.extract_chords", lambda p: None if "bad.doc" not in p else (_ for _ in ()).throw(Exception("chord_extractor skip")))
 
+        # Backends are filtered by availability; treat all built-ins as installed.
+        monkeypatch.setattr(
+            "chord_extraction.check_backend_availability",
+            lambda: {"autochord": True, "chord_extractor": True, "essentia": True},
+        )
+
         good_file_path = os.path.join(AUDIO_INPUT_DIR, "good.txt")
         bad_file_path = os.path.join(AUDIO_INPUT_DIR, "bad.doc") # Changed to .doc
         
@@ -406,3 +427,61 @@ def test_batch_processing_errors(monkeypatch):
             os.remove(good_file_path)
         if os.path.exists(bad_file_path):
             os.remove(bad_file_path)
+
+
+def test_batch_parallel_download_failure(monkeypatch):
+    """URL inputs that fail to download are reported without reaching the process pool."""
+    def failing_download_many(urls, out_dir="audio_input", concurrency=4, prefer_passthrough=False):
+        return {url: {"error": "network down"} for url in urls}
+
+    monkeypatch.setattr("chord_extraction.download_audio_many", failing_download_many)
+    results = get_chords_batch(["https://example.com/song"], parallel=True)
+    assert results == {"https://example.com/song": {"error": "Failed to download audio: network down"}}
+
+
+def test_batch_uses_threads_when_only_cli_backend(monkeypatch):
+    """With only the chord-extractor CLI available, batch extraction runs on threads."""
+    import threading
+    monkeypatch.setattr(
+        "chord_extraction.check_backend_availability",
+        lambda: {"autochord": False, "chord_extractor": True, "essentia": False},
+    )
+    monkeypatch.setattr("chord_extraction._registered_plugins", [])
+    worker_threads = []
+
+    def fake_get_chords(path):
+        worker_threads.append(threading.current_thread())
+        return [{"time": 0.0, "chord": "C"}]
+
+    monkeypatch.setattr("chord_extraction.get_chords", fake_get_chords)
+    results = get_chords_batch(["a.wav", "b.wav"], parallel=True, max_workers=2)
+    assert results == {"a.wav": [{"time": 0.0, "chord": "C"}], "b.wav": [{"time": 0.0, "chord": "C"}]}
+    assert len(worker_threads) == 2
+    assert threading.main_thread() not in worker_threads
+
+
+def test_batch_uses_cli_batch_mode_when_supported(monkeypatch, tmp_path):
+    """A batch-capable chord-extractor CLI gets every valid file in one call."""
+    from chord_extraction.chord_extractor_util import ChordExtractorBackend
+    monkeypatch.setattr(
+        "chord_extraction.check_backend_availability",
+        lambda: {"autochord": False, "chord_extractor": True, "essentia": False},
+    )
+    monkeypatch.setattr("chord_extraction._registered_plugins", [])
+    monkeypatch.setattr(ChordExtractorBackend, "supports_batch", classmethod(lambda cls: True))
+    calls = []
+    monkeypatch.setattr(
+        ChordExtractorBackend, "extract_chords_batch",
+        classmethod(lambda cls, paths: calls.append(paths) or {p: [{"time": 0.0, "chord": "C"}] for p in paths}),
+    )
+    good = [str(tmp_path / "a.wav"), str(tmp_path / "b.mp3")]
+    for path in good:
+        open(path, "w").close()
+    missing = str(tmp_path / "missing.wav")
+
+    results = get_chords_batch(good + [missing], parallel=True)
+
+    assert calls == [good]
+    assert results[good[0]] == [{"time": 0.0, "chord": "C"}]
+    assert results[good[1]] == [{"time": 0.0, "chord": "C"}]
+    assert "Audio file not found" in results[missing]["error"]
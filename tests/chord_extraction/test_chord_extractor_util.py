@@ -2,13 +2,21 @@ import unittest
 from unittest.mock import patch, MagicMock
 import subprocess
 import json
+import sys
+
+import chord_extraction.chord_extractor_util as chord_extractor_util
 
 from chord_extraction.chord_extractor_util import ChordExtractorBackend, register_backend
 from chord_extraction.backend_registry import unregister_backend_by_method
 
+@patch('chord_extraction.chord_extractor_util.ijson', None)  # Buffered json.loads path
 class TestChordExtractorBackend(unittest.TestCase):
 
+    def setUp(self):
+        chord_extractor_util._find_chord_extractor.cache_clear()
+
     def tearDown(self):
+        chord_extractor_util._find_chord_extractor.cache_clear()
         unregister_backend_by_method(ChordExtractorBackend.extract_chords)
 
     @patch('shutil.which')
@@ -17,6 +25,13 @@ class TestChordExtractorBackend(unittest.TestCase):
         self.assertTrue(ChordExtractorBackend.is_available())
         mock_shutil_which.assert_called_once_with('chord-extractor')
 
+    @patch('shutil.which')
+    def test_is_available_is_cached(self, mock_shutil_which):
+        mock_shutil_which.return_value = "/usr/bin/chord-extractor"
+        for _ in range(3):
+            self.assertTrue(ChordExtractorBackend.is_available())
+        mock_shutil_which.assert_called_once_with('chord-extractor')
+
     @patch('shutil.which')
     def test_is_available_when_cli_absent(self, mock_shutil_which):
         mock_shutil_which.return_value = None
@@ -28,7 +43,7 @@ class TestChordExtractorBackend(unittest.TestCase):
         mock_shutil_which.return_value = "/usr/bin/chord-extractor"
         
         mock_completed_process = MagicMock(spec=subprocess.CompletedProcess)
-        mock_completed_process.stdout = json.dumps([{"time": 0.0, "chord": "C"}, {"time": 1.0, "chord": "G"}])
+        mock_completed_process.stdout = json.dumps([{"time": 0.0, "chord": "C"}, {"time": 1.0, "chord": "G"}]).encode()
         mock_completed_process.stderr = ""
         mock_completed_process.returncode = 0
         # mock_completed_process.check_returncode.return_value = None # Not needed if check=True
@@ -42,7 +57,7 @@ class TestChordExtractorBackend(unittest.TestCase):
         self.assertEqual(result, expected_output)
         mock_subprocess_run.assert_called_once_with(
             ["chord-extractor", "--input", "dummy.wav", "--output-format", "json"],
-            capture_output=True, text=True, check=True, timeout=120
+            capture_output=True, check=True, timeout=120
         )
 
     @patch('shutil.which')
@@ -56,7 +71,7 @@ class TestChordExtractorBackend(unittest.TestCase):
     def test_extract_chords_subprocess_called_process_error(self, mock_subprocess_run, mock_shutil_which):
         mock_shutil_which.return_value = "/usr/bin/chord-extractor"
         mock_subprocess_run.side_effect = subprocess.CalledProcessError(
-            returncode=1, cmd="chord-extractor", stderr="Some error"
+            returncode=1, cmd="chord-extractor", stderr=b"Some error"
         )
         register_backend(ChordExtractorBackend)
         with self.assertRaisesRegex(RuntimeError, "chord-extractor CLI failed"):
@@ -76,7 +91,7 @@ class TestChordExtractorBackend(unittest.TestCase):
     def test_extract_chords_invalid_json_output(self, mock_subprocess_run, mock_shutil_which):
         mock_shutil_which.return_value = "/usr/bin/chord-extractor"
         mock_completed_process = MagicMock(spec=subprocess.CompletedProcess)
-        mock_completed_process.stdout = "this is not json"
+        mock_completed_process.stdout = b"this is not json"
         mock_subprocess_run.return_value = mock_completed_process
         register_backend(ChordExtractorBackend)
         with self.assertRaisesRegex(RuntimeError, "chord-extractor returned invalid JSON"):
@@ -87,7 +102,7 @@ class TestChordExtractorBackend(unittest.TestCase):
     def test_extract_chords_incorrect_json_structure(self, mock_subprocess_run, mock_shutil_which):
         mock_shutil_which.return_value = "/usr/bin/chord-extractor"
         mock_completed_process = MagicMock(spec=subprocess.CompletedProcess)
-        mock_completed_process.stdout = json.dumps({"wrong": "structure"}) # Not a list
+        mock_completed_process.stdout = json.dumps({"wrong": "structure"}).encode() # Not a list
         mock_subprocess_run.return_value = mock_completed_process
         register_backend(ChordExtractorBackend)
         with self.assertRaisesRegex(ValueError, "Invalid output format from chord-extractor"):
@@ -99,12 +114,118 @@ class TestChordExtractorBackend(unittest.TestCase):
         mock_shutil_which.return_value = "/usr/bin/chord-extractor"
         mock_completed_process = MagicMock(spec=subprocess.CompletedProcess)
         # List, but item is not a dict or missing keys
-        mock_completed_process.stdout = json.dumps([{"note": "C", "start": 0.0}]) 
+        mock_completed_process.stdout = json.dumps([{"note": "C", "start": 0.0}]).encode()
         mock_subprocess_run.return_value = mock_completed_process
         register_backend(ChordExtractorBackend)
         with self.assertRaisesRegex(ValueError, "Invalid output format from chord-extractor"):
             ChordExtractorBackend.extract_chords("dummy.wav")
 
 
+@unittest.skipIf(chord_extractor_util.ijson is None, "ijson not installed")
+@patch('shutil.which', return_value="/usr/bin/chord-extractor")
+class TestChordExtractorStreaming(unittest.TestCase):
+    """Runs a stand-in CLI (python -c) so ijson parses a real pipe."""
+
+    def setUp(self):
+        chord_extractor_util._find_chord_extractor.cache_clear()
+
+    def tearDown(self):
+        chord_extractor_util._find_chord_extractor.cache_clear()
+
+    def _run_with_output(self, script):
+        with patch.object(ChordExtractorBackend, '_command', staticmethod(lambda path: [sys.executable, "-c", script])):
+            return ChordExtractorBackend.extract_chords("dummy.wav")
+
+    def test_streaming_success(self, mock_which):
+        chords = [{"time": 0.0, "chord": "C"}, {"time": 1.5, "chord": "G"}]
+        script = f"import sys; sys.stdout.write(' \\n' + {json.dumps(json.dumps(chords))})"
+        self.assertEqual(self._run_with_output(script), chords)
+
+    def test_streaming_not_an_array(self, mock_which):
+        script = "print('{\"wrong\": 1}')"
+        with self.assertRaisesRegex(ValueError, "Invalid output format from chord-extractor"):
+            self._run_with_output(script)
+
+    def test_streaming_bad_item(self, mock_which):
+        script = "print('[{\"note\": \"C\"}]')"
+        with self.assertRaisesRegex(ValueError, "Invalid output format from chord-extractor"):
+            self._run_with_output(script)
+
+    def test_streaming_invalid_json(self, mock_which):
+        script = "print('[{\"time\": 0, ')"
+        with self.assertRaisesRegex(RuntimeError, "chord-extractor returned invalid JSON"):
+            self._run_with_output(script)
+
+    def test_streaming_nonzero_exit(self, mock_which):
+        script = "import sys; sys.stderr.write('boom'); sys.exit(2)"
+        with self.assertRaisesRegex(RuntimeError, "chord-extractor CLI failed"):
+            self._run_with_output(script)
+
+
+@patch('shutil.which', return_value="/usr/bin/chord-extractor")
+class TestChordExtractorBatch(unittest.TestCase):
+    """One stand-in CLI process (python -c) answers one JSON line per stdin path."""
+
+    # Echoes a single chord named after each path; "bad" paths get malformed chords.
+    SCRIPT = (
+        "import sys, json\n"
+        "for line in sys.stdin:\n"
+        "    p = line.strip()\n"
+        "    chords = 'oops' if 'bad' in p else [{'time': 0.0, 'chord': p}]\n"
+        "    print(json.dumps({'path': p, 'chords': chords}))\n"
+    )
+
+    def setUp(self):
+        chord_extractor_util._find_chord_extractor.cache_clear()
+        chord_extractor_util._supports_batch_mode.cache_clear()
+
+    def tearDown(self):
+        chord_extractor_util._find_chord_extractor.cache_clear()
+        chord_extractor_util._supports_batch_mode.cache_clear()
+
+    def test_batch_single_process(self, mock_which):
+        with patch.object(chord_extractor_util, '_supports_batch_mode', return_value=True), \
+             patch.object(ChordExtractorBackend, '_batch_command', staticmethod(lambda: [sys.executable, "-c", self.SCRIPT])), \
+             patch.object(ChordExtractorBackend, 'extract_chords') as mock_single:
+            results = ChordExtractorBackend.extract_chords_batch(["a.wav", "bad.wav", "b.wav"])
+        self.assertEqual(results["a.wav"], [{"time": 0.0, "chord": "a.wav"}])
+        self.assertEqual(results["b.wav"], [{"time": 0.0, "chord": "b.wav"}])
+        self.assertEqual(results["bad.wav"], {"error": "Invalid output format from chord-extractor"})
+        mock_single.assert_not_called()
+
+    def _run_reversed_batch(self, skip):
+        # Answers arrive in reverse order, after dropping the first `skip` paths
+        script = (
+            "import sys, json\n"
+            "paths = [line.strip() for line in sys.stdin]\n"
+            f"for p in reversed(paths[{skip}:]):\n"
+            "    print(json.dumps({'path': p, 'chords': [{'time': 0.0, 'chord': p}]}))\n"
+        )
+        with patch.object(chord_extractor_util, '_supports_batch_mode', return_value=True), \
+             patch.object(ChordExtractorBackend, '_batch_command', staticmethod(lambda: [sys.executable, "-c", script])), \
+             patch.object(ChordExtractorBackend, 'extract_chords', side_effect=lambda p: [{"time": 1.0, "chord": p}]) as mock_single:
+            results = ChordExtractorBackend.extract_chords_batch(["a.wav", "b.wav", "c.wav"])
+        return results, mock_single.call_count
+
+    def test_batch_answers_matched_by_path(self, mock_which):
+        results, single_runs = self._run_reversed_batch(skip=0)
+        self.assertEqual(results, {p: [{"time": 0.0, "chord": p}] for p in ["a.wav", "b.wav", "c.wav"]})
+        self.assertEqual(single_runs, 0)
+
+    def test_batch_dropped_answer_falls_back_per_file(self, mock_which):
+        results, single_runs = self._run_reversed_batch(skip=1)
+        self.assertEqual(results, {p: [{"time": 1.0, "chord": p}] for p in ["a.wav", "b.wav", "c.wav"]})
+        self.assertEqual(single_runs, 3)
+
+    @patch('subprocess.run')
+    def test_batch_falls_back_per_file_without_batch_mode(self, mock_run, mock_which):
+        mock_run.return_value = MagicMock(stdout="usage: chord-extractor --input FILE", stderr="")
+        with patch.object(ChordExtractorBackend, 'extract_chords', side_effect=[[{"time": 0.0, "chord": "C"}], RuntimeError("boom")]) as mock_single:
+            results = ChordExtractorBackend.extract_chords_batch(["a.wav", "b.wav"])
+        self.assertFalse(ChordExtractorBackend.supports_batch())
+        self.assertEqual(results, {"a.wav": [{"time": 0.0, "chord": "C"}], "b.wav": {"error": "boom"}})
+        self.assertEqual(mock_single.call_count, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
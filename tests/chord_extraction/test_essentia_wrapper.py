@@ -127,5 +127,95 @@ class TestEssentiaBackend(unittest.TestCase):
         result = EssentiaBackend.extract_chords("dummy.wav")
         self.assertEqual(result, [])
 
+    @patch('chord_extraction.essentia_wrapper.essentia', MagicMock(name="mock_essentia"))
+    def test_extract_chords_from_array_skips_loader(self):
+        self.mock_es_module.BeatTrackerDegara.return_value.return_value = np.array([0.5, 1.0], dtype=np.float32)
+        self.mock_es_module.ChordsDetectionBeats.return_value.return_value = (["C:maj", "A:min"], np.array([0.8, 0.9]))
+
+        samples = np.zeros(44100, dtype=np.float32)
+        result = EssentiaBackend.extract_chords_from_array(samples, 44100)
+
+        self.assertEqual(result, [{"time": 0.5, "chord": "C"}, {"time": 1.0, "chord": "Am"}])
+        self.mock_es_module.MonoLoader.assert_not_called()
+        self.mock_es_module.Resample.assert_not_called()
+
+    @patch('chord_extraction.essentia_wrapper.essentia', MagicMock(name="mock_essentia"))
+    def test_extract_pairs_beats_with_available_chords(self):
+        self.mock_es_module.BeatTrackerDegara.return_value.return_value = np.array([0.5, 1.0, 1.5], dtype=np.float32)
+        self.mock_es_module.ChordsDetectionBeats.return_value.return_value = (["C:maj", "N"], np.array([0.8, 0.9]))
+
+        result = EssentiaBackend.extract_chords_from_array(np.zeros(44100, dtype=np.float32), 44100)
+
+        self.assertEqual(result, [{"time": 0.5, "chord": "C"}, {"time": 1.0, "chord": "N.C."}])
+        self.assertIs(type(result[0]["time"]), float)
+
+    @patch('chord_extraction.essentia_wrapper.essentia')
+    def test_chord_detector_gets_arrays_without_vectorreal(self, mock_essentia):
+        self.mock_es_module.BeatTrackerDegara.return_value.return_value = np.array([0.5], dtype=np.float32)
+        detector = self.mock_es_module.ChordsDetectionBeats.return_value
+        detector.return_value = (["C:maj"], np.array([0.8]))
+        samples = np.zeros(44100, dtype=np.float32)
+
+        result = EssentiaBackend.extract_chords_from_array(samples, 44100)
+
+        self.assertEqual(result, [{"time": 0.5, "chord": "C"}])
+        passed_samples, passed_beats = detector.call_args[0]
+        self.assertIs(passed_samples, samples)
+        self.assertIsInstance(passed_beats, np.ndarray)
+        mock_essentia.VectorReal.assert_not_called()
+
+    @patch('chord_extraction.essentia_wrapper.essentia')
+    def test_chord_detector_falls_back_to_vectorreal(self, mock_essentia):
+        self.mock_es_module.BeatTrackerDegara.return_value.return_value = np.array([0.5], dtype=np.float32)
+        detector = self.mock_es_module.ChordsDetectionBeats.return_value
+        detector.side_effect = [TypeError("expected VectorReal"), (["G:maj"], np.array([0.8]))]
+
+        result = EssentiaBackend.extract_chords_from_array(np.zeros(44100, dtype=np.float32), 44100)
+
+        self.assertEqual(result, [{"time": 0.5, "chord": "G"}])
+        self.assertEqual(mock_essentia.VectorReal.call_count, 2)
+
+    @patch('chord_extraction.essentia_wrapper.essentia', MagicMock(name="mock_essentia"))
+    def test_extract_chord_columns_from_array(self):
+        from chord_extraction.essentia_wrapper import _chords_to_dicts
+        self.mock_es_module.BeatTrackerDegara.return_value.return_value = np.array([0.5, 1.0, 1.5], dtype=np.float32)
+        self.mock_es_module.ChordsDetectionBeats.return_value.return_value = (["C:maj", "A:min"], np.array([0.8, 0.9]))
+
+        columns = EssentiaBackend.extract_chord_columns_from_array(np.zeros(44100, dtype=np.float32), 44100)
+
+        np.testing.assert_array_equal(columns["times"], np.array([0.5, 1.0], dtype=np.float32))
+        self.assertEqual(columns["chords"].dtype, object)
+        self.assertEqual(columns["chords"].tolist(), ["C", "Am"])
+        self.assertEqual(_chords_to_dicts(columns), [{"time": 0.5, "chord": "C"}, {"time": 1.0, "chord": "Am"}])
+
+    def test_essentia_imported_on_first_use(self):
+        from chord_extraction import essentia_wrapper
+        loaded_es = MagicMock(name="loaded_es")
+
+        def fake_load():
+            essentia_wrapper.es = loaded_es
+            return True
+
+        with patch('chord_extraction.essentia_wrapper.es', None), \
+             patch('chord_extraction.essentia_wrapper._load_essentia', side_effect=fake_load) as mock_load:
+            self.assertTrue(EssentiaBackend._check_ready())
+            self.assertTrue(EssentiaBackend._check_ready())
+            mock_load.assert_called_once()
+
+    def test_essentia_import_failure_raises(self):
+        with patch('chord_extraction.essentia_wrapper.es', None), \
+             patch('chord_extraction.essentia_wrapper._load_essentia', return_value=False):
+            with self.assertRaises(RuntimeError):
+                EssentiaBackend._check_ready()
+
+    def test_format_label_table_matches_uncached(self):
+        from chord_extraction import essentia_wrapper
+        for label, formatted in essentia_wrapper._LABEL_TABLE.items():
+            self.assertEqual(formatted, essentia_wrapper._format_label_uncached(label))
+        self.assertEqual(EssentiaBackend._format_essentia_chord_label("N"), "N.C.")
+        self.assertEqual(EssentiaBackend._format_essentia_chord_label("F#:min7"), "F#m7")
+        # Labels outside the table still format
+        self.assertEqual(EssentiaBackend._format_essentia_chord_label("C:hdim7"), "Chdim7")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from chord_extraction.postprocess import merge_consecutive_chords
+
+
+class TestPostprocess(unittest.TestCase):
+
+    def test_merge_consecutive_chords(self):
+        events = [
+            {"time": 0.0, "chord": "C"},
+            {"time": 0.5, "chord": "C"},
+            {"time": 1.0, "chord": "G"},
+            {"time": 1.5, "chord": "G"},
+            {"time": 2.0, "chord": "C"},
+        ]
+        self.assertEqual(
+            merge_consecutive_chords(events),
+            [{"time": 0.0, "chord": "C"}, {"time": 1.0, "chord": "G"}, {"time": 2.0, "chord": "C"}],
+        )
+
+    def test_merge_consecutive_chords_empty(self):
+        self.assertEqual(merge_consecutive_chords([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from chord_extraction import result_cache
+from chord_extraction.backend_registry import extract_chords_with_fallback, _registered_plugins
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "chords")
+        self.audio_path = os.path.join(self.tmp.name, "song.wav")
+        with open(self.audio_path, "wb") as f:
+            f.write(b"RIFF")
+        patchers = [
+            patch('chord_extraction.result_cache.CHORD_CACHE_DIR', self.cache_dir),
+            patch.dict(os.environ, {"ACOUSTICAL_NO_CACHE": ""}),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_round_trip(self):
+        chords = [{"time": 0.0, "chord": "C"}, {"time": 1.5, "chord": "G"}]
+        result_cache.put_cached(self.audio_path, chords, tag="t")
+        self.assertEqual(result_cache.get_cached(self.audio_path, tag="t"), chords)
+        self.assertIsNone(result_cache.get_cached(self.audio_path, tag="other"))
+
+    def test_modified_file_misses(self):
+        result_cache.put_cached(self.audio_path, [{"time": 0.0, "chord": "C"}])
+        with open(self.audio_path, "ab") as f:
+            f.write(b"more")
+        self.assertIsNone(result_cache.get_cached(self.audio_path))
+
+    def test_missing_file_is_not_cached(self):
+        missing = os.path.join(self.tmp.name, "missing.wav")
+        result_cache.put_cached(missing, [{"time": 0.0, "chord": "C"}])
+        self.assertIsNone(result_cache.get_cached(missing))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_disabled_by_env(self):
+        with patch.dict(os.environ, {"ACOUSTICAL_NO_CACHE": "1"}):
+            result_cache.put_cached(self.audio_path, [{"time": 0.0, "chord": "C"}])
+            self.assertIsNone(result_cache.get_cached(self.audio_path))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    @patch('chord_extraction.check_backend_availability', lambda: {"autochord": False, "chord_extractor": False, "essentia": False})
+    def test_fallback_serves_second_call_from_cache(self):
+        backend = MagicMock(return_value=[{"time": 0.0, "chord": "Am"}])
+        old_plugins = list(_registered_plugins)
+        _registered_plugins[:] = [backend]
+        try:
+            first = extract_chords_with_fallback(self.audio_path)
+            second = extract_chords_with_fallback(self.audio_path)
+        finally:
+            _registered_plugins[:] = old_plugins
+        self.assertEqual(first, [{"time": 0.0, "chord": "Am"}])
+        self.assertEqual(second, first)
+        backend.assert_called_once_with(self.audio_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
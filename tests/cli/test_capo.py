@@ -99,5 +99,55 @@ class TestCapoCommand(unittest.TestCase):
             self.assertEqual(result.exit_code, 1)
             self.assertIn("Capo recommendation failed: Test error from recommend_capo", result.output)
 
+    @patch('cli.commands.capo.recommend_capo')
+    def test_capo_rich_document_only_rewrites_chords(self, mock_recommend_capo):
+        mock_recommend_capo.return_value = (2, ["D", "A"])
+        document = {
+            "title": "Song",
+            "beats": [0.0, 0.5, 1.0],
+            "chords": [{"chord": "C", "time": 0.0}, {"chord": "G", "time": 1.0}],
+        }
+
+        with self.runner.isolated_filesystem():
+            with open('song.json', 'w') as f:
+                f.write(json.dumps(document))
+
+            result = self.runner.invoke(capo, ['song.json'])
+
+            self.assertEqual(result.exit_code, 0)
+            mock_recommend_capo.assert_called_once_with(["C", "G"])
+            expected = dict(document, chords=[{"chord": "D", "time": 0.0}, {"chord": "A", "time": 1.0}])
+            self.assertEqual(json.loads(result.output), {"capo": 2, "chords": expected})
+
+    @patch('cli.commands.capo.recommend_capo')
+    def test_capo_explicit_compact_reformats_chords_document(self, mock_recommend_capo):
+        mock_recommend_capo.return_value = (2, ["A"])
+        indented_doc = json.dumps({"chords": [{"chord": "B", "time": 0.0}]}, indent=4)
+
+        result = self.runner.invoke(capo, ['-', '--compact'], input=indented_doc)
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, '{"capo":2,"chords":{"chords":[{"chord":"A","time":0.0}]}}\n')
+
+    @patch('cli.commands.capo.recommend_capo')
+    def test_capo_other_chord_fields_use_full_parse(self, mock_recommend_capo):
+        mock_recommend_capo.return_value = (2, ["D"])
+        document = {
+            "sections": [{"chord": "C"}],
+            "chords": [{"chord": "C", "time": 0.0}],
+        }
+
+        with self.runner.isolated_filesystem():
+            with open('song.json', 'w') as f:
+                f.write(json.dumps(document))
+
+            result = self.runner.invoke(capo, ['song.json'])
+
+            self.assertEqual(result.exit_code, 0)
+            mock_recommend_capo.assert_called_once_with(["C"])
+            output = json.loads(result.output)
+            self.assertEqual(output["chords"]["sections"], [{"chord": "C"}])
+            self.assertEqual(output["chords"]["chords"], [{"chord": "D", "time": 0.0}])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,36 @@
+import sys
+import unittest
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from cli.cli import cli, _LAZY_COMMANDS
+
+
+class TestLazyCliGroup(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = CliRunner()
+
+    def test_lists_all_commands(self):
+        result = self.runner.invoke(cli, ['--help'])
+        self.assertEqual(result.exit_code, 0)
+        for name in _LAZY_COMMANDS:
+            self.assertIn(name, result.output)
+
+    def test_command_module_imported_on_demand(self):
+        with patch.dict(sys.modules), patch.object(cli, 'commands', {}):
+            sys.modules.pop('cli.commands.key', None)
+            result = self.runner.invoke(cli, ['key', '--help'])
+            self.assertEqual(result.exit_code, 0)
+            self.assertIn('cli.commands.key', sys.modules)
+            self.assertEqual(list(cli.commands), ['key'])
+
+    def test_unknown_command(self):
+        result = self.runner.invoke(cli, ['no-such-command'])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("No such command", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,6 +68,34 @@ class TestTransposeCommand(unittest.TestCase):
         self.assertEqual(result.exit_code, 1)
         self.assertIn("Transposition failed: Transposition logic error", result.output)
 
+    @patch('cli.commands.transpose.transpose_chords')
+    def test_transpose_preserves_other_fields(self, mock_transpose_chords):
+        mock_transpose_chords.return_value = ["D", "A"]
+        document = {
+            "metadata": {"title": "Song", "chord": ["not", "a", "string"]},
+            "chords": [{"chord": "C", "time": 0.0}, {"chord": "G", "time": 1.5}],
+        }
+        result = self.runner.invoke(transpose, ['-', '--semitones', '2'], input=json.dumps(document))
+
+        self.assertEqual(result.exit_code, 0)
+        document["chords"][0]["chord"] = "D"
+        document["chords"][1]["chord"] = "A"
+        self.assertEqual(json.loads(result.output), document)
+        mock_transpose_chords.assert_called_once_with(["C", "G"], 2)
+
+    @patch('cli.commands.transpose.transpose_chords')
+    def test_transpose_explicit_pretty_and_compact(self, mock_transpose_chords):
+        mock_transpose_chords.return_value = ["D"]
+        compact_doc = '{"chords":[{"chord":"C","time":0.0}]}'
+        indented_doc = json.dumps(json.loads(compact_doc), indent=4)
+
+        pretty = self.runner.invoke(transpose, ['-', '--semitones', '2', '--pretty'], input=compact_doc)
+        compact = self.runner.invoke(transpose, ['-', '--semitones', '2', '--compact'], input=indented_doc)
+
+        self.assertEqual(pretty.exit_code, 0)
+        self.assertEqual(pretty.output, '{\n  "chords": [\n    {\n      "chord": "D",\n      "time": 0.0\n    }\n  ]\n}\n')
+        self.assertEqual(compact.output, '{"chords":[{"chord":"D","time":0.0}]}\n')
+
     def test_transpose_missing_semitones(self):
         input_chords_content = json.dumps([{"chord": "C", "time": 0.0}])
         # Pass '-' as the filename to indicate reading from stdin
@@ -88,6 +88,39 @@ class TestExtractChordsCommand(unittest.TestCase):
             self.assertEqual(len(args[0]), 2)
 
 
+    @patch('cli.commands.extract_chords.get_chords_batch')
+    @patch('cli.commands.extract_chords.check_audio_file')
+    def test_extract_chords_batch_scans_only_audio_files(self, mock_check_audio_file, mock_get_chords_batch):
+        mock_get_chords_batch.return_value = {}
+        with self.runner.isolated_filesystem():
+            os.makedirs(os.path.join('test_dir', 'folder.mp3'))  # Directory, not a file
+            for name in ('LOUD.WAV', 'mp3', 'notes.txt'):
+                with open(os.path.join('test_dir', name), 'w') as f: f.write("dummy")
+
+            result = self.runner.invoke(extract_chords, ['test_dir', '--batch'])
+
+            self.assertEqual(result.exit_code, 0)
+            args, _ = mock_get_chords_batch.call_args
+            self.assertEqual(args[0], [os.path.join('test_dir', 'LOUD.WAV')])
+
+    @patch('cli.commands.extract_chords.get_chords_batch')
+    @patch('cli.commands.extract_chords.check_audio_file')
+    def test_extract_chords_batch_jobs_option(self, mock_check_audio_file, mock_get_chords_batch):
+        mock_get_chords_batch.return_value = {}
+        with self.runner.isolated_filesystem():
+            os.makedirs('test_dir')
+            with open('test_dir/audio1.mp3', 'w') as f: f.write("dummy")
+
+            result = self.runner.invoke(extract_chords, ['test_dir', '--batch', '--jobs', '1'])
+            self.assertEqual(result.exit_code, 0)
+            _, kwargs = mock_get_chords_batch.call_args
+            self.assertEqual(kwargs, {'parallel': False, 'max_workers': 1})
+
+            result = self.runner.invoke(extract_chords, ['test_dir', '--batch', '--jobs', '3'])
+            self.assertEqual(result.exit_code, 0)
+            _, kwargs = mock_get_chords_batch.call_args
+            self.assertEqual(kwargs, {'parallel': True, 'max_workers': 3})
+
     @patch('cli.commands.extract_chords.get_chords_batch')
     @patch('cli.commands.extract_chords.check_audio_file')
     def test_extract_chords_batch_source_not_directory(self, mock_check_audio_file, mock_get_chords_batch):
@@ -3,7 +3,7 @@ import json
 from unittest.mock import patch, MagicMock
 from click.testing import CliRunner
 
-from cli.commands.fingering import fingering_command
+from cli.commands.fingering import _fretboard, fingering_command
 from music_theory.chord_shapes import ChordShape 
 from music_theory.fretboard import Fretboard # Import Fretboard to patch it
 
@@ -11,6 +11,7 @@ class TestFingeringCommand(unittest.TestCase):
 
     def setUp(self):
         self.runner = CliRunner()
+        _fretboard.cache_clear()
 
     @patch('cli.commands.fingering.suggest_fingerings')
     def test_fingering_suggestion_success(self, mock_suggest_fingerings):
@@ -44,7 +45,7 @@ class TestFingeringCommand(unittest.TestCase):
         result = self.runner.invoke(fingering_command, [chord_string, '--num_suggestions', str(num_suggestions)])
 
         self.assertEqual(result.exit_code, 0)
-        mock_suggest_fingerings.assert_called_once_with(chord_string, fretboard=unittest.mock.ANY)
+        mock_suggest_fingerings.assert_called_once_with(chord_string, fretboard=unittest.mock.ANY, top_k=num_suggestions, use_cache=True)
         
         output_json = json.loads(result.output)
         self.assertEqual(output_json["chord"], chord_string)
@@ -83,6 +84,14 @@ class TestFingeringCommand(unittest.TestCase):
         self.assertIn(f"No fingerings found for '{chord_string}'.", result.output)
         self.assertIn("Try a more common chord or check spelling.", result.output)
 
+    @patch('cli.commands.fingering.suggest_fingerings')
+    def test_fingering_zero_suggestions_ranks_one(self, mock_suggest_fingerings):
+        mock_suggest_fingerings.return_value = [(MagicMock(), 1)]
+        result = self.runner.invoke(fingering_command, ["C", "--num_suggestions", "0"])
+        self.assertEqual(result.exit_code, 0)
+        mock_suggest_fingerings.assert_called_once_with("C", fretboard=unittest.mock.ANY, top_k=1, use_cache=True)
+        self.assertEqual(json.loads(result.output)["suggestions"], [])
+
     @patch('cli.commands.fingering.suggest_fingerings')
     def test_fingering_general_exception(self, mock_suggest_fingerings):
         mock_suggest_fingerings.side_effect = Exception("Internal error")
@@ -103,7 +112,15 @@ class TestFingeringCommand(unittest.TestCase):
         
         self.assertEqual(result.exit_code, 0)
         MockFretboard.assert_called_once_with(tuning=["D", "A", "D", "G", "B", "e"])
-        mock_suggest_fingerings.assert_called_once_with(chord_string, fretboard=MockFretboard.return_value)
+        mock_suggest_fingerings.assert_called_once_with(chord_string, fretboard=MockFretboard.return_value, top_k=5, use_cache=True)
+
+    @patch('cli.commands.fingering.suggest_fingerings', return_value=[])
+    @patch('cli.commands.fingering.Fretboard')
+    def test_fingering_reuses_fretboard_per_tuning(self, MockFretboard, mock_suggest_fingerings):
+        for _ in range(2):
+            self.runner.invoke(fingering_command, ["C", '--tuning', "D,A,D,G,B,e"])
+        self.runner.invoke(fingering_command, ["C"])
+        self.assertEqual(MockFretboard.call_count, 2)  # One per distinct tuning
 
 if __name__ == '__main__':
     unittest.main()
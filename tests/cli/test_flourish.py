@@ -78,6 +78,15 @@ class TestFlourishCommand(unittest.TestCase):
             self.assertEqual(result.exit_code, 1)
             self.assertIn("Flourish suggestion failed: Expecting value: line 1 column 1 (char 0)", result.output)
 
+    @patch('cli.commands.flourish.apply_rule_based_flourishes')
+    def test_flourish_empty_input(self, mock_apply_rule_based_flourishes):
+        result = self.runner.invoke(flourish, ['-'], input="  \n")
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(json.loads(result.output)["flourishes"], [])
+        self.assertIn("error", json.loads(result.output))
+        mock_apply_rule_based_flourishes.assert_not_called()
+
     @patch('cli.commands.flourish.apply_rule_based_flourishes')
     def test_flourish_general_exception(self, mock_apply_rule_based_flourishes):
         mock_apply_rule_based_flourishes.side_effect = Exception("Internal flourish error")
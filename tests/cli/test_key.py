@@ -73,5 +73,32 @@ class TestKeyCommand(unittest.TestCase):
             self.assertEqual(result.exit_code, 1)
             self.assertIn("Key detection failed: Key analysis error", result.output)
 
+    @patch('cli.commands.key.detect_key_from_chords')
+    def test_key_detection_chords_document(self, mock_detect_key_from_chords):
+        mock_detect_key_from_chords.return_value = {"key_root": "G", "key_quality": "major"}
+        document = {"metadata": {"bpm": 90}, "chords": [{"chord": "G", "time": 0.0}, {"chord": "D", "time": 1.0}]}
+
+        result = self.runner.invoke(key, ['-'], input=json.dumps(document))
+
+        self.assertEqual(result.exit_code, 0)
+        mock_detect_key_from_chords.assert_called_once_with(["G", "D"])
+
+    @patch('cli.commands.key.detect_key_from_chords', return_value={"key_root": "G"})
+    def test_key_pretty_and_compact_output(self, mock_detect_key_from_chords):
+        document = json.dumps({"chords": [{"chord": "G", "time": 0.0}]})
+
+        compact = self.runner.invoke(key, ['-'], input=document)  # Not a terminal
+        pretty = self.runner.invoke(key, ['-', '--pretty'], input=document)
+
+        self.assertEqual(compact.output, '{"key":{"key_root":"G"}}\n')
+        self.assertEqual(pretty.output, '{\n  "key": {\n    "key_root": "G"\n  }\n}\n')
+
+    def test_key_detection_missing_chords(self):
+        result = self.runner.invoke(key, ['-'], input=json.dumps({"metadata": {}}))
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("Key detection failed: 'chords'", result.output)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,36 @@
+import json
+import unittest
+
+from common import chord_json
+from common.chord_json import locate_chord_fields, rewrite_chord_fields, scan_chord_strings
+
+
+@unittest.skipIf(chord_json.ijson is None, "ijson not installed")
+class TestChordJson(unittest.TestCase):
+
+    def test_scan_chord_strings(self):
+        text = json.dumps({"title": "Café", "chords": [{"chord": "C"}, {"chord": "G", "time": 1}]}).encode()
+        self.assertEqual(scan_chord_strings(text), ["C", "G"])
+
+    def test_scan_chord_strings_rejects_other_shapes(self):
+        for document in ([{"chord": "C"}], {"chords": []}, {"chords": [{"chord": "C"}, {"time": 1}]},
+                         {"chords": [{"chord": 5}]}):
+            self.assertIsNone(scan_chord_strings(json.dumps(document).encode()), document)
+        self.assertIsNone(scan_chord_strings(b"not json"))
+
+    def test_rewrite_keeps_rest_of_document(self):
+        text = b'{"title": "Caf\xc3\xa9",  "chords": [{"chord": "C", "time": 0}]}'
+        chords = scan_chord_strings(text)
+        matches = locate_chord_fields(text, chords)
+        self.assertEqual(
+            rewrite_chord_fields(text, matches, ["D#"]),
+            b'{"title": "Caf\xc3\xa9",  "chords": [{"chord": "D#", "time": 0}]}',
+        )
+
+    def test_locate_rejects_chord_fields_outside_chords(self):
+        text = json.dumps({"sections": [{"chord": "C"}], "chords": [{"chord": "C"}]}).encode()
+        self.assertIsNone(locate_chord_fields(text, scan_chord_strings(text)))
+
+
+if __name__ == '__main__':
+    unittest.main()
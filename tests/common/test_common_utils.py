@@ -0,0 +1,58 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from common.utils import dumps_json, dumps_json_bytes, loads_json, serialize_result
+
+
+class TestJsonHelpers(unittest.TestCase):
+
+    def test_dumps_json_matches_stdlib_layout(self):
+        data = {"chords": [{"time": 0.5, "chord": "C#m"}], "title": "Café"}
+        self.assertEqual(dumps_json(data), json.dumps(data, indent=2, ensure_ascii=False))
+
+    @patch('common.utils.orjson', None)
+    def test_dumps_json_without_orjson(self):
+        self.assertEqual(dumps_json({"a": 1}), '{\n  "a": 1\n}')
+
+    def test_dumps_json_stringifies_non_string_keys(self):
+        self.assertEqual(json.loads(dumps_json({1: "C"})), {"1": "C"})
+
+    def test_dumps_json_compact(self):
+        self.assertEqual(dumps_json({"a": [1, "é"]}, pretty=False), '{"a":[1,"é"]}')
+
+    @patch('common.utils.orjson', None)
+    def test_dumps_json_compact_without_orjson(self):
+        self.assertEqual(dumps_json({"a": [1, "é"]}, pretty=False), '{"a":[1,"é"]}')
+
+    def test_dumps_json_bytes_matches_dumps_json(self):
+        data = {"title": "Café", "chords": [{"time": 0.5, "chord": "C#m"}]}
+        for pretty in (True, False):
+            expected = (dumps_json(data, pretty=pretty) + "\n").encode("utf-8")
+            self.assertEqual(dumps_json_bytes(data, pretty=pretty), expected)
+            with patch('common.utils.orjson', None):
+                self.assertEqual(dumps_json_bytes(data, pretty=pretty), expected)
+
+    def test_serialize_result_pretty_follows_tty(self):
+        with patch('common.utils.stdout_is_tty', return_value=False):
+            self.assertEqual(serialize_result({"a": 1}), '{"a":1}')
+        with patch('common.utils.stdout_is_tty', return_value=True):
+            self.assertEqual(serialize_result({"a": 1}), '{\n  "a": 1\n}')
+        self.assertEqual(serialize_result({"a": 1}, pretty=True), '{\n  "a": 1\n}')
+
+    def test_loads_json_round_trip(self):
+        data = [{"time": 1.25, "chord": "G"}]
+        self.assertEqual(loads_json(dumps_json(data)), data)
+        self.assertEqual(loads_json(dumps_json(data).encode("utf-8")), data)
+
+    def test_loads_json_invalid_raises_json_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            loads_json("not json")
+
+    def test_serialize_result_unserializable(self):
+        result = serialize_result({"bad": object()})
+        self.assertIn("error", result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,11 @@ class TestGPT4AllFlourishes(unittest.TestCase):
 
     # No setUp/tearDown needed for sys.modules and config mocking if directly patching DEFAULT_MODEL_PATH
 
+    def setUp(self):
+        gpt4all_flourish._get_model.cache_clear()  # Each test patches its own GPT4All
+        gpt4all_flourish._key_context_prompt.cache_clear()  # ...and key detection
+        gpt4all_flourish._get_model_pool.cache_clear()
+
     @patch('flourish_engine.gpt4all_flourish._gpt4all_available', False)
     @patch('flourish_engine.gpt4all_flourish.DEFAULT_MODEL_PATH', None)
     def test_gpt4all_not_available_fallback(self): # Removed mock_default_path_val
@@ -30,6 +35,14 @@ class TestGPT4AllFlourishes(unittest.TestCase):
         self.assertIn("Cmaj7", results[0]["suggestions"]) 
         self.assertIn("C9", results[0]["suggestions"])
 
+    @patch('flourish_engine.gpt4all_flourish._gpt4all_available', True)
+    @patch('flourish_engine.gpt4all_flourish.GPT4All', None)
+    @patch('flourish_engine.gpt4all_flourish._load_gpt4all', return_value=False)
+    def test_gpt4all_imported_on_first_use(self, mock_load_gpt4all):
+        results = gpt4all_flourish.suggest_chord_substitutions([{"chord": "C", "time": 0.0}])
+        mock_load_gpt4all.assert_called_once_with()
+        self.assertIn("Cmaj7", results[0]["suggestions"])
+
     @patch('flourish_engine.gpt4all_flourish._gpt4all_available', True)
     @patch('flourish_engine.gpt4all_flourish.GPT4All') 
     @patch('flourish_engine.gpt4all_flourish.DEFAULT_MODEL_PATH', "dummy/path/model.bin")
@@ -67,8 +80,10 @@ class TestGPT4AllFlourishes(unittest.TestCase):
 
         MockGPT4AllClass.assert_called_once_with("dummy/path/model.bin")
         mock_model_instance.generate.assert_called_once()
-        self.assertIn("key of C major", mock_model_instance.generate.call_args[0][0])
-        self.assertIn("chord 'C'", mock_model_instance.generate.call_args[0][0])
+        system_prompt = mock_model_instance.chat_session.call_args[1]["system_prompt"]
+        self.assertIn("key of C major", system_prompt)
+        self.assertIn("Chord: C\n", mock_model_instance.generate.call_args[0][0])
+        self.assertNotIn("key of C major", mock_model_instance.generate.call_args[0][0])
         
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["original_chord"], "C")
@@ -130,6 +145,101 @@ class TestGPT4AllFlourishes(unittest.TestCase):
             else: 
                 self.assertEqual(set(results[0]["suggestions"]), {"X"})
 
+    def test_stacked_intro_phrases_stripped(self):
+        reply = "Sure, here are some suggestions: here's a suggestion: OKAY, how about G7 and Em"
+        self.assertEqual(gpt4all_flourish._parse_suggestions(reply), ["G7", "Em"])
+
+    def test_long_reply_truncated_before_parsing(self):
+        reply = "G7, Em " + "x" * gpt4all_flourish._MAX_REPLY_CHARS + " Am"
+        self.assertEqual(gpt4all_flourish._parse_suggestions(reply), ["G7", "Em"])
+
+    @patch('flourish_engine.gpt4all_flourish._gpt4all_available', True)
+    @patch('flourish_engine.gpt4all_flourish.GPT4All')
+    @patch('flourish_engine.gpt4all_flourish.detect_key_from_chords', return_value={})
+    @patch('flourish_engine.gpt4all_flourish.DEFAULT_MODEL_PATH', "dummy/path/model.bin")
+    def test_model_and_repeated_chords_reused(self, mock_detect_key, MockGPT4AllClass):
+        mock_model_instance = MagicMock()
+        mock_model_instance.generate.return_value = "1) C -> G7\n2) Am -> Am7"
+        MockGPT4AllClass.return_value = mock_model_instance
+
+        prog = [{"chord": "C", "time": 0.0}, {"chord": "Am", "time": 1.0}, {"chord": "C", "time": 2.0}]
+        gpt4all_flourish.suggest_chord_substitutions(prog)
+        results = gpt4all_flourish.suggest_chord_substitutions(prog)
+
+        MockGPT4AllClass.assert_called_once_with("dummy/path/model.bin")
+        self.assertEqual(mock_model_instance.generate.call_count, 2)  # One batch per call
+        self.assertEqual([r["start_time"] for r in results], [0.0, 1.0, 2.0])
+        self.assertEqual([r["suggestions"] for r in results], [["G7"], ["Am7"], ["G7"]])
+
+    @patch('flourish_engine.gpt4all_flourish._gpt4all_available', True)
+    @patch('flourish_engine.gpt4all_flourish.GPT4All')
+    @patch('flourish_engine.gpt4all_flourish.detect_key_from_chords', return_value={})
+    @patch('flourish_engine.gpt4all_flourish.DEFAULT_MODEL_PATH', "dummy/path/model.bin")
+    @patch('flourish_engine.gpt4all_flourish._model_lock')
+    def test_model_access_is_serialized(self, mock_lock, mock_detect_key, MockGPT4AllClass):
+        mock_model_instance = MagicMock()
+        mock_model_instance.generate.return_value = "G7"
+        MockGPT4AllClass.return_value = mock_model_instance
+
+        gpt4all_flourish.suggest_chord_substitutions([{"chord": "C", "time": 0.0}])
+
+        self.assertEqual(mock_lock.__enter__.call_count, 2)  # Load, then generate
+        self.assertEqual(mock_lock.__exit__.call_count, 2)
+
+    @patch('flourish_engine.gpt4all_flourish._gpt4all_available', True)
+    @patch('flourish_engine.gpt4all_flourish.GPT4All')
+    @patch('flourish_engine.gpt4all_flourish.detect_key_from_chords', return_value={})
+    @patch('flourish_engine.gpt4all_flourish.DEFAULT_MODEL_PATH', "dummy/path/model.bin")
+    def test_batch_reply_falls_back_per_chord(self, mock_detect_key, MockGPT4AllClass):
+        mock_model_instance = MagicMock()
+        mock_model_instance.generate.side_effect = [
+            "Sure!\n1) C -> Cmaj7, C6\n3) F -> ???",
+            "Dm7",
+            "Fadd9",
+        ]
+        MockGPT4AllClass.return_value = mock_model_instance
+
+        prog = [{"chord": "C", "time": 0.0}, {"chord": "Dm", "time": 1.0}, {"chord": "F", "time": 2.0}]
+        results = gpt4all_flourish.suggest_chord_substitutions(prog, max_tokens=10)
+
+        batch_call, dm_call, f_call = mock_model_instance.generate.call_args_list
+        self.assertIn("1) C\n2) Dm\n3) F", batch_call[0][0])
+        self.assertEqual(batch_call[1]["max_tokens"], 30)
+        self.assertIn("Chord: Dm\n", dm_call[0][0])
+        self.assertIn("Chord: F\n", f_call[0][0])
+        mock_model_instance.chat_session.assert_called_once()  # Shared by all three
+        self.assertEqual(
+            [r["suggestions"] for r in results], [["Cmaj7", "C6"], ["Dm7"], ["Fadd9"]]  # Reply order kept
+        )
+
+    @patch('flourish_engine.gpt4all_flourish._gpt4all_available', True)
+    @patch('flourish_engine.gpt4all_flourish.GPT4All')
+    @patch('flourish_engine.gpt4all_flourish.detect_key_from_chords', return_value={})
+    @patch('flourish_engine.gpt4all_flourish.DEFAULT_MODEL_PATH', "dummy/path/model.bin")
+    def test_batch_runs_progressions_on_pooled_instances(self, mock_detect_key, MockGPT4AllClass):
+        instances = []
+
+        def new_instance(path):
+            model = MagicMock()
+            model.generate.side_effect = lambda prompt, **kwargs: prompt.splitlines()[0].replace("Chord: ", "") + "7"
+            instances.append(model)
+            return model
+        MockGPT4AllClass.side_effect = new_instance
+
+        progressions = [[{"chord": c, "time": 0.0}] for c in ["C", "D", "E", "F"]]
+        results = gpt4all_flourish.suggest_chord_substitutions_batch(progressions, workers=2)
+
+        self.assertEqual(len(instances), 2)
+        self.assertEqual([r[0]["suggestions"] for r in results], [["C7"], ["D7"], ["E7"], ["F7"]])
+        self.assertEqual(sum(m.generate.call_count for m in instances), 4)
+
+    @patch('flourish_engine.gpt4all_flourish._gpt4all_available', False)
+    def test_batch_single_worker_runs_sequentially(self):
+        with patch.object(gpt4all_flourish, 'suggest_chord_substitutions', return_value=[]) as mock_suggest:
+            results = gpt4all_flourish.suggest_chord_substitutions_batch([[], []], workers=1)
+        self.assertEqual(results, [[], []])
+        self.assertEqual(mock_suggest.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
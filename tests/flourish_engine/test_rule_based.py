@@ -33,6 +33,9 @@ class TestRuleBasedFlourishes(unittest.TestCase):
         logging.basicConfig(level=logging.DEBUG, format='%(levelname)s:%(name)s:%(message)s')
         # If you want to capture logs per test, use self.assertLogs in each test method
 
+    def setUp(self):
+        rule_based._key_context.cache_clear()  # Tests patch key detection per case
+
     def _assert_suggestions_contain(self, flourish_results, original_chord, expected_suggestion):
         found_original = False
         for item in flourish_results:
@@ -118,6 +121,15 @@ class TestRuleBasedFlourishes(unittest.TestCase):
         self._assert_suggestions_contain(results, "C", "Cmaj7") # C-E-G, B is M7, B is in A natural minor.
         self._assert_suggestions_contain(results, "E", "E7")   # E-G#-B, D is m7, D is in A natural minor.
 
+    @patch('flourish_engine.rule_based.RULE_BASED_SUBSTITUTIONS', MOCK_CONFIG_SUBSTITUTIONS)
+    @patch('flourish_engine.rule_based.detect_key_from_chords')
+    def test_diatonic_7ths_flat_key(self, mock_detect_key):
+        # F major is spelled with Bb: C's minor 7th (A#/Bb) is diatonic
+        mock_detect_key.return_value = {"key_root": "F", "key_quality": "major"}
+        results = rule_based.apply_rule_based_flourishes([{"chord": "C", "time": 0.0}], "default")
+        self._assert_suggestions_contain(results, "C", "C7")
+        self.assertNotIn("Cmaj7", self._get_suggestions_for_chord(results, "C"))
+
     @patch('flourish_engine.rule_based.RULE_BASED_SUBSTITUTIONS', MOCK_CONFIG_SUBSTITUTIONS)
     @patch('flourish_engine.rule_based.detect_key_from_chords')
     def test_sus_chords(self, mock_detect_key): # Removed mock_config_const
@@ -157,6 +169,24 @@ class TestRuleBasedFlourishes(unittest.TestCase):
         self.assertFalse(any("dim" in s for s in c_suggestions if s not in ["C", "Csus2", "Csus4", "Cadd9"]))
 
 
+    @patch('flourish_engine.rule_based.RULE_BASED_SUBSTITUTIONS', MOCK_CONFIG_SUBSTITUTIONS)
+    @patch('flourish_engine.rule_based.detect_key_from_chords')
+    def test_key_detected_once_per_progression(self, mock_detect_key):
+        mock_detect_key.return_value = {"key_root": "C", "key_quality": "major"}
+        progression = [{"chord": "C", "time": 0.0}, {"chord": "G", "time": 1.0}]
+        first = rule_based.apply_rule_based_flourishes(progression, "default")
+        second = rule_based.apply_rule_based_flourishes(progression, "default")
+        self.assertEqual(first, second)
+        mock_detect_key.assert_called_once_with(["C", "G"])
+
+    @patch('flourish_engine.rule_based.detect_key_from_chords')
+    def test_roots_resolved_once_per_distinct_root(self, mock_detect_key):
+        mock_detect_key.return_value = {"key_root": "C", "key_quality": "major"}
+        rule_based._root_value.cache_clear()
+        progression = [{"chord": c, "time": float(t)} for t, c in enumerate(["C", "Am", "C", "G", "Am"])]
+        rule_based.apply_rule_based_flourishes(progression, "default")
+        self.assertEqual(rule_based._root_value.cache_info().misses, 3)  # C, A, G
+
     def test_empty_progression(self):
         results = rule_based.apply_rule_based_flourishes([], "default")
         self.assertEqual(results, [])
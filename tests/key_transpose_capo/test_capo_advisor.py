@@ -13,13 +13,8 @@ class TestCapoAdvisor(unittest.TestCase):
         # Actual best: Capo 5 (shapes G,D,Em,C, score 0) vs Capo 0 (shapes C,G,Am,F, score 1 as F is not open)
         fret, transposed_chords = capo_advisor.recommend_capo(chords)
         self.assertEqual(fret, 5) # Algorithm correctly finds capo 5 is better
-        # music21 might return G/D for G if bass is D.
         # G (-5 from C), D (-5 from G), Em (-5 from Am), C (-5 from F)
-        # Based on test output, G becomes G/D. Let's verify this.
-        # C -> G, G -> D, Am -> Em, F -> C.
-        # music21 figures: C, D, Em, G. If G is G/D, it's fine.
-        # The previous test run showed G/D.
-        self.assertEqual(set(transposed_chords), set(["G/D", "D", "Em", "C"]))
+        self.assertEqual(transposed_chords, ["G", "D", "Em", "C"])
 
 
     def test_recommend_capo_favor_capo_1(self):
@@ -29,8 +24,7 @@ class TestCapoAdvisor(unittest.TestCase):
         chords = ["Db", "Ab", "Bbm", "Gb"]
         fret, transposed_chords = capo_advisor.recommend_capo(chords)
         self.assertEqual(fret, 6) # Capo 6 is optimal (score 0)
-        # Actual from last run: G might be G/D
-        self.assertEqual(set(transposed_chords), set(["G/D", "D", "Em", "C"]))
+        self.assertEqual(transposed_chords, ["G", "D", "Em", "C"])
 
 
     def test_recommend_capo_favor_capo_3(self):
@@ -41,8 +35,7 @@ class TestCapoAdvisor(unittest.TestCase):
         chords = ["Eb", "Bb", "Cm", "Ab"]
         fret, transposed_chords = capo_advisor.recommend_capo(chords)
         self.assertEqual(fret, 1) # Capo 1 is chosen due to tie-break
-        # Actual from last run: D, A/C#, Bm/D, G/D
-        self.assertEqual(set(transposed_chords), set(["D", "A/C#", "Bm/D", "G/D"]))
+        self.assertEqual(transposed_chords, ["D", "A", "Bm", "G"])
 
     def test_progression_with_some_non_open(self):
         # Sounding: F#, B, C#m, G#m
@@ -51,8 +44,7 @@ class TestCapoAdvisor(unittest.TestCase):
         chords = ["F#", "B", "C#m", "G#m"]
         fret, transposed_chords = capo_advisor.recommend_capo(chords)
         self.assertEqual(fret, 4) # Capo 4 is optimal
-        # Actual from last run: D, G/D, Am/C, Em
-        self.assertEqual(set(transposed_chords), set(["D", "G/D", "Am/C", "Em"]))
+        self.assertEqual(transposed_chords, ["D", "G", "Am", "Em"])
 
     def test_all_barre_chords_initially(self):
         # Sounding: F#m, Bm, C#m, Ebm (was G#m, Ebm is more distinct)
@@ -68,12 +60,38 @@ class TestCapoAdvisor(unittest.TestCase):
         # Expected: Capo 2 (Shapes: Em, Am, Bm, Dbm/C#m) -> Em, Am are open. Score = 2
         # Or Capo 4 (Shapes: Dm, Gm, Am, Bbm) -> Dm, Am are open. Score = 2. Tie break to lower fret.
         self.assertEqual(fret, 2) # Still expect 2 due to tie-breaking
-        # music21 might produce slash chords.
-        # F#m (-2) -> Em
-        # Bm (-2)  -> Am (or Am/E, Am/C) -> Actual: Am/C
-        # C#m (-2) -> Bm (or Bm/F#, Bm/D) -> Actual: Bm/D
-        # Ebm (-2) -> C#m (or C#m/G#)
-        self.assertEqual(set(transposed_chords), set(["Em", "Am/C", "Bm/D", "C#m"]))
+        # F#m (-2) -> Em, Bm (-2) -> Am, C#m (-2) -> Bm, Ebm (-2) -> C#m
+        self.assertEqual(transposed_chords, ["Em", "Am", "Bm", "C#m"])
+
+    def test_chords_parsed_once(self):
+        capo_advisor._capo_shapes.cache_clear()
+        capo_advisor._chord_symbol.cache_clear()
+        capo_advisor.recommend_capo(["C", "G", "C", "G"])
+        capo_advisor.recommend_capo(["G", "C"])
+        self.assertEqual(capo_advisor._capo_shapes.cache_info().misses, 2)
+        self.assertEqual(capo_advisor._chord_symbol.cache_info().misses, 0)  # No music21 needed
+
+    def test_slash_chords_and_quality_aliases(self):
+        # Capo 1: shapes A/C#, Dmaj7 (written DM7) and Em7 (written Emin7), all open
+        fret, transposed_chords = capo_advisor.recommend_capo(["A#/D", "D#M7", "Fmin7"])
+        self.assertEqual(fret, 1)
+        self.assertEqual(transposed_chords, ["A/C#", "DM7", "Emin7"])
+
+    def test_shapes_scored_by_pitch_class(self):
+        # Capo 4: Am and Emaj7, both open. Scoring music21 figures picked capo 1
+        # here, since its spellings (E-maj7/D, ...) rarely match OPEN_CHORDS.
+        fret, transposed_chords = capo_advisor.recommend_capo(["C#m", "Abmaj7"])
+        self.assertEqual(fret, 4)
+        self.assertEqual(transposed_chords, ["Am", "Emaj7"])
+
+    def test_spellings_outside_note_table_use_music21(self):
+        # Cb, E# and B# are valid chord names but not in NOTE_TO_VALUE
+        self.assertEqual(capo_advisor.recommend_capo(["Cb", "G"]), (0, ["Cb", "G"]))
+        self.assertEqual(capo_advisor.recommend_capo(["E#m"]), (1, ["Em"]))
+        self.assertEqual(capo_advisor.recommend_capo(["B#"]), (0, ["C"]))
+        fret, transposed_chords = capo_advisor.recommend_capo(["C", "G/Cb"])  # Cb slash bass
+        self.assertEqual(fret, 0)
+        self.assertEqual(transposed_chords[0], "C")
 
     def test_empty_list(self):
         fret, transposed_chords = capo_advisor.recommend_capo([])
@@ -99,14 +117,13 @@ class TestCapoAdvisor(unittest.TestCase):
         # If another capo position also yields Score 0, Capo 0 should be preferred.
         # Consider ["F#m", "Bm", "C#m"]
         # Capo 0: F#m, Bm, C#m (Score 3, 0 open)
-        # Capo 2: Em, Am, Bm (Score 1, Em, Am open) -> Actual shapes: Em, Am/C, Bm/D
+        # Capo 2: Em, Am, Bm (Score 1, Em, Am open)
         # Capo 4: Dm, Gm, Am (Score 1, Dm, Am open)
         # Capo 2 and 4 have score 1. Lower fret (2) should be chosen.
         chords = ["F#m", "Bm", "C#m"] # Shapes with Capo 2: Em, Am, Bm
         fret, transposed_chords = capo_advisor.recommend_capo(chords)
         self.assertEqual(fret, 2)
-        # The returned `best_transposed_shapes` will contain the full figure from music21.
-        self.assertEqual(set(transposed_chords), set(["Em", "Am/C", "Bm/D"]))
+        self.assertEqual(transposed_chords, ["Em", "Am", "Bm"])
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 from key_transpose_capo import fingering_advisor
 from music_theory.chord_shapes import ChordShape
 from music_theory.fretboard import Fretboard
@@ -7,6 +8,7 @@ class TestFingeringAdvisor(unittest.TestCase):
 
     def setUp(self):
         self.fretboard = Fretboard()
+        fingering_advisor._suggest_fingerings_cached.cache_clear()
 
     def test_score_shape_playability_open_c(self):
         # C Major Open: (0,-1,-1),(1,3,3),(2,2,2),(3,0,0),(4,1,1),(5,0,0)
@@ -100,6 +102,25 @@ class TestFingeringAdvisor(unittest.TestCase):
         # For now, just check it doesn't crash and returns a list.
         self.assertIsInstance(suggestions, list)
 
+    def test_suggest_fingerings_top_k_matches_full_ranking(self):
+        full = fingering_advisor.suggest_fingerings("C", fretboard=self.fretboard)
+        top = fingering_advisor.suggest_fingerings("C", fretboard=self.fretboard, top_k=1)
+        self.assertEqual(top, full[:1])
+        self.assertEqual(fingering_advisor.suggest_fingerings("C", fretboard=self.fretboard, top_k=0), [])
+
+    def test_suggest_fingerings_memoized_per_tuning(self):
+        with patch.object(fingering_advisor, 'score_shape_playability', wraps=fingering_advisor.score_shape_playability) as mock_score:
+            first = fingering_advisor.suggest_fingerings("G", fretboard=self.fretboard)
+            calls_after_first = mock_score.call_count
+            self.assertGreater(calls_after_first, 0)
+            second = fingering_advisor.suggest_fingerings("G", fretboard=Fretboard())
+            self.assertEqual(second, first)
+            self.assertEqual(mock_score.call_count, calls_after_first)
+
+            fingering_advisor.suggest_fingerings("G", fretboard=Fretboard(tuning=["D2", "A2", "D3", "G3", "B3", "E4"]))
+            fingering_advisor.suggest_fingerings("G", fretboard=self.fretboard, use_cache=False)
+            self.assertEqual(mock_score.call_count, 3 * calls_after_first)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -62,6 +62,19 @@ class TestTranspose(unittest.TestCase):
         with self.assertRaisesRegex(ValueError, "Invalid chord: Abc"):
             transpose.transpose_chords(["Abc"], 1)
 
+    def test_repeated_chords_transposed_once(self):
+        transpose._transpose_chord.cache_clear()
+        self.assertEqual(transpose.transpose_chords(["C", "G", "C", "G"], 2), ["D", "A", "D", "A"])
+        info = transpose._transpose_chord.cache_info()
+        self.assertEqual((info.misses, info.hits), (2, 2))
+
+    def test_make_transposer(self):
+        up_two = transpose.make_transposer(2)
+        self.assertIs(transpose.make_transposer(2), up_two)
+        self.assertEqual([up_two("C"), up_two("Am")], ["D", "Bm"])
+        with self.assertRaisesRegex(ValueError, "Invalid chord: Xyz"):
+            up_two("Xyz")
+
     def test_empty_list_input(self):
         self.assertEqual(transpose.transpose_chords([], 2), [])
 
@@ -82,6 +82,25 @@ class TestKeyAnalysis(unittest.TestCase):
         self.assertEqual(result.get("key_root"), expected_root)
         self.assertEqual(result.get("key_quality"), expected_quality)
 
+    def test_chord_symbols_parsed_once_across_calls(self):
+        key_analysis._chord_symbol_template.cache_clear()
+        key_analysis._detect_key_cached.cache_clear()
+        first = key_analysis.detect_key_from_chords(["C", "G", "C", "Xyz"])
+        second = key_analysis.detect_key_from_chords(["G", "C", "Xyz"])
+        self.assertEqual(first.get("key_root"), second.get("key_root"))
+        info = key_analysis._chord_symbol_template.cache_info()
+        self.assertEqual((info.misses, info.hits), (3, 4))
+
+    def test_repeated_progression_detected_once(self):
+        key_analysis._detect_key_cached.cache_clear()
+        first = key_analysis.detect_key_from_chords(["D", "A", "Bm", "G"])
+        detected_root = first["key_root"]
+        first["key_root"] = "mutated"
+        second = key_analysis.detect_key_from_chords(["D", "A", "Bm", "G"])
+        self.assertEqual(second.get("key_root"), detected_root)  # Callers get independent copies
+        info = key_analysis._detect_key_cached.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
     # It might be good to mock music21 if it's not a guaranteed part of the test environment
     # or to test the non-music21 error path.
     # For now, these tests assume music21 is importable.
@@ -12,6 +12,9 @@ from lyrics_analysis.lyrics_retriever import (
 
 class TestLyricsRetriever(unittest.TestCase):
 
+    def setUp(self):
+        parse_azlyrics_html.cache_clear()
+
     def test__sanitize_name(self):
         self.assertEqual(_sanitize_name("Test Artist!"), "testartist")
         self.assertEqual(_sanitize_name("Song Title 123"), "songtitle123")
@@ -70,6 +73,13 @@ class TestLyricsRetriever(unittest.TestCase):
             lyrics = parse_azlyrics_html("<html></html>", "Test Song", "Test Artist")
             self.assertIsNone(lyrics)
 
+    def test_parse_azlyrics_html_memoized(self):
+        html = "<html><body><p>No lyrics here</p></body></html>"
+        self.assertIsNone(parse_azlyrics_html(html, "Test Song", "Test Artist"))
+        with patch('bs4.BeautifulSoup') as mock_soup:
+            self.assertIsNone(parse_azlyrics_html(html, "Test Song", "Test Artist"))
+        mock_soup.assert_not_called()
+
     def test_get_lyrics_from_url_or_metadata_with_title_artist(self):
         result = get_lyrics_from_url_or_metadata(title="Song Title", artist="Artist Name")
         self.assertEqual(result["method"], "scrape_azlyrics")
@@ -33,7 +33,8 @@ def test_download_audio_invalid_url(monkeypatch):
         # The test_download_audio_missing_yt_dlp covers the missing module scenario.
         pytest.skip("yt_dlp not installed, skipping test_download_audio_invalid_url which mocks its behavior.")
 
-    from audio_input.downloader import download_audio
+    from audio_input.downloader import download_audio, _get_ydl
+    _get_ydl.cache_clear()  # Don't reuse an instance built before YoutubeDL was patched
     with pytest.raises(Exception) as exc: # Expecting the downloader's generic Exception
         download_audio("not_a_real_url")
     # The downloader wraps yt_dlp's exception.